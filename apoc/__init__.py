@@ -0,0 +1,41 @@
+"""Helpers for downloading, caching and analyzing APOC campaign finance
+exports. main_program.py is the batch script that ties them together.
+
+The names below are imported from their modules the first time they're
+used, so `import apoc` doesn't load pandas or any other heavy dependency:
+
+    from apoc import Pipeline
+    pipeline = Pipeline("input_csvs/CD_Transactions_10-30-2024.csv")
+    pipeline.pick_a_district("house", 12, "Seven Day", "State General")
+"""
+
+import importlib
+
+
+# Maps each name exported from the package to the module it's defined in.
+_exports = {
+    "Pipeline": "apoc.pipeline",
+    "cleaner": "apoc.cleaning",
+    "read_function": "apoc.cleaning",
+    "download_exports": "apoc.fetcher",
+    "plan_read": "apoc.read_planner",
+    "build_stats_cube": "apoc.stats_cube",
+    "cube_lookup": "apoc.stats_cube",
+    "cube_totals": "apoc.stats_cube",
+    "watch_directory": "apoc.watcher",
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name: str):
+    if name not in _exports:
+        raise AttributeError(f"module 'apoc' has no attribute {name!r}")
+    value = getattr(importlib.import_module(_exports[name]), name)
+    # Cached on the package, so the next lookup doesn't come back here
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
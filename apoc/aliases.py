@@ -0,0 +1,186 @@
+"""Resolves the many spellings of a candidate's name to one candidate id.
+
+The primary and general rosters, and the filer names in APOC exports, don't
+always spell a candidate the same way: "Calvin Schrage" and "Calvin R.
+Schrage", "Cathy L. Tilton" and "Cathy Tilton", "Wright, Stephen" and
+"Stephen Wright". alias_key() reduces a name to its first and last name,
+leaving out middle names and initials, quoted or parenthesized nicknames,
+suffixes such as "Jr." and "II", and anything after a "/", and turning
+"Last, First" around.
+
+build_alias_index() gives every candidate on a chamber's rosters an id, and
+resolve_aliases() then maps each spelling to an id through a dictionary, so
+every spelling is only ever keyed once. A spelling that matches no one on
+the rosters gets an id of its own. Each id's canonical name is its first
+spelling on the rosters, the primary roster first, which is the name the
+summaries and the other per-candidate stages use.
+"""
+
+import re
+
+import pandas as pd
+
+from apoc.rosters import senate_districts
+
+
+# Name suffixes left out of alias keys.
+name_suffixes = ["JR", "SR", "II", "III", "IV"]
+
+
+def alias_key(
+        name: str
+        ):
+    """Return the key a name resolves by: its first and last names, upper
+    case, such as "CALVIN SCHRAGE".
+
+    Parameters
+    ----------
+    name :
+        A candidate's name, as a roster or an export spells it.
+    """
+    # Quoted and parenthesized nicknames, and anything after a "/". A single
+    # quoted nickname has to stand on its own, so the apostrophes in names
+    # such as "O'Brien" and "D'Amico" aren't taken for quotes.
+    name = re.sub(r"\"[^\"]*\"|(?<!\S)'[^']*'(?=[\s,]|$)|\([^)]*\)|/.*$",
+                  " ", name)
+    # Apostrophes left in a name are part of it, so "O'Brien" is "OBRIEN"
+    words = re.sub(r"[^A-Z0-9,]+", " ",
+                   re.sub(r"['’]", "", name.upper())).strip()
+    # Suffixes, with or without a comma before them
+    words = re.sub(rf"(,?\s*\b(?:{'|'.join(name_suffixes)})\b)+$", "", words)
+    # "Last, First" becomes "First Last"
+    if "," in words:
+        last, first = words.split(",", 1)
+        words = f"{first} {last}"
+    tokens = words.replace(",", " ").split()
+    if not tokens:
+        return ""
+    return f"{tokens[0]} {tokens[-1]}"
+
+
+def build_alias_index(
+        rosters: dict
+        ):
+    """Return an alias index of the candidates on the rosters. The index
+    maps each chamber's alias keys and spellings to ids, and each id to the
+    candidate's canonical name, chamber, district, and names on the primary
+    and general rosters.
+
+    Parameters
+    ----------
+    rosters :
+        Maps "House" and "Senate" to a pair of nested name lists: the
+        primary roster and the general roster, each listing the candidates
+        in each district in district order.
+    """
+    index = {"keys": {}, "ids": {}, "candidates": []}
+    for chamber, (primary, general) in rosters.items():
+        keys = index["keys"].setdefault(chamber, {})
+        ids = index["ids"].setdefault(chamber, {})
+        for roster_name, nested_names in [("primary_name", primary),
+                                          ("general_name", general)]:
+            for i, names in enumerate(nested_names):
+                district = i + 1 if chamber == "House" else senate_districts[i]
+                for name in names:
+                    key = alias_key(name)
+                    candidate_id = keys.get(key)
+                    # Two people on the same primary roster are never one
+                    # candidate, however alike their names
+                    if candidate_id is None or (
+                            roster_name == "primary_name"
+                            and index["candidates"][candidate_id]
+                            ["primary_name"] not in (None, name)):
+                        candidate_id = len(index["candidates"])
+                        keys.setdefault(key, candidate_id)
+                        index["candidates"].append({
+                            "name": name,
+                            "chamber": chamber,
+                            "district": district,
+                            "primary_name": None,
+                            "general_name": None,
+                        })
+                    candidate = index["candidates"][candidate_id]
+                    if candidate[roster_name] is None:
+                        candidate[roster_name] = name
+                    ids[name] = candidate_id
+    return index
+
+
+def resolve_aliases(
+        index: dict,
+        chamber: str,
+        names: pd.Series
+        ):
+    """Return the candidate id of each name. Spellings the index hasn't seen
+    are added to it, so each is only keyed once.
+
+    Parameters
+    ----------
+    index :
+        An alias index from build_alias_index().
+    chamber :
+        "House" or "Senate".
+    names :
+        Candidate names, such as the "candidate_name" column.
+    """
+    keys = index["keys"].setdefault(chamber, {})
+    ids = index["ids"].setdefault(chamber, {})
+    for name in names.dropna().unique():
+        if name in ids:
+            continue
+        key = alias_key(name)
+        if key not in keys:
+            # Filers who aren't on the rosters are candidates of their own
+            keys[key] = len(index["candidates"])
+            index["candidates"].append({
+                "name": name,
+                "chamber": chamber,
+                "district": None,
+                "primary_name": None,
+                "general_name": None,
+            })
+        ids[name] = keys[key]
+    return names.map(ids)
+
+
+def canonical_names(
+        index: dict,
+        ids: pd.Series
+        ):
+    """Return the canonical name of each candidate id.
+
+    Parameters
+    ----------
+    index :
+        An alias index from build_alias_index().
+    ids :
+        Candidate ids, such as from resolve_aliases().
+    """
+    return ids.map(pd.Series([candidate["name"]
+                              for candidate in index["candidates"]]))
+
+
+def candidate_table(
+        index: dict
+        ):
+    """Return a dataframe with one row per candidate id: the canonical name,
+    chamber and district, the names on the primary and general rosters,
+    whether the candidate advanced to the general, and every spelling
+    resolved to the id so far.
+
+    Parameters
+    ----------
+    index :
+        An alias index from build_alias_index().
+    """
+    table = pd.DataFrame(index["candidates"])
+    table.index.name = "candidate_id"
+    variants = {}
+    for ids in index["ids"].values():
+        for name, candidate_id in ids.items():
+            variants.setdefault(candidate_id, []).append(name)
+    table["advanced"] = table.general_name.notna()
+    table["spellings"] = pd.Series(
+        {candidate_id: "; ".join(sorted(names))
+         for candidate_id, names in variants.items()})
+    return table.reset_index()
@@ -0,0 +1,147 @@
+"""Scores every transaction against the rest of its campaign's transactions,
+to point out the ones worth a second look.
+
+Three kinds of anomaly are scored, all with grouped, vectorized pandas
+operations, so the cost grows with the number of rows rather than the
+number of candidates:
+
+- Amounts far from the campaign's typical amount in the same category
+  (cash donations, in-kind donations or expenditures). Distance is measured
+  with the robust z-score, 0.6745 * (x - median) / MAD, which a few huge
+  transactions can't drag around the way they would a mean and a standard
+  deviation. Amounts span several orders of magnitude, so x is the
+  logarithm of the amount: a $5,000 donation to a campaign of $50 donations
+  stands out, but a $1,000 one to a campaign of $500 donations doesn't.
+- Days on which a campaign recorded far more transactions than it usually
+  does, scored the same way against the campaign's own daily counts.
+- Bundled round-number donations: several donations of the same round
+  amount to the same campaign on the same day.
+
+Negative cash or in-kind donations, which should only come from refunds or
+data entry mistakes, are flagged as well.
+"""
+
+import numpy as np
+import pandas as pd
+
+from apoc.stats_cube import transaction_categories
+
+
+# A robust z-score at least this far from 0 counts as an outlier. 3.5 is the
+# usual cutoff for the modified z-score.
+z_threshold = 3.5
+
+# Donations in multiples of this many dollars count as round numbers.
+round_unit = 100
+
+# How many same-day, same-amount round donations make a bundle.
+bundle_size = 3
+
+# Days with fewer transactions than this are never spikes, however quiet the
+# campaign usually is.
+spike_minimum = 5
+
+# The names of the categories scored, from transaction_categories().
+scored_categories = {0: "revenue", 1: "in_kind", 2: "expenditure"}
+
+
+def robust_z(
+        values: pd.Series,
+        groups: list
+        ):
+    """Return the robust z-score of each value within its group. Where a
+    group's MAD is 0, the mean absolute deviation is used instead, and where
+    that's 0 as well, every score in the group is 0.
+
+    Parameters
+    ----------
+    values :
+        The values to score.
+    groups :
+        Series or arrays, aligned with values, to group by.
+    """
+    median = values.groupby(groups).transform("median")
+    deviation = (values - median).abs()
+    grouped = deviation.groupby(groups)
+    mad = grouped.transform("median")
+    # Scales the mean absolute deviation so that, for normally distributed
+    # values, the score comes out the same as with the MAD
+    spread = mad.where(mad > 0, grouped.transform("mean") * 1.2533 * 0.6745)
+    return (0.6745 * (values - median) / spread.where(spread > 0))\
+        .fillna(0.0)
+
+
+def anomaly_scores(
+        df: pd.DataFrame
+        ):
+    """Return the cash donations, in-kind donations and expenditures in the
+    dataframe with their anomaly scores and the reasons for them, sorted by
+    score. Only transactions with a score above 0 are returned.
+
+    The columns added are "category", "amount_z" (the robust z-score of the
+    logarithm of the amount within the candidate's category), "day_count" and "day_z" (how
+    many transactions the candidate recorded that day, and its robust
+    z-score among the candidate's days), "bundle" (how many same-day
+    donations of the same round amount the candidate received), "score" and
+    "reasons".
+
+    Each candidate is scored against their own transactions, grouped by
+    "candidate_id", so someone running for both chambers is scored once per
+    campaign.
+
+    Parameters
+    ----------
+    df :
+        Transactions with "candidate_id", "candidate_name", "date", "amount"
+        and the columns transaction_categories() reads, across any number of
+        reports.
+    """
+    category = transaction_categories(df)
+    scored = df[np.isin(category, list(scored_categories))].copy()
+    category = transaction_categories(scored)
+    scored["category"] = pd.Series(category, index=scored.index)\
+        .map(scored_categories)
+    day = scored.date.dt.normalize()
+
+    scored["amount_z"] = robust_z(
+        np.log10(scored.amount.abs().clip(lower=1)),
+        [scored.candidate_id, scored.category])
+
+    days = scored.groupby([scored.candidate_id, day]).size()\
+        .rename("day_count").reset_index()
+    days["day_z"] = robust_z(days.day_count, [days.candidate_id])
+    days = days.set_index(["candidate_id", "date"])
+    day_index = pd.MultiIndex.from_arrays([scored.candidate_id, day])
+    scored["day_count"] = days.day_count.reindex(day_index).to_numpy()
+    scored["day_z"] = days.day_z.reindex(day_index).to_numpy()
+
+    is_round = (category == 0) & (scored.amount >= round_unit) \
+        & (scored.amount % round_unit == 0)
+    scored["bundle"] = scored.groupby([scored.candidate_id, day,
+                                       scored.amount]).amount\
+        .transform("size").where(is_round, 0)
+
+    outlier = scored.amount_z.abs() >= z_threshold
+    spike = (scored.day_z >= z_threshold) \
+        & (scored.day_count >= spike_minimum)
+    bundled = scored.bundle >= bundle_size
+    negative = (category <= 1) & (scored.amount < 0)
+
+    scored["score"] = np.where(outlier, scored.amount_z.abs(), 0.0) \
+        + np.where(spike, scored.day_z, 0.0) \
+        + np.where(bundled, scored.bundle, 0) \
+        + np.where(negative, z_threshold, 0.0)
+
+    # Builds the reasons column by column, rather than row by row
+    reasons = pd.Series("", index=scored.index)
+    for flag, reason in [
+            (outlier, "unusual amount"),
+            (spike, "busy day"),
+            (bundled, "bundled round donations"),
+            (negative, "negative donation")]:
+        reasons = reasons.where(~flag, reasons + "; " + reason)
+    scored["reasons"] = reasons.str.removeprefix("; ")
+
+    return scored[scored.score > 0].sort_values(
+        ["score", "candidate_name", "date"], ascending=[False, True, True],
+        ignore_index=True)
@@ -0,0 +1,160 @@
+"""Reads APOC exports and cleans them into the dataframe every stage uses.
+"""
+
+import time
+
+import pandas as pd
+
+from apoc.aliases import alias_key
+from apoc.fuzzy import score_pairs
+from apoc.read_planner import export_dtypes, read_planned
+
+
+def read_function(
+        file_path: str,
+        plan: dict | None = None
+        ):
+    """Reads the given csv file into a dataframe, and returns that dataframe.
+    
+    Parameters
+    ----------
+    file_path : 
+        The file path of the .csv file to read.
+    plan : 
+        A read plan from plan_read(). If given, only the columns and rows the
+        plan needs are read. Otherwise, the whole export is read.
+    """
+
+    print("Attempting to create data frame...")
+
+    # Grabs system time before reading, to calculate how long the read took
+    import_start = time.time()
+
+    # Creates and fills data frame with the filing information, reading only
+    # the columns and rows in the plan if there is one
+    if plan is None:
+        df = pd.read_csv(file_path, dtype=export_dtypes)
+    else:
+        df = read_planned(file_path, plan)
+
+    # Grabs system time after reading, to calculate how long the read took
+    import_end = time.time()
+
+    print("Successfully created data frame!")
+
+    print(f"Import took {round(import_end - import_start, 5)} seconds.")
+    print("")
+
+    return df
+
+
+def cleaner(
+        df: pd.DataFrame,
+        fuzzy_workers: int | None = None
+        ):
+    """Return a modified df with standardized column names, transaction amounts
+    stripped of extraneous characters, amounts converted to numerics and 
+    expenditures made negative, to keep with the standard of positive revenue,
+    negative expenditure. It also drops the column "--------" from the original
+    modified df because that column entirely consists of null values, and 
+    converts the entries in the "date" column into datetime data types. Creates
+    a "donor_full_name" column that concatenates the "first_name" and 
+    "last/business_name" columns for legibility, and creates unique donor ids
+    for each donor/recipient, then uses fuzzy string matching to  
+    uses fuzzy string matching to check whether the  
+    
+
+    Parameters
+    ----------
+    df : 
+        The dataframe to clean.
+    fuzzy_workers : 
+        How many processes to score the distinct candidate and donor name
+        pairs on. Defaults to one per CPU core; see apoc/fuzzy.py.
+    """
+
+    # Makes column names lowercase and replaces their spaces with underscores
+    df.columns = [c.lower().replace(" ", "_") for c in df.columns]
+
+    # Renames the "name" column to "candidate_name", for clarity
+    df = df.rename(columns={"name": "candidate_name"})
+    
+    df.amount = df.amount.replace("[,$]", "", regex=True)
+    df.amount = pd.to_numeric(df.amount,errors='coerce')
+
+    df.loc[df.transaction_type == "Expenditure", "amount"] *= -1
+
+    df = df.drop(columns=["--------"], errors="ignore")
+
+    # Converts the "date" data from a string into a datetime datatype
+    df.date = pd.to_datetime(df.date, format="%m/%d/%Y")
+
+    # Converts the "submitted" data from a string into a datetime datatype
+    df.submitted = pd.to_datetime(df.submitted, format="%m/%d/%Y")
+    
+    # Combines first name and last/business name, replacing na with ""
+    df["donor_full_name"] = df.first_name.fillna("") + " " \
+                            + df["last/business_name"].fillna("")
+
+    # Creates a new donor_id column
+    df["donor_id"] = df.fillna("").groupby(["donor_full_name"]).ngroup()
+
+    fuzz_time_start = time.time()
+
+    # Scores each distinct candidate and donor pair once, then spreads the
+    # scores back over the rows
+    pair_codes, pairs = pd.MultiIndex.from_arrays(
+        [df.candidate_name, df.donor_full_name]).factorize()
+    scores, timings = score_pairs(pairs.get_level_values(0).to_series(),
+                                  pairs.get_level_values(1).to_series(),
+                                  fuzzy_workers)
+    df["donor_score"] = scores[pair_codes]
+
+    fuzz_time_end = time.time()
+
+    chunk_seconds = [timing["seconds"] for timing in timings]
+    print(f"Scored {len(pairs)} distinct name pairs in {len(timings)} "
+          f"chunks, which took {round(min(chunk_seconds), 5)} to "
+          f"{round(max(chunk_seconds), 5)} seconds each.")
+    print(f"Fuzzy matching took {\
+        round(fuzz_time_end - fuzz_time_start, 5)} seconds.")
+
+    df["is_self"] = df.apply(\
+        lambda row: True if row["donor_score"] >= 79 else False, axis=1)
+
+    # Reorders the columns in big_df to be closer to the order for writing,
+    # leaving out any columns the read plan skipped
+    df = df[[column for column in ["result", "candidate_name", "amount", "date", "transaction_type",
+             "payment_type", "payment_detail", "purpose_of_expenditure", 
+             "donor_full_name", "donor_id", "address", "city", "state", "zip",
+             "country", "employer", "occupation", "donor_score", "is_self", 
+             "report_type", "election_name", "election_type","municipality", 
+             "office", "filer_type", "report_year", "submitted", "first_name", 
+             "last/business_name"] if column in df.columns]]
+
+    return df
+
+
+def office_filler(
+        df: pd.DataFrame,
+        office_fill_dictionary: dict
+        ):
+    """Fills the "office" column for all candidates with no reported income
+    during the analysis of the 30-day general election results, using
+    office_fill_dictionary, and returns the dataframe.
+
+    Parameters
+    ----------
+    df : 
+        The cleaned dataframe, which is updated in place.
+    office_fill_dictionary : 
+        Maps candidate names to the office they're running for. Every
+        spelling of a name that resolves to the same alias key is filled.
+    """
+    offices = {alias_key(name): office
+               for name, office in office_fill_dictionary.items()}
+    keys = {name: alias_key(name)
+            for name in df["candidate_name"].dropna().unique()}
+    fill = df["candidate_name"].map(keys).map(offices)
+    df.loc[fill.notna(), "office"] = fill[fill.notna()]
+    return df
@@ -0,0 +1,140 @@
+"""Writes the big donation and big expense files as typed, columnar files.
+
+The csv files are rebuilt one district at a time and read back as text. The
+same rows are also written as Parquet, with dates as timestamps, amounts as
+decimals to the cent, and the district, candidate and other repetitive text
+columns as categoricals. Rows are sorted by district, House 1 through 40 and
+then Senate A through T, and each district is its own row group, so a reader
+can skip straight to the districts and columns it wants:
+
+    pd.read_parquet("7_day_gen_big_donations.parquet",
+                    columns=["candidate_name", "amount"],
+                    filters=[("district", "==", "12")])
+
+A zstd-compressed copy of the csv file can be written as well, with the
+same columns and values as the csv file, in the same order.
+
+pyarrow, for Parquet, and zstandard, for the compressed csv, are optional.
+They're only imported when a file that needs them is written, and
+columnar_writer() skips a file whose dependency isn't installed.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from apoc.rosters import senate_districts
+
+
+# Every district, in the order the files are sorted in. Districts are text,
+# so House and Senate districts share one column.
+district_order = [str(district) for district in range(1, 41)] \
+    + list(senate_districts)
+
+# Text columns with few distinct values, written as categoricals.
+category_columns = [
+    "chamber", "candidate_name", "payment_type", "city", "state", "country",
+    "employer", "occupation"
+]
+
+# Amounts are written as decimals with this many digits, two of them cents.
+amount_precision = 12
+
+
+def typed_frame(
+        df: pd.DataFrame
+        ):
+    """Return a copy of a big donation or big expense frame with a "chamber"
+    column, the district as an ordered categorical, the repetitive text
+    columns as categoricals and the dates as datetimes, sorted by district.
+
+    Parameters
+    ----------
+    df :
+        Rows from big_donation_frame() or big_expense_frame(), for any
+        number of districts.
+    """
+    typed = df.copy()
+    district = typed.district.astype(str)
+    typed.insert(0, "chamber",
+                 np.where(district.isin(list(senate_districts)),
+                          "Senate", "House"))
+    typed["district"] = pd.Categorical(district, categories=district_order,
+                                       ordered=True)
+    for column in category_columns:
+        if column in typed.columns:
+            typed[column] = typed[column].astype("category")
+    for column in ["date", "submitted"]:
+        if column in typed.columns:
+            typed[column] = pd.to_datetime(typed[column])
+    if "is_self" in typed.columns:
+        typed["is_self"] = typed.is_self.astype("boolean")
+    typed["amount"] = pd.to_numeric(typed.amount).round(2)
+    # A stable sort keeps each district's rows in the csv file's order
+    return typed.sort_values("district", kind="stable", ignore_index=True)
+
+
+def write_parquet(
+        df: pd.DataFrame,
+        file_path: str
+        ):
+    """Write a typed frame to a Parquet file, with one row group per
+    district, and return the number of row groups.
+
+    Parameters
+    ----------
+    df :
+        A dataframe from typed_frame().
+    file_path :
+        The file path to write to.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # typed_frame() has already rounded the amounts to the cent, so casting
+    # them rounds each to exactly the cents it holds, in one pass
+    table = table.set_column(
+        table.schema.get_field_index("amount"),
+        pa.field("amount", pa.decimal128(amount_precision, 2)),
+        pa.array(df.amount, from_pandas=True)
+        .cast(pa.decimal128(amount_precision, 2)))
+
+    # The rows are sorted by district, so each district is one slice
+    codes = df.district.cat.codes.to_numpy()
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) \
+        if len(codes) else np.zeros(0, dtype=int)
+    stops = np.r_[starts[1:], len(codes)]
+    with pq.ParquetWriter(file_path + ".tmp", table.schema,
+                          compression="zstd") as writer:
+        for start, stop in zip(starts, stops):
+            part = table.slice(start, stop - start)
+            # Each row group only carries the categories it uses
+            for i, field in enumerate(part.schema):
+                if pa.types.is_dictionary(field.type):
+                    part = part.set_column(
+                        i, field,
+                        part.column(i).cast(field.type.value_type)
+                        .cast(field.type))
+            writer.write_table(part, row_group_size=stop - start)
+    os.replace(file_path + ".tmp", file_path)
+    return len(starts)
+
+
+def write_zstd_csv(
+        df: pd.DataFrame,
+        file_path: str
+        ):
+    """Write a dataframe to a zstd-compressed csv file.
+
+    Parameters
+    ----------
+    df :
+        The dataframe to write.
+    file_path :
+        The file path to write to, such as "big_donations.csv.zst".
+    """
+    df.to_csv(file_path + ".tmp", index=False,
+              compression={"method": "zstd"})
+    os.replace(file_path + ".tmp", file_path)
@@ -0,0 +1,85 @@
+"""Checks individuals' giving against the per-candidate, per-year limit.
+
+Alaska limits how much an individual may give a candidate in a calendar year
+(AS 15.13.070). The limit applies across every report and election, so the
+scan totals each donor's cash and non-monetary contributions to each
+candidate by the year of the contribution date, in one grouped pass over the
+whole export, and flags the totals over the limit along with the
+transactions that make them up. Donors are matched by donor_keys(), so a
+donor whose name is spelled several ways, such as "John Q. Smith" and "JOHN
+Q SMITH", still has one yearly total.
+
+Only individuals are checked: contributions from businesses and groups, which
+have no first name, and from the candidates themselves are left out.
+"""
+
+import pandas as pd
+
+from apoc.normalize import donor_keys
+from apoc.stats_cube import transaction_categories
+
+
+# The historic limit on what an individual may give a candidate in a year.
+contribution_limit = 500
+
+
+def individual_contributions(
+        df: pd.DataFrame
+        ):
+    """Return the cash and non-monetary contributions in the dataframe that
+    came from individuals other than the candidate, with a "year" column.
+
+    Parameters
+    ----------
+    df :
+        Transactions with "first_name", "is_self", "date" and the columns
+        transaction_categories() reads.
+    """
+    individual = df.first_name.fillna("").str.strip() != ""
+    contributions = df[
+        (transaction_categories(df) <= 1)
+        & individual
+        & ~df.is_self.astype(bool)
+        ]
+    return contributions.assign(year=contributions.date.dt.year)
+
+
+def compliance_scan(
+        df: pd.DataFrame,
+        limit: float = contribution_limit
+        ):
+    """Return two dataframes: one row per donor, candidate and year whose
+    contributions total more than the limit, with the total, count and first
+    and last contribution dates, and the contributions making up those
+    totals, with a "year_total" column.
+
+    Parameters
+    ----------
+    df :
+        The transactions to scan, across every report and election, with
+        "candidate_id", "donor_full_name" and "zip" columns. Totals are kept apart by candidate id, so a
+        candidate running for both chambers has a limit for each campaign.
+    limit :
+        The most an individual may give a candidate in a year.
+    """
+    # Each donor's spellings of their name count toward one yearly total
+    contributions = individual_contributions(df)
+    contributions = contributions.assign(donor_key=donor_keys(contributions))
+    keys = ["candidate_name", "candidate_id", "donor_key", "year"]
+
+    year_total = contributions.groupby(keys).amount.transform("sum")
+    flagged = contributions[year_total > limit]\
+        .assign(year_total=year_total[year_total > limit])
+
+    totals = flagged.groupby(keys).agg(
+        donor_full_name=("donor_full_name", "first"),
+        total=("amount", "sum"),
+        count=("amount", "count"),
+        first_date=("date", "min"),
+        last_date=("date", "max"),
+        ).reset_index()
+    totals["over_limit"] = totals.total - limit
+    totals = totals.sort_values("over_limit", ascending=False,
+                                ignore_index=True)
+    flagged = flagged.sort_values(keys + ["date"], ignore_index=True)
+    return totals, flagged
@@ -0,0 +1,275 @@
+"""Keeps every election cycle's transactions, and compares candidates'
+fundraising across cycles at the same point before election day.
+
+store_cycles() splits a cleaned dataframe by report year and election type
+and pickles each part on its own, with a manifest of what's there, so the
+store grows one cycle at a time as exports from new years are read. A
+comparison only ever loads one partition at a time, keeps the rows of the
+candidates asked about up to the cutoff date, and totals them before
+loading the next, so older cycles never have to be in memory all at once.
+
+The same point in two cycles is the same number of days before each
+cycle's election day. Alaska holds its primary on the third Tuesday in
+August and its general election on the first Tuesday after the first
+Monday in November of even-numbered years.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from apoc.aliases import alias_key
+from apoc.quantiles import grouped_sketches, merge_grouped_sketches
+from apoc.stats_cube import transaction_categories
+
+
+# The columns kept in the store, which are all a comparison needs.
+cycle_columns = [
+    "result", "candidate_name", "office", "date", "amount",
+    "transaction_type", "payment_type", "report_type", "election_type",
+    "report_year", "submitted", "donor_full_name"
+]
+
+# The manifest of a cycle store.
+manifest_name = "cycles.json"
+
+
+def election_day(
+        year: int,
+        election: str
+        ):
+    """Return the day of the given state election in the given year.
+
+    Parameters
+    ----------
+    year :
+        The election year.
+    election :
+        "State General" or "State Primary".
+    """
+    if election == "State General":
+        # The first Tuesday after the first Monday in November
+        first_monday = pd.Timestamp(year, 11, 1) \
+            + pd.Timedelta(days=(0 - pd.Timestamp(year, 11, 1).weekday()) % 7)
+        return first_monday + pd.Timedelta(days=1)
+    if election == "State Primary":
+        # The third Tuesday in August
+        first_tuesday = pd.Timestamp(year, 8, 1) \
+            + pd.Timedelta(days=(1 - pd.Timestamp(year, 8, 1).weekday()) % 7)
+        return first_tuesday + pd.Timedelta(weeks=2)
+    raise ValueError(f"No election day is known for {election!r}.")
+
+
+def cycle_year(
+        report_year: int
+        ):
+    """Return the election year of the cycle a report year belongs to. Odd
+    years' reports, such as the Year Start reports filed early in an election
+    year, belong to the next election's cycle.
+
+    Parameters
+    ----------
+    report_year :
+        The report year.
+    """
+    return report_year + report_year % 2
+
+
+def _partition_name(year: int, election_type: str):
+    """Return the file name of a partition, relative to the store."""
+    slug = election_type.lower().replace(" ", "_") or "none"
+    return f"{year}/{slug}.pkl"
+
+
+def load_cycle_manifest(
+        directory: str
+        ):
+    """Return the manifest of a cycle store, mapping each partition's file
+    name to its "report_year", "election_type", "rows", "first_date" and
+    "last_date", or an empty one if there isn't a store yet.
+
+    Parameters
+    ----------
+    directory :
+        The cycle store's directory.
+    """
+    manifest_path = os.path.join(directory, manifest_name)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def store_cycles(
+        df: pd.DataFrame,
+        directory: str
+        ):
+    """Save each report year and election type in the dataframe as its own
+    partition of the cycle store, replacing what was stored for them before,
+    and return the names of the partitions written. Partitions for other
+    years are left as they are.
+
+    Parameters
+    ----------
+    df :
+        A cleaned dataframe covering whole report years, such as big_df
+        read for every period. A frame narrowed to one election and report
+        would replace whole partitions with part of them.
+    directory :
+        The cycle store's directory.
+    """
+    manifest = load_cycle_manifest(directory)
+    written = []
+    columns = [column for column in cycle_columns if column in df.columns]
+    for (year, election_type), partition in df[columns].groupby(
+            [df.report_year, df.election_type.fillna("")]):
+        name = _partition_name(int(year), election_type)
+        path = os.path.join(directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partition.reset_index(drop=True).to_pickle(path + ".tmp")
+        os.replace(path + ".tmp", path)
+        manifest[name] = {
+            "report_year": int(year),
+            "election_type": election_type,
+            "rows": len(partition),
+            "first_date": str(partition.date.min().date()),
+            "last_date": str(partition.date.max().date()),
+        }
+        written.append(name)
+
+    with open(os.path.join(directory, manifest_name + ".tmp"), "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(os.path.join(directory, manifest_name + ".tmp"),
+               os.path.join(directory, manifest_name))
+    return written
+
+
+def cycle_totals(
+        directory: str,
+        election: str,
+        days_before: int,
+        candidates: dict | None = None
+        ):
+    """Return a dataframe with one row per chamber, candidate and cycle in
+    the store, with their cash "raised", number of cash "donations", "in_kind"
+    donations and "spent" from the start of the cycle's reports through
+    "as_of", the same number of days before that cycle's election day, and
+    their approximate "median_donation" over the same span.
+
+    Only totals and quantile sketches are kept from each partition, so the
+    median comes from KLLSketch rather than from every donation amount,
+    within the error bound described in apoc.quantiles.
+
+    Parameters
+    ----------
+    directory :
+        The cycle store's directory.
+    election :
+        The election whose day the point in the cycle is counted back from,
+        "State General" or "State Primary". Every partition of a year counts
+        toward its cycle's totals, whichever election its reports were for.
+    days_before :
+        How many days before election day to total through.
+    candidates :
+        Maps "House" and "Senate" to the candidates to total in that
+        chamber, as the current rosters spell them. A candidate's rows only
+        count toward the chamber they were filed for. Defaults to every
+        candidate in the store, as each cycle spelled them.
+    """
+    if candidates is not None:
+        wanted = {(chamber, alias_key(name)): name
+                  for chamber, names in candidates.items() for name in names}
+    totals = []
+    sketches = []
+    for name, entry in sorted(load_cycle_manifest(directory).items()):
+        year = cycle_year(entry["report_year"])
+        cutoff = election_day(year, election) - pd.Timedelta(days=days_before)
+        # Skips the partition without loading it if it all comes later
+        if pd.Timestamp(entry["first_date"]) > cutoff:
+            continue
+
+        df = pd.read_pickle(os.path.join(directory, name))
+        df = df[df.date <= cutoff]
+        if candidates is not None:
+            # Matches every spelling of the candidates' names, which can
+            # drift from one cycle to the next
+            keys = {name: alias_key(name)
+                    for name in df.candidate_name.dropna().unique()}
+            df = df.assign(candidate_name=[
+                wanted.get((office, key)) for office, key
+                in zip(df.office, df.candidate_name.map(keys))])\
+                .dropna(subset="candidate_name")
+        category = transaction_categories(df)
+        totals.append(pd.DataFrame({
+            "chamber": df.office.fillna(""),
+            "candidate_name": df.candidate_name,
+            "cycle": year,
+            "as_of": cutoff,
+            "raised": df.amount.where(category == 0, 0.0),
+            "donations": (category == 0).astype(int),
+            "in_kind": df.amount.where(category == 1, 0.0),
+            "spent": -df.amount.where(category == 2, 0.0),
+        }).groupby(["chamber", "candidate_name", "cycle", "as_of"]).sum())
+
+        donations = df[category == 0]
+        codes, labels = pd.factorize(pd.MultiIndex.from_arrays(
+            [donations.office.fillna(""), donations.candidate_name]))
+        sketches.append({
+            (*labels[code], year): sketch
+            for code, sketch in grouped_sketches(
+                codes[codes >= 0], donations.amount.to_numpy()[codes >= 0],
+                seed=0).items()})
+        # Only the totals and sketches are kept, so each partition can be
+        # freed
+        del df, donations
+
+    if not totals:
+        return pd.DataFrame(columns=["chamber", "candidate_name", "cycle",
+                                     "as_of", "raised", "donations",
+                                     "in_kind", "spent", "median_donation"])
+    # A cycle's partitions are added together
+    totals = pd.concat(totals)\
+        .groupby(level=["chamber", "candidate_name", "cycle", "as_of"])\
+        .sum().reset_index()
+    sketches = merge_grouped_sketches(sketches)
+    totals["median_donation"] = [
+        sketches[key].quantile(0.5) if key in sketches else np.nan
+        for key in zip(totals.chamber, totals.candidate_name, totals.cycle)]
+    return totals
+
+
+def cycle_lines(
+        totals: pd.DataFrame,
+        current_year: int
+        ):
+    """Return a dictionary mapping the chamber and name of each candidate
+    with totals from an earlier cycle to sentences comparing them with the
+    current cycle, for the text summaries.
+
+    Parameters
+    ----------
+    totals :
+        The dataframe from cycle_totals().
+    current_year :
+        The year of the cycle being summarized.
+    """
+    lines = {}
+    current = totals[totals.cycle == current_year]\
+        .set_index(["chamber", "candidate_name"]).raised
+    earlier = totals[totals.cycle < current_year]\
+        .sort_values(["chamber", "candidate_name", "cycle"])
+    for row in earlier.itertuples(index=False):
+        name = row.candidate_name
+        key = (row.chamber, name)
+        sentence = (
+            f"By {row.as_of:%B} {row.as_of.day}, {row.as_of.year}, the same "
+            f"point in the {row.cycle} cycle, {name}'s campaign had raised "
+            f"${round(row.raised, 2)} in cash")
+        if key in current.index and row.raised > 0:
+            change = (current[key] - row.raised) / row.raised
+            sentence += (f", {'up' if change >= 0 else 'down'} "
+                         f"{abs(round(change * 100))}% this cycle")
+        lines.setdefault(key, []).append(sentence + ".")
+    return lines
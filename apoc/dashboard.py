@@ -0,0 +1,265 @@
+"""Builds a static dashboard: one JSON payload per district and an HTML page
+that shows them.
+
+Every number in a payload comes from aggregates that are already computed:
+the per-candidate totals come from the statistics cube through
+cube_totals(), and each candidate's cumulative cash raised and spent is
+worked out for the whole chamber in one grouped pass, then sliced by
+district. Candidates are sorted by cash raised and amounts are rounded to
+cents before they're written, so the page only has to draw what it's given.
+
+The payloads are written with write_partitions(), so a district whose
+payload hasn't changed since the last build isn't written again.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from apoc.date_window import describe_window
+from apoc.stats_cube import cube_totals, transaction_categories
+
+
+# The file listing every district's payload, which the page loads first.
+districts_name = "districts.json"
+
+# The page itself.
+page_name = "index.html"
+
+
+def cumulative_series(
+        df: pd.DataFrame
+        ):
+    """Return a dataframe with each candidate's cumulative cash "raised" and
+    "spent" as of each day they had a cash donation or an expenditure,
+    sorted by candidate and date.
+
+    Parameters
+    ----------
+    df :
+        Transactions with "candidate_name", "date", "amount" and the columns
+        transaction_categories() reads.
+    """
+    category = transaction_categories(df)
+    flows = df[(category == 0) | (category == 2)]
+    category = transaction_categories(flows)
+    daily = pd.DataFrame({
+        "candidate_name": flows.candidate_name,
+        "date": flows.date.dt.normalize(),
+        "raised": np.where(category == 0, flows.amount, 0.0),
+        "spent": np.where(category == 2, -flows.amount, 0.0),
+    }).groupby(["candidate_name", "date"], as_index=False).sum()
+    grouped = daily.groupby("candidate_name", sort=False)
+    daily["raised"] = grouped.raised.cumsum()
+    daily["spent"] = grouped.spent.cumsum()
+    return daily
+
+
+def _candidate_payload(name: str, totals: pd.Series,
+                       series: pd.DataFrame | None):
+    """Return the payload entry for one candidate."""
+    count = int(totals.revenue_count)
+    entry = {
+        "name": name,
+        "donations": count,
+        "raised": round(float(totals.revenue_sum), 2),
+        "average_donation": round(float(totals.revenue_sum) / count, 2)
+        if count else None,
+        "donations_500_plus": int(totals.revenue_threshold_count_500),
+        "in_kind": round(float(totals.in_kind_sum), 2),
+        "expenditures": int(totals.expenditure_count),
+        # Expenditures are negative everywhere else, but the page shows
+        # spending as a positive amount
+        "spent": round(-float(totals.expenditure_sum), 2),
+        "expenditures_1000_plus": int(totals.expenditure_threshold_count_1000),
+    }
+    if series is None:
+        entry["series"] = {"dates": [], "raised": [], "spent": []}
+    else:
+        entry["series"] = {
+            "dates": series.date.dt.strftime("%Y-%m-%d").tolist(),
+            "raised": series.raised.round(2).tolist(),
+            "spent": series.spent.round(2).tolist(),
+        }
+    return entry
+
+
+def district_payloads(
+        chamber: str,
+        df: pd.DataFrame,
+        cube: dict,
+        district_dictionary: dict,
+        election: str,
+        report: str,
+        districts: list | None = None,
+        date_window: dict | None = None
+        ):
+    """Return a dictionary mapping the file name of each district's payload,
+    such as "house_12.json", to its JSON text.
+
+    Parameters
+    ----------
+    chamber :
+        "House" or "Senate".
+    df :
+        The chamber's transactions, or the ones in the date window.
+    cube :
+        The statistics cube built from df.
+    district_dictionary :
+        Maps each of the chamber's candidates to their district.
+    election :
+        The election to summarize, such as "State General". The cumulative
+        series cover every report in it.
+    report :
+        The report whose totals to show, such as "Seven Day".
+    districts :
+        The districts to build payloads for. Defaults to every district with
+        a candidate.
+    date_window :
+        The window df was selected with, if any, to describe on the page.
+    """
+    totals = cube_totals(cube, election, report)
+    series = cumulative_series(
+        df[df.election_type.str.contains(election)])
+    series_by_candidate = dict(list(series.groupby("candidate_name")))
+
+    roster = pd.Series(district_dictionary, name="district")
+    if districts is None:
+        districts = sorted(set(roster), key=str)
+
+    payloads = {}
+    for district in districts:
+        names = roster[roster == district].index
+        candidates = [
+            _candidate_payload(
+                name,
+                totals.loc[name] if name in totals.index
+                else pd.Series(0, index=totals.columns),
+                series_by_candidate.get(name))
+            for name in names]
+        candidates.sort(key=lambda entry: entry["raised"], reverse=True)
+        payloads[f"{chamber.lower()}_{district}.json"] = json.dumps({
+            "chamber": chamber,
+            "district": district,
+            "election": election,
+            "report": report,
+            "window": None if date_window is None
+            else describe_window(date_window),
+            "candidates": candidates,
+        }, separators=(",", ":"))
+    return payloads
+
+
+def districts_index(
+        file_names: list
+        ):
+    """Return the JSON text of the list of payloads the page offers, in
+    House then Senate district order.
+
+    Parameters
+    ----------
+    file_names :
+        The payload file names, such as "house_12.json".
+    """
+    entries = []
+    for name in file_names:
+        chamber, district = name.removesuffix(".json").split("_", 1)
+        entries.append({
+            "file": name,
+            "chamber": chamber.title(),
+            "district": int(district) if district.isdigit() else district,
+        })
+    entries.sort(key=lambda entry: (entry["chamber"] != "House",
+                                    str(entry["district"]).zfill(2)))
+    return json.dumps(entries, separators=(",", ":"))
+
+
+# The page. It loads districts.json, then the payload of whichever district
+# is picked, and draws the table and the cumulative chart without doing any
+# arithmetic beyond scaling the chart.
+page_html = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Alaska Legislature campaign finance</title>
+<style>
+body { font-family: sans-serif; margin: 2em; }
+table { border-collapse: collapse; margin: 1em 0; }
+th, td { border-bottom: 1px solid #ccc; padding: 0.3em 0.8em; }
+td.number { text-align: right; }
+svg { border: 1px solid #ccc; }
+</style>
+</head>
+<body>
+<h1>Alaska Legislature campaign finance</h1>
+<select id="district"></select>
+<p id="period"></p>
+<table id="totals"></table>
+<h2>Cumulative cash raised</h2>
+<svg id="chart" width="720" height="300"></svg>
+<script>
+const money = (x) => x === null ? "" : "$" + x.toLocaleString(
+  "en-US", {minimumFractionDigits: 2, maximumFractionDigits: 2});
+const colors = ["#1f77b4", "#d62728", "#2ca02c", "#9467bd", "#ff7f0e",
+                "#8c564b", "#e377c2"];
+
+function draw(payload) {
+  document.getElementById("period").textContent =
+    payload.election + ", " + payload.report +
+    (payload.window ? ", transactions " + payload.window : "");
+  const columns = [["name", "Candidate"], ["raised", "Raised"],
+    ["donations", "Donations"], ["average_donation", "Average donation"],
+    ["donations_500_plus", "Donations of $500+"], ["in_kind", "In-kind"],
+    ["spent", "Spent"], ["expenditures", "Expenditures"]];
+  let rows = "<tr>" + columns.map(([, label]) => "<th>" + label + "</th>")
+    .join("") + "</tr>";
+  for (const candidate of payload.candidates) {
+    rows += "<tr>" + columns.map(([key]) => {
+      const value = candidate[key];
+      if (key === "name") return "<td>" + value + "</td>";
+      const shown = ["raised", "average_donation", "in_kind", "spent"]
+        .includes(key) ? money(value) : value;
+      return "<td class=\\"number\\">" + shown + "</td>";
+    }).join("") + "</tr>";
+  }
+  document.getElementById("totals").innerHTML = rows;
+
+  const svg = document.getElementById("chart");
+  const width = svg.width.baseVal.value, height = svg.height.baseVal.value;
+  const times = payload.candidates.flatMap(
+    (candidate) => candidate.series.dates.map((date) => Date.parse(date)));
+  const top = Math.max(1, ...payload.candidates.flatMap(
+    (candidate) => candidate.series.raised));
+  const start = Math.min(...times), end = Math.max(start + 1, ...times);
+  svg.innerHTML = payload.candidates.map((candidate, i) => {
+    const points = candidate.series.dates.map((date, j) =>
+      ((Date.parse(date) - start) / (end - start) * (width - 20) + 10) +
+      "," + (height - 10 - candidate.series.raised[j] / top * (height - 20)))
+      .join(" ");
+    const color = colors[i % colors.length];
+    return "<polyline fill=\\"none\\" stroke=\\"" + color + "\\" points=\\"" +
+      points + "\\"><title>" + candidate.name + "</title></polyline>" +
+      "<text x=\\"10\\" y=\\"" + (20 + 16 * i) + "\\" fill=\\"" + color + "\\">" +
+      candidate.name + "</text>";
+  }).join("");
+}
+
+fetch("districts.json").then((response) => response.json())
+  .then((districts) => {
+    const select = document.getElementById("district");
+    for (const entry of districts) {
+      const option = document.createElement("option");
+      option.value = entry.file;
+      option.textContent = entry.chamber + " District " + entry.district;
+      select.appendChild(option);
+    }
+    const load = () => fetch(select.value)
+      .then((response) => response.json()).then(draw);
+    select.addEventListener("change", load);
+    load();
+  });
+</script>
+</body>
+</html>
+"""
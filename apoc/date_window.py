@@ -0,0 +1,212 @@
+"""Selects transactions by date, or by when they were submitted.
+
+Reports are picked by matching their names, which can't express "everything
+dated between October 1 and October 27" or "everything submitted since the
+last export". A date window can:
+
+    date_window("2024-10-01", "2024-10-27")
+    date_window(start=last_export_time, column="submitted")
+
+build_date_index() sorts a chamber's rows by candidate and date, and by
+candidate and submitted date, once. Each candidate's rows are then a
+contiguous, sorted run, so the rows in any window are found with two binary
+searches per candidate instead of a scan of the whole frame.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# The columns a window can select on.
+window_columns = ["date", "submitted"]
+
+
+def date_window(
+        start=None,
+        end=None,
+        column: str = "date"
+        ):
+    """Return a date window: every day from start through end, inclusive.
+    Either end can be left open.
+
+    Parameters
+    ----------
+    start :
+        The first day in the window, as anything pd.Timestamp() takes, or
+        None for no lower bound.
+    end :
+        The last day in the window, or None for no upper bound.
+    column :
+        "date" to select by transaction date, or "submitted" to select by
+        when the report was submitted.
+    """
+    if column not in window_columns:
+        raise ValueError(f"column must be one of {window_columns}, "
+                         f"not {column!r}")
+    return {
+        "column": column,
+        "start": None if start is None else pd.Timestamp(start).normalize(),
+        # The window runs up to, but not including, the day after the end
+        "stop": None if end is None
+        else pd.Timestamp(end).normalize() + pd.Timedelta(days=1),
+    }
+
+
+def window_key(
+        window: dict | None
+        ):
+    """Return a hashable key for a window, for caching what's built from
+    it. None, for no window, is its own key.
+
+    Parameters
+    ----------
+    window :
+        A window from date_window(), or None.
+    """
+    if window is None:
+        return None
+    return window["column"], window["start"], window["stop"]
+
+
+def _long_date(day: pd.Timestamp):
+    """Return the day written out, such as "October 1, 2024". The day of the
+    month is formatted by hand, since strftime's "%-d" is glibc-only."""
+    return f"{day:%B} {day.day}, {day.year}"
+
+
+def describe_window(
+        window: dict
+        ):
+    """Return a short description of a window, such as "dated October 1,
+    2024 through October 27, 2024".
+
+    Parameters
+    ----------
+    window :
+        A window from date_window().
+    """
+    verb = "dated" if window["column"] == "date" else "submitted"
+    start, stop = window["start"], window["stop"]
+    last = None if stop is None else stop - pd.Timedelta(days=1)
+    if start is not None and last is not None:
+        return f"{verb} {_long_date(start)} through {_long_date(last)}"
+    if start is not None:
+        return f"{verb} on or after {_long_date(start)}"
+    if last is not None:
+        return f"{verb} on or before {_long_date(last)}"
+    return f"{verb} at any time"
+
+
+def build_date_index(
+        df: pd.DataFrame
+        ):
+    """Return a date index of the dataframe: for each window column, the row
+    positions sorted by candidate and then by that column, the sorted values
+    as int64 nanoseconds, and where each candidate's run starts.
+
+    Parameters
+    ----------
+    df :
+        Transactions with "candidate_name", "date" and "submitted" columns.
+    """
+    codes, candidates = pd.factorize(df.candidate_name, sort=True)
+    index = {
+        "df": df,
+        "candidates": {name: i for i, name in enumerate(candidates)},
+    }
+    for column in window_columns:
+        # Missing dates sort last within each candidate, past any window
+        values = df[column].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        values = np.where(df[column].isna().to_numpy(),
+                          np.iinfo(np.int64).max, values)
+        order = np.lexsort((values, codes))
+        index[column] = {
+            "order": order,
+            "values": values[order],
+            "offsets": np.searchsorted(codes[order],
+                                       np.arange(len(candidates) + 1)),
+        }
+    return index
+
+
+def _bounds(values: np.ndarray, window: dict):
+    """Return the positions in a sorted run of values where the window
+    starts and stops."""
+    lo = 0 if window["start"] is None \
+        else np.searchsorted(values, window["start"].value, side="left")
+    hi = np.searchsorted(values, np.iinfo(np.int64).max, side="left") \
+        if window["stop"] is None \
+        else np.searchsorted(values, window["stop"].value, side="left")
+    return lo, hi
+
+
+def candidate_window(
+        index: dict,
+        candidate: str,
+        window: dict
+        ):
+    """Return one candidate's rows in the window, sorted by the window's
+    column.
+
+    Parameters
+    ----------
+    index :
+        A date index from build_date_index().
+    candidate :
+        The candidate's name.
+    window :
+        A window from date_window().
+    """
+    df = index["df"]
+    c = index["candidates"].get(candidate)
+    if c is None:
+        return df.iloc[:0]
+    by = index[window["column"]]
+    start, stop = by["offsets"][c], by["offsets"][c + 1]
+    lo, hi = _bounds(by["values"][start:stop], window)
+    return df.iloc[by["order"][start + lo:start + hi]]
+
+
+def window_positions(
+        index: dict,
+        window: dict
+        ):
+    """Return the row positions of every candidate's rows in the window,
+    in candidate order and sorted by the window's column within each
+    candidate.
+
+    Parameters
+    ----------
+    index :
+        A date index from build_date_index().
+    window :
+        A window from date_window().
+    """
+    by = index[window["column"]]
+    offsets = by["offsets"]
+    runs = [
+        by["order"][start + lo:start + hi]
+        for start, stop in zip(offsets[:-1], offsets[1:])
+        for lo, hi in [_bounds(by["values"][start:stop], window)]]
+    if not runs:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate(runs)
+
+
+def select_window(
+        index: dict,
+        window: dict | None
+        ):
+    """Return the rows of the indexed dataframe in the window, or the whole
+    dataframe if there's no window.
+
+    Parameters
+    ----------
+    index :
+        A date index from build_date_index().
+    window :
+        A window from date_window(), or None.
+    """
+    if window is None:
+        return index["df"]
+    return index["df"].iloc[np.sort(window_positions(index, window))]
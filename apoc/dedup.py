@@ -0,0 +1,65 @@
+"""Drops transactions that were reported again in an amended report.
+
+When a filer amends a report, the export keeps the original report's
+transactions and adds the amended copies, with a later "submitted" date and
+new result numbers, so totals count them twice. Each transaction is
+fingerprinted with a 64-bit hash of the fields that identify it, normalized
+so that changes in case, spacing or punctuation don't matter, and for every
+fingerprint only the rows from the latest submission are kept. Hashing and
+grouping on one integer column takes time in proportion to the number of
+rows, where comparing rows pair by pair would grow with its square.
+
+A donor who really did give the same amount on the same day twice in one
+report keeps both rows, since both come from the same submission.
+"""
+
+import numpy as np
+import pandas as pd
+
+from apoc.normalize import normalize_distinct
+
+
+# The fields that identify a transaction across amendments, besides its
+# normalized donor or payee name.
+fingerprint_columns = [
+    "candidate_name", "date", "transaction_type", "payment_type",
+    "report_type", "election_type", "report_year"
+]
+
+
+def transaction_fingerprints(
+        df: pd.DataFrame
+        ):
+    """Return a uint64 array with the fingerprint of each transaction.
+
+    Parameters
+    ----------
+    df :
+        Cleaned transactions, with "amount", "donor_full_name" and the
+        fingerprint_columns that are present.
+    """
+    keys = df[[column for column in fingerprint_columns
+               if column in df.columns]].copy()
+    # Whole cents, so float noise in the amount can't split a fingerprint
+    keys["amount"] = np.round(df.amount.to_numpy() * 100)
+    keys["donor"] = normalize_distinct(df.donor_full_name)
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def drop_amended(
+        df: pd.DataFrame
+        ):
+    """Return the transactions with superseded copies removed, and the rows
+    that were removed, with a "superseded_by" column holding the submitted
+    date of the copy that was kept.
+
+    Parameters
+    ----------
+    df :
+        Cleaned transactions, with a "submitted" column.
+    """
+    fingerprints = transaction_fingerprints(df)
+    latest = df.submitted.groupby(fingerprints).transform("max")
+    superseded = (df.submitted < latest).to_numpy()
+    dropped = df[superseded].assign(superseded_by=latest[superseded])
+    return df[~superseded], dropped
@@ -0,0 +1,161 @@
+"""Which candidates share donors, and how much.
+
+donor_matrix() builds a sparse donor by candidate matrix of donation totals,
+stored the way scipy stores a CSR matrix: for donor i, the candidates they
+gave to are indices[indptr[i]:indptr[i + 1]] and the amounts they gave are
+the same slice of data. candidate_overlap() then forms the candidate by
+candidate products of that matrix with itself for every pair at once. Each
+donor contributes one term for every pair of candidates they gave to, so the
+work grows with the number of shared donations, not with the number of
+candidate pairs times the number of donors.
+
+For candidates a and b, the overlap is:
+
+- shared_donors: how many donors gave to both.
+- shared_dollars_a and shared_dollars_b: how much a and b got from those
+  shared donors.
+- jaccard: shared donors over donors who gave to either.
+- cosine: the cosine similarity of a's and b's columns of the matrix, which
+  is 1 when the same donors gave them the same amounts in the same
+  proportions.
+"""
+
+import numpy as np
+import pandas as pd
+
+from apoc.normalize import donor_keys
+
+
+def donor_matrix(
+        df: pd.DataFrame
+        ):
+    """Return the donor by candidate matrix of the given donations, as a
+    dictionary with the "donors" labeling its rows, the "candidates" and
+    "candidate_ids" labeling its columns, and the CSR arrays "indptr",
+    "indices" and "data". Columns are kept apart by candidate id, so a
+    candidate running for both chambers has a column for each campaign, and
+    are in order of name.
+
+    Parameters
+    ----------
+    df :
+        The donations, with "donor_full_name", "zip", "candidate_id",
+        "candidate_name" and "amount" columns. Donors are matched by
+        donor_keys(), so every spelling of a donor's name shares a row.
+    """
+    donor_codes, donors = pd.factorize(donor_keys(df), sort=True)
+    candidates = df[["candidate_name", "candidate_id"]].dropna()\
+        .drop_duplicates().sort_values(["candidate_name", "candidate_id"])
+    candidate_codes = pd.Index(candidates.candidate_id)\
+        .get_indexer(df.candidate_id)
+    keep = (donor_codes >= 0) & (candidate_codes >= 0)
+
+    # Totals each donor's giving to each candidate, in donor then candidate
+    # order, which is the order CSR stores its entries in
+    totals = pd.Series(df.amount.to_numpy()[keep])\
+        .groupby([donor_codes[keep], candidate_codes[keep]]).sum()
+    rows = totals.index.get_level_values(0).to_numpy()
+
+    indptr = np.zeros(len(donors) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(donors)), out=indptr[1:])
+    return {
+        "donors": np.asarray(donors),
+        "candidates": candidates.candidate_name.to_numpy(),
+        "candidate_ids": candidates.candidate_id.to_numpy(),
+        "indptr": indptr,
+        "indices": totals.index.get_level_values(1).to_numpy(),
+        "data": totals.to_numpy(dtype=float),
+    }
+
+
+def _row_pairs(
+        indptr: np.ndarray
+        ):
+    """Return the positions of the left and right entries of every ordered
+    pair of entries that share a row of a CSR matrix."""
+    row_lengths = np.diff(indptr)
+    entry_rows = np.repeat(np.arange(len(row_lengths)), row_lengths)
+
+    # Each entry is paired with every entry in its row, itself included
+    pairs_per_entry = row_lengths[entry_rows]
+    left = np.repeat(np.arange(len(entry_rows)), pairs_per_entry)
+    block_starts = np.cumsum(pairs_per_entry) - pairs_per_entry
+    offset_in_row = np.arange(len(left)) - np.repeat(block_starts,
+                                                     pairs_per_entry)
+    right = indptr[entry_rows[left]] + offset_in_row
+    return left, right
+
+
+def candidate_overlap(
+        matrix: dict
+        ):
+    """Return a dataframe with one row for every pair of candidates who share
+    at least one donor, with "candidate_a" and "candidate_b" columns, their
+    "candidate_id_a" and "candidate_id_b", each candidate's donor count, and the overlap statistics described at the top
+    of this module, sorted by shared donors.
+
+    Parameters
+    ----------
+    matrix :
+        A donor by candidate matrix from donor_matrix().
+    """
+    n = len(matrix["candidates"])
+    left, right = _row_pairs(matrix["indptr"])
+    a = matrix["indices"][left]
+    b = matrix["indices"][right]
+    cells = a * n + b
+
+    # The candidate by candidate products, with the diagonals holding each
+    # candidate's own donor count and sum of squared amounts
+    shared_donors = np.bincount(cells, minlength=n * n).reshape(n, n)
+    shared_dollars = np.bincount(
+        cells, weights=matrix["data"][left], minlength=n * n).reshape(n, n)
+    dot = np.bincount(
+        cells, weights=matrix["data"][left] * matrix["data"][right],
+        minlength=n * n).reshape(n, n)
+
+    i, j = np.nonzero(np.triu(shared_donors, k=1))
+    donors = np.diagonal(shared_donors)
+    norms = np.sqrt(np.diagonal(dot))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cosine = dot[i, j] / (norms[i] * norms[j])
+
+    overlap = pd.DataFrame({
+        "candidate_a": matrix["candidates"][i],
+        "candidate_b": matrix["candidates"][j],
+        "candidate_id_a": matrix["candidate_ids"][i],
+        "candidate_id_b": matrix["candidate_ids"][j],
+        "donors_a": donors[i],
+        "donors_b": donors[j],
+        "shared_donors": shared_donors[i, j],
+        "shared_dollars_a": shared_dollars[i, j],
+        "shared_dollars_b": shared_dollars[j, i],
+        "jaccard": shared_donors[i, j] / (donors[i] + donors[j]
+                                          - shared_donors[i, j]),
+        "cosine": cosine,
+    })
+    return overlap.sort_values(["shared_donors", "jaccard"], ascending=False,
+                               ignore_index=True)
+
+
+def district_overlap(
+        df: pd.DataFrame
+        ):
+    """Return candidate_overlap() for the candidates of each district,
+    stacked with a "district" column in front.
+
+    Parameters
+    ----------
+    df :
+        The donations, with "district", "donor_full_name", "zip",
+        "candidate_id", "candidate_name" and "amount" columns.
+    """
+    # Starts from an empty overlap, so there are columns even when there are
+    # no districts
+    overlaps = [candidate_overlap(donor_matrix(df.iloc[:0]))
+                .assign(district=None)]
+    for district, district_df in df.groupby("district", sort=True):
+        overlaps.append(candidate_overlap(donor_matrix(district_df))
+                        .assign(district=district))
+    overlap = pd.concat(overlaps, ignore_index=True)
+    return overlap[["district"] + list(overlap.columns[:-1])]
@@ -0,0 +1,90 @@
+"""Groups expenditures by what the money was spent on.
+
+The "purpose_of_expenditure" column is free text, but a full-cycle export only
+has a few thousand distinct purposes, so each distinct purpose is normalized
+and classified once with the keyword rules below, and the categories are
+broadcast back to the rows. The rules are compiled into a single regex, so
+classifying a purpose is one match however many rules there are.
+
+Expenditure amounts are negative throughout this repository, and the totals
+here keep that sign.
+"""
+
+import pandas as pd
+
+from apoc.normalize import classify_distinct, keyword_classifier
+
+
+# Keyword rules for normalized purposes. The first rule in the list that
+# matches anywhere in the text decides the category.
+expense_rules = [
+    ("Refunds", r"REFUND|RETURNED? CONTRIBUTION|RETURN OF"),
+    ("Staff", r"PAYROLL|\bSTAFF|SALARY|WAGES?\b|STIPEND|CAMPAIGN MANAGER"
+     r"|COORDINATOR|CANVASS"),
+    ("Consulting", r"CONSULT|STRATEG|\bPOLL|SURVEY|RESEARCH|ADVISOR"),
+    ("Advertising", r"\bADS?\b|ADVERTIS|FACEBOOK|\bMETA\b|GOOGLE|RADIO"
+     r"|\bTV\b|TELEVISION|NEWSPAPER|DIGITAL|SIGNS?\b|BANNER|MAILERS?\b"
+     r"|MAILING|\bPRINT|BROCHURE|POSTCARD|LITERATURE|BUTTONS|STICKERS"
+     r"|MEDIA"),
+    ("Postage & shipping", r"POSTAGE|STAMPS|\bUSPS\b|\bPO BOX\b|SHIPPING"
+     r"|\bFEDEX\b|\bUPS\b"),
+    ("Travel", r"AIRFARE|AIRLINE|ALASKA AIR|TRAVEL|LODGING|HOTEL|MILEAGE"
+     r"|\bFUEL\b|\bGAS\b|RENTAL CAR|CAR RENTAL|TAXI|\bUBER\b|FERRY"
+     r"|PER DIEM"),
+    ("Fundraising & events", r"FUNDRAIS|\bEVENTS?\b|CATERING|\bFOOD\b"
+     r"|VENUE|TICKETS?\b|RECEPTION|MEETING|REFRESHMENTS|BEVERAGES"),
+    ("Office & technology", r"OFFICE|SUPPLIES|\bRENT\b|PHONE|INTERNET"
+     r"|WEBSITE|WEB SITE|DOMAIN|HOSTING|SOFTWARE|COMPUTER|UTILITIES"),
+    ("Fees", r"\bFEES?\b|PROCESSING|ACTBLUE|STRIPE|PAYPAL|ANEDOT|SQUARE"
+     r"|BANK CHARGE|SERVICE CHARGE|MERCHANT"),
+    ("Donations", r"DONATION|CONTRIBUTION|CHARITY|SPONSORSHIP"),
+    ("Not reported", r"^$"),
+]
+
+# Classifies one normalized purpose with the rules above
+classify_purpose = keyword_classifier(expense_rules)
+
+
+def purpose_categories(
+        purposes: pd.Series,
+        mapping: dict | None = None
+        ):
+    """Return a Series with the spending category of each purpose.
+
+    Parameters
+    ----------
+    purposes :
+        The "purpose_of_expenditure" column.
+    mapping :
+        Known purpose key to category results, which is updated in place.
+    """
+    return classify_distinct(purposes, classify_purpose, mapping)
+
+
+def spending_by_category(
+        df: pd.DataFrame,
+        mapping: dict | None = None
+        ):
+    """Return a dataframe with one row per candidate, with "district" and
+    "candidate_name" columns followed by the candidate's total spending in
+    each category, largest categories first, and a "total" column.
+
+    Parameters
+    ----------
+    df :
+        The expenditures to total, with "district", "candidate_name",
+        "amount" and "purpose_of_expenditure" columns.
+    mapping :
+        Known purpose key to category results, which is updated in place.
+    """
+    labeled = df.assign(
+        category=purpose_categories(df.purpose_of_expenditure, mapping))
+    table = labeled.pivot_table(
+        index=["district", "candidate_name"], columns="category",
+        values="amount", aggfunc="sum", fill_value=0)
+    # Expenditures are negative, so the biggest categories have the lowest
+    # totals
+    table = table[table.sum().sort_values().index]
+    table["total"] = table.sum(axis=1)
+    table.columns.name = None
+    return table.reset_index()
@@ -0,0 +1,94 @@
+"""The content-addressed cache that downloaded exports and parsed
+dataframes are kept in.
+
+Every object is stored under the SHA-256 of the export it came from, in
+cache/objects/: the export itself as <digest>.csv, and each way it's been
+parsed as <digest>.<variant>.pkl, so an export that hasn't changed is never
+parsed again. apoc/fetcher.py fills the cache from the network; this module
+only needs the standard library, and pandas once a dataframe is read, so the
+pipeline can use the cache without importing httpx.
+"""
+
+import hashlib
+import os
+
+
+# Where downloaded exports, parsed dataframes and the cache index live.
+cache_directory = "cache"
+
+# How many bytes to read from the network or disk at a time.
+chunk_size = 1 << 16
+
+
+def file_digest(
+        file_path: str
+        ):
+    """Return the SHA-256 hex digest of the given file's contents.
+
+    Parameters
+    ----------
+    file_path :
+        The path of the file to hash.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_object_path(
+        cache_dir: str,
+        sha256: str,
+        suffix: str
+        ):
+    """Return the path of a cached object.
+
+    Parameters
+    ----------
+    cache_dir :
+        The cache directory.
+    sha256 :
+        The digest of the export the object came from.
+    suffix :
+        The object's suffix, such as ".csv" or ".<variant>.pkl".
+    """
+    return os.path.join(cache_dir, "objects", f"{sha256}{suffix}")
+
+
+def cached_read(
+        file_path: str,
+        reader,
+        cache_dir: str = cache_directory,
+        variant: str = ""
+        ):
+    """Return the dataframe reader(file_path) would return, parsing the file
+    only if a file with the same contents hasn't been parsed before.
+
+    Parameters
+    ----------
+    file_path :
+        The path of the .csv file to read.
+    reader :
+        The function that parses the file, such as read_function.
+    cache_dir :
+        The cache directory to keep parsed dataframes in.
+    variant :
+        A name for the way reader parses the file, such as the key of a read
+        plan, so that different ways of reading the same file are cached
+        separately.
+    """
+    import pandas as pd
+
+    os.makedirs(os.path.join(cache_dir, "objects"), exist_ok=True)
+    suffix = f".{variant}.pkl" if variant else ".pkl"
+    pickle_path = cached_object_path(cache_dir, file_digest(file_path),
+                                     suffix)
+    if os.path.exists(pickle_path):
+        print(f"{file_path} is unchanged since it was last parsed, "
+              "using the cached data frame.")
+        print("")
+        return pd.read_pickle(pickle_path)
+    df = reader(file_path)
+    df.to_pickle(pickle_path)
+    return df
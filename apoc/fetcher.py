@@ -0,0 +1,243 @@
+"""Downloads APOC campaign finance exports and keeps a local cache of them.
+
+Each finished download is stored under the SHA-256 of its contents, and the
+cache index remembers the ETag and Last-Modified headers the server sent for
+each URL. The next request for that URL is conditional, so an export that
+hasn't changed comes back as a 304 and is never downloaded again. The
+objects themselves, and the parsed dataframes kept next to them, live in
+apoc/export_cache.py, which doesn't need httpx.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import time
+from urllib.parse import urlparse
+
+import httpx
+
+from apoc.export_cache import (cache_directory, cached_object_path,
+                               chunk_size, file_digest)
+
+
+def _read_index(cache_dir: str):
+    """Return the cache index, or an empty index if there isn't one yet."""
+    index_path = os.path.join(cache_dir, "index.json")
+    if not os.path.exists(index_path):
+        return {}
+    with open(index_path) as f:
+        return json.load(f)
+
+
+def _write_index(cache_dir: str, index: dict):
+    """Atomically replace the cache index."""
+    index_path = os.path.join(cache_dir, "index.json")
+    with open(index_path + ".tmp", "w") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    os.replace(index_path + ".tmp", index_path)
+
+
+async def fetch_export(
+        client: httpx.AsyncClient,
+        url: str,
+        cache_dir: str = cache_directory,
+        destination: str | None = None,
+        retries: int = 3
+        ):
+    """Download one export into the cache, and return a dictionary
+    describing the result.
+
+    The request carries If-None-Match/If-Modified-Since when the URL has been
+    fetched before, so an unchanged export costs one 304 response. Bytes are
+    streamed into a partial file; if the connection drops, the next attempt
+    asks for the rest of the file with a Range request instead of starting
+    over. The returned dictionary has the keys "url", "path", "sha256" and
+    "status", where status is "downloaded", "resumed" or "not modified".
+
+    Parameters
+    ----------
+    client :
+        The httpx client to send requests with.
+    url :
+        The URL of the export.
+    cache_dir :
+        The cache directory to store the export in.
+    destination :
+        If given, a directory to also copy the export into, such as
+        "input_csvs". The copy is named after the last part of the URL.
+    retries :
+        How many times to resume an interrupted download before giving up.
+    """
+    os.makedirs(os.path.join(cache_dir, "objects"), exist_ok=True)
+    os.makedirs(os.path.join(cache_dir, "partial"), exist_ok=True)
+
+    index = _read_index(cache_dir)
+    entry = index.get(url, {})
+    url_key = hashlib.sha256(url.encode()).hexdigest()[:16]
+    part_path = os.path.join(cache_dir, "partial", f"{url_key}.part")
+    part_meta_path = part_path + ".json"
+
+    status = "downloaded"
+    attempt = 0
+    while True:
+        headers = {}
+
+        # Only send validators if the cached copy is actually still there
+        if entry and os.path.exists(
+                cached_object_path(cache_dir, entry["sha256"], ".csv")):
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        # Picks up where an interrupted download left off, as long as the
+        # server can tell us whether the file changed in the meantime
+        resume_from = 0
+        part_meta = {}
+        if os.path.exists(part_path) and os.path.exists(part_meta_path):
+            with open(part_meta_path) as f:
+                part_meta = json.load(f)
+            validator = part_meta.get("etag") or part_meta.get("last_modified")
+            if validator:
+                resume_from = os.path.getsize(part_path)
+                headers["Range"] = f"bytes={resume_from}-"
+                headers["If-Range"] = validator
+
+        try:
+            async with client.stream("GET", url, headers=headers) as response:
+                if response.status_code == 304:
+                    return _finish(url, entry["sha256"], "not modified",
+                                   cache_dir, destination)
+
+                if response.status_code == 416:
+                    # The partial file is already complete or is bogus, so
+                    # throw it away and ask for the whole export again
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(part_path)
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(part_meta_path)
+                    continue
+
+                response.raise_for_status()
+
+                if response.status_code == 206:
+                    mode = "ab"
+                    status = "resumed"
+                else:
+                    # A plain 200 means the server sent the whole file, either
+                    # because we didn't ask for a range or because it changed
+                    mode = "wb"
+                    part_meta = {
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified")
+                    }
+                    with open(part_meta_path, "w") as f:
+                        json.dump(part_meta, f)
+
+                with open(part_path, mode) as f:
+                    async for chunk in response.aiter_bytes(chunk_size):
+                        f.write(chunk)
+            break
+        except httpx.TransportError:
+            attempt += 1
+            if attempt > retries:
+                raise
+            print(f"Download of {url} was interrupted, resuming...")
+
+    sha256 = file_digest(part_path)
+    object_path = cached_object_path(cache_dir, sha256, ".csv")
+    if os.path.exists(object_path):
+        # Same bytes under a new URL or new headers; keep the existing copy
+        os.remove(part_path)
+    else:
+        os.replace(part_path, object_path)
+    os.remove(part_meta_path)
+
+    # Re-reads the index, since other downloads may have finished while this
+    # one was waiting on the network
+    index = _read_index(cache_dir)
+    index[url] = {
+        "etag": part_meta.get("etag"),
+        "last_modified": part_meta.get("last_modified"),
+        "sha256": sha256,
+        "fetched": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+    _write_index(cache_dir, index)
+
+    return _finish(url, sha256, status, cache_dir, destination)
+
+
+def _finish(url: str, sha256: str, status: str, cache_dir: str,
+            destination: str | None):
+    """Copy a cached export to its destination, if it has one, and return
+    the result dictionary for fetch_export()."""
+    path = cached_object_path(cache_dir, sha256, ".csv")
+    if destination is not None:
+        os.makedirs(destination, exist_ok=True)
+        file_name = os.path.basename(urlparse(url).path) or f"{sha256}.csv"
+        destination_path = os.path.join(destination, file_name)
+        if not os.path.exists(destination_path) \
+                or file_digest(destination_path) != sha256:
+            shutil.copyfile(path, destination_path)
+        path = destination_path
+    return {"url": url, "path": path, "sha256": sha256, "status": status}
+
+
+async def fetch_exports(
+        urls: list,
+        cache_dir: str = cache_directory,
+        destination: str | None = None,
+        max_connections: int = 4
+        ):
+    """Download several exports concurrently, and return a list with one
+    result dictionary per URL, in the same order as the URLs.
+
+    Parameters
+    ----------
+    urls :
+        The URLs of the exports to download.
+    cache_dir :
+        The cache directory to store the exports in.
+    destination :
+        If given, a directory to also copy the exports into.
+    max_connections :
+        The most downloads to run at once.
+    """
+    limits = httpx.Limits(max_connections=max_connections)
+    timeout = httpx.Timeout(60.0, connect=10.0)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout,
+                                 follow_redirects=True) as client:
+        return await asyncio.gather(*[
+            fetch_export(client, url, cache_dir, destination) for url in urls
+            ])
+
+
+def download_exports(
+        urls: list,
+        destination: str | None = "input_csvs",
+        cache_dir: str = cache_directory
+        ):
+    """Download the given exports, print what happened to each one, and
+    return the list of result dictionaries from fetch_exports().
+
+    Parameters
+    ----------
+    urls :
+        The URLs of the exports to download.
+    destination :
+        A directory to also copy the exports into. Defaults to "input_csvs".
+    cache_dir :
+        The cache directory to store the exports in.
+    """
+    print("Attempting to download APOC exports...")
+    download_start = time.time()
+    results = asyncio.run(fetch_exports(urls, cache_dir, destination))
+    download_end = time.time()
+    for result in results:
+        print(f"{result['url']}: {result['status']} ({result['sha256'][:12]})")
+    print(f"Download took {round(download_end - download_start, 5)} seconds.")
+    print("")
+    return results
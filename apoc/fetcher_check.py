@@ -0,0 +1,102 @@
+"""Checks the export fetcher against the local stand-in server, offline.
+
+Serves a small fixture export from a temporary directory with
+apoc.fixture_server, and checks that fetch_exports():
+
+- resumes a download that was cut off part way through,
+- gets a 304 for an export that hasn't changed, and doesn't download it,
+- downloads an export again once it has changed, and
+- starts over when the server answers a resumed download with a 416.
+
+Run it from the command line with
+
+    python -m apoc.fetcher_check
+
+It prints each check as it passes, and raises an AssertionError at the
+first one that fails.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+
+from apoc.fetcher import fetch_exports, file_digest
+from apoc.fixture_server import start_fixture_server
+
+
+# The fixture export's name and contents. It only has to be longer than
+# drop_after, so the first download is cut off.
+fixture_name = "CD_Transactions_fixture.csv"
+fixture_rows = 2000
+drop_after = 1000
+
+
+def _write_fixture(file_path: str, rows: int):
+    """Write a fixture export with the given number of rows."""
+    with open(file_path, "w") as f:
+        f.write("Result,Date,Amount,Name\n")
+        for i in range(rows):
+            f.write(f"{100000 + i},10/01/2024,${i}.00,Candidate {i % 7}\n")
+
+
+def _expect(result: dict, status: str, sha256: str):
+    """Raise an AssertionError unless the fetch result has the given status
+    and digest, and print that the check passed."""
+    if result["status"] != status or result["sha256"] != sha256:
+        raise AssertionError(
+            f"Expected {status!r} ({sha256[:12]}), got "
+            f"{result['status']!r} ({result['sha256'][:12]}).")
+    print(f"{status}: ok")
+
+
+def check_fetcher():
+    """Run every check against a fixture server in a temporary directory."""
+    with tempfile.TemporaryDirectory() as directory:
+        served = os.path.join(directory, "served")
+        cache_dir = os.path.join(directory, "cache")
+        os.makedirs(served)
+        fixture_path = os.path.join(served, fixture_name)
+        _write_fixture(fixture_path, fixture_rows)
+
+        server, base_url = start_fixture_server(served, drop_after=drop_after)
+        url = f"{base_url}/{fixture_name}"
+        try:
+            # The first download is dropped after drop_after bytes, and the
+            # retry asks for the rest
+            [result] = asyncio.run(fetch_exports([url], cache_dir))
+            _expect(result, "resumed", file_digest(fixture_path))
+            if file_digest(result["path"]) != result["sha256"]:
+                raise AssertionError("The resumed download is corrupt.")
+
+            [result] = asyncio.run(fetch_exports([url], cache_dir))
+            _expect(result, "not modified", file_digest(fixture_path))
+
+            # A changed export has a new ETag, so the old one doesn't match
+            _write_fixture(fixture_path, fixture_rows + 1)
+            [result] = asyncio.run(fetch_exports([url], cache_dir))
+            _expect(result, "downloaded", file_digest(fixture_path))
+
+            # A partial file as long as the whole export gets a 416, after
+            # which the fetcher throws it away and starts over. The cached
+            # copy is removed first, or the request would be a conditional
+            # GET answered with a 304.
+            with open(os.path.join(cache_dir, "index.json")) as f:
+                entry = json.load(f)[url]
+            os.remove(os.path.join(cache_dir, "objects",
+                                   f"{entry['sha256']}.csv"))
+            url_key = hashlib.sha256(url.encode()).hexdigest()[:16]
+            part_path = os.path.join(cache_dir, "partial", f"{url_key}.part")
+            _write_fixture(part_path, fixture_rows + 1)
+            with open(part_path + ".json", "w") as f:
+                json.dump({"etag": entry["etag"],
+                           "last_modified": entry["last_modified"]}, f)
+            [result] = asyncio.run(fetch_exports([url], cache_dir))
+            _expect(result, "downloaded", file_digest(fixture_path))
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    check_fetcher()
@@ -0,0 +1,136 @@
+"""A small local stand-in for the APOC download site.
+
+Serves the files in one directory over HTTP with the same caching behaviour
+the real site is expected to have: ETag and Last-Modified headers,
+conditional GETs answered with 304, and Range requests answered with 206.
+It can also cut a response off part way through, so interrupted and resumed
+downloads can be tried out without a network connection.
+
+Run it from the command line with
+
+    python -m apoc.fixture_server input_csvs 8000
+
+and point apoc_export_urls in main_program.py at
+http://127.0.0.1:8000/<file name>.
+"""
+
+import email.utils
+import hashlib
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _make_handler(directory: str, drop_after: int | None):
+    """Return a request handler class serving the given directory."""
+
+    # drop_after only applies to the first full download of each file, so the
+    # retry that follows can succeed
+    dropped = set()
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            file_path = os.path.join(directory,
+                                     os.path.basename(self.path.split("?")[0]))
+            if not os.path.isfile(file_path):
+                self.send_error(404)
+                return
+
+            with open(file_path, "rb") as f:
+                body = f.read()
+            etag = f"\"{hashlib.sha256(body).hexdigest()[:32]}\""
+            mtime = int(os.path.getmtime(file_path))
+            last_modified = email.utils.formatdate(mtime, usegmt=True)
+
+            # Conditional GET
+            if_none_match = self.headers.get("If-None-Match")
+            if_modified_since = self.headers.get("If-Modified-Since")
+            not_modified = False
+            if if_none_match is not None:
+                not_modified = if_none_match == etag
+            elif if_modified_since is not None:
+                since = email.utils.parsedate_to_datetime(if_modified_since)
+                not_modified = mtime <= since.timestamp()
+            if not_modified:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", last_modified)
+                self.end_headers()
+                return
+
+            # Range requests, honoured only if If-Range still matches
+            start = 0
+            range_header = self.headers.get("Range")
+            if_range = self.headers.get("If-Range")
+            if range_header and if_range in (None, etag, last_modified):
+                start = int(range_header.split("=")[1].split("-")[0])
+                if start >= len(body):
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{len(body)}")
+                    self.end_headers()
+                    return
+                self.send_response(206)
+                self.send_header("Content-Range",
+                                 f"bytes {start}-{len(body) - 1}/{len(body)}")
+            else:
+                self.send_response(200)
+            payload = body[start:]
+
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+
+            if drop_after is not None and start == 0 \
+                    and file_path not in dropped:
+                dropped.add(file_path)
+                self.wfile.write(payload[:drop_after])
+                self.wfile.flush()
+                self.close_connection = True
+                return
+            self.wfile.write(payload)
+
+    return FixtureHandler
+
+
+def start_fixture_server(
+        directory: str,
+        port: int = 0,
+        drop_after: int | None = None
+        ):
+    """Start serving the given directory on a background thread, and return
+    the server and its base URL. Call server.shutdown() to stop it.
+
+    Parameters
+    ----------
+    directory :
+        The directory of fixture .csv files to serve.
+    port :
+        The port to listen on. The default of 0 picks any free port.
+    drop_after :
+        If given, the first full download of each file is cut off after this
+        many bytes, to simulate a dropped connection.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port),
+                                 _make_handler(directory, drop_after))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else "input_csvs"
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+    server, base_url = start_fixture_server(directory, port)
+    print(f"Serving {directory} at {base_url}, press Ctrl+C to stop.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,159 @@
+"""Where each candidate's money comes from: their own district, elsewhere in
+Alaska, or outside the state.
+
+ZIP codes and states are normalized once for the whole frame, in vectorized
+form. ZIP codes are then turned into House districts through an integer index
+with one slot for every possible five-digit ZIP, so the lookup is a single
+array read per row instead of a join. Senate districts follow from House
+districts, since Senate district A is House Districts 1 and 2, B is 3 and 4,
+and so on.
+
+The ZIP to district table isn't shipped with this repository. Put a .csv
+with "zip", "borough" and "house_district" columns at zip_lookup_path to get
+in-district totals; without it, every Alaska donation counts as in-state.
+A ZIP that spans district lines should be listed once, with the district
+most of its residents live in.
+"""
+
+import os
+import string
+
+import numpy as np
+import pandas as pd
+
+
+# The ZIP to borough and House district lookup table.
+zip_lookup_path = "input_csvs/zip_districts.csv"
+
+# Spelled-out state names that show up in the State column.
+state_abbreviations = {
+    "ALASKA": "AK",
+    "WASHINGTON": "WA",
+    "OREGON": "OR",
+    "CALIFORNIA": "CA",
+}
+
+# Where a transaction's money came from, relative to the candidate.
+buckets = ["in_district", "in_state", "out_of_state", "unknown"]
+
+# Alaska's ZIP codes run from 99501 to 99950.
+alaska_zip_range = (99501, 99950)
+
+
+def normalize_zip5(
+        zips: pd.Series
+        ):
+    """Return an integer array with the five-digit ZIP of each entry, or -1
+    where there isn't one. ZIP+4 codes are cut down to five digits.
+
+    Parameters
+    ----------
+    zips :
+        The "zip" column.
+    """
+    zip5 = zips.astype("string").str.extract(r"^\s*(\d{5})", expand=False)
+    return pd.to_numeric(zip5, errors="coerce").fillna(-1)\
+        .astype(np.int64).to_numpy()
+
+
+def normalize_state(
+        states: pd.Series,
+        zip5: np.ndarray
+        ):
+    """Return an array with the two-letter state of each entry, or "" where
+    it isn't known. A missing state is filled in as "AK" when the ZIP is an
+    Alaska ZIP.
+
+    Parameters
+    ----------
+    states :
+        The "state" column.
+    zip5 :
+        The normalized ZIPs from normalize_zip5().
+    """
+    state = states.fillna("").astype(str).str.strip().str.upper()\
+        .replace(state_abbreviations)
+    in_alaska_range = (zip5 >= alaska_zip_range[0]) \
+        & (zip5 <= alaska_zip_range[1])
+    return np.where((state == "").to_numpy() & in_alaska_range, "AK",
+                    state.to_numpy())
+
+
+def load_zip_index(
+        file_path: str = zip_lookup_path
+        ):
+    """Return an array with 100,000 entries, where the entry at each ZIP is
+    that ZIP's House district, or -1 if the ZIP isn't in the table. Returns
+    None if there is no table.
+
+    Parameters
+    ----------
+    file_path :
+        The path of the ZIP lookup table.
+    """
+    if not os.path.exists(file_path):
+        return None
+    table = pd.read_csv(file_path, dtype={"zip": str})
+    zip5 = normalize_zip5(table.zip)
+    valid = zip5 >= 0
+    zip_index = np.full(100_000, -1, dtype=np.int16)
+    zip_index[zip5[valid]] = table.house_district.to_numpy()[valid]
+    return zip_index
+
+
+def geographic_rollup(
+        df: pd.DataFrame,
+        chamber: str,
+        zip_index: np.ndarray | None
+        ):
+    """Return a dataframe with one row per candidate and the total and
+    count of their transactions from inside their district, elsewhere in
+    Alaska, outside Alaska, and from unknown places.
+
+    Parameters
+    ----------
+    df :
+        The transactions to roll up, such as one chamber's cash donations for
+        a report. Needs "candidate_name", "district", "amount", "state" and
+        "zip" columns.
+    chamber :
+        "house" or "senate", which says how to read the district column.
+    zip_index :
+        The ZIP index from load_zip_index(), or None if there isn't one.
+    """
+    zip5 = normalize_zip5(df.zip)
+    state = normalize_state(df.state, zip5)
+
+    in_state = state == "AK"
+    bucket = np.where(in_state, 1, np.where(state == "", 3, 2))
+
+    if zip_index is not None:
+        # Looks every ZIP up at once; unknown ZIPs land on district -1
+        zip_district = np.where(zip5 >= 0, zip_index[np.clip(zip5, 0, None)],
+                                -1)
+        if chamber == "house":
+            candidate_district = pd.to_numeric(
+                df.district, errors="coerce").fillna(-2).to_numpy()
+            in_district = zip_district == candidate_district
+        else:
+            letters = np.array(list(string.ascii_uppercase[:20]))
+            zip_senate = np.where(zip_district > 0,
+                                  letters[np.clip(zip_district - 1, 0, 39) // 2],
+                                  "")
+            in_district = zip_senate == df.district.astype(str).to_numpy()
+        bucket = np.where(in_state & in_district, 0, bucket)
+
+    rollup = df.assign(bucket=pd.Categorical.from_codes(bucket, buckets))\
+        .groupby(["district", "candidate_name", "bucket"], observed=False)\
+        .amount.agg(["sum", "count"])\
+        .unstack("bucket", fill_value=0)
+    rollup.columns = [f"{bucket_name}_{statistic}".replace("sum", "total")
+                      for statistic, bucket_name in rollup.columns]
+    rollup = rollup.reset_index()
+
+    # Drops the empty candidate and district combinations unstack filled in
+    counts = rollup[[f"{name}_count" for name in buckets]].sum(axis=1)
+    rollup = rollup[counts > 0]
+    return rollup[["district", "candidate_name"]
+                  + [f"{name}_{statistic}" for name in buckets
+                     for statistic in ["total", "count"]]]
@@ -0,0 +1,218 @@
+"""Groups donations by the industry their donors work in.
+
+Employer and occupation are free text, so they're first reduced to
+normalized keys, and each distinct key is classified once with the keyword
+rules below. The key to industry mapping is saved to disk, so later runs on
+new exports only classify strings they have never seen before; every row is
+then labeled by looking its keys up in that mapping, not by running the
+rules again.
+
+A donation is labeled with its donor's status if they are retired or not
+employed, otherwise with the industry of their employer, otherwise the
+industry of their occupation, and otherwise as self-employed, other or not
+reported.
+
+Changing the rules changes rules_version, which throws away the saved
+mapping, so every key is classified again with the new rules. Check the
+rules against industry_rule_examples with
+
+    python -m apoc.industry
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from apoc.normalize import classify_distinct, keyword_classifier
+
+
+# Where the key to industry mapping is kept between runs.
+industry_map_path = "cache/industry_map.json"
+
+# Keyword rules for normalized employers and occupations. The first rule in
+# the list that matches anywhere in the text decides the category, so short
+# keywords are bounded by \b, or they'd match inside job titles such as
+# "PRESIDENT" ("DENT") and other industries' names such as "CREDIT UNION".
+industry_rules = [
+    ("Not reported", r"^$|^N ?A$|^NONE GIVEN$|^UNKNOWN$|REQUESTED|^NOT PROVIDED$"),
+    ("Retired", r"\bRETIRED\b|\bRETIREE\b"),
+    ("Not employed", r"^NONE$|UNEMPLOYED|NOT EMPLOYED|HOMEMAKER|STUDENT"),
+    ("Self-employed", r"^SELF\b|SELF EMPLOYED|SELFEMPLOYED|^OWNER$"
+     r"|INDEPENDENT CONTRACTOR"),
+    ("Oil, gas & mining", r"\bOIL\b|\bGAS\b|PETROLEUM|CONOCO|HILCORP|\bBP\b"
+     r"|EXXON|SANTOS|MINING|\bMINE\b|PEBBLE"),
+    ("Fishing & seafood", r"FISH(?!\w*( AND)? GAME)|SEAFOOD|CANNER|TRAWL"),
+    ("Alaska Native corporations", r"NATIVE|\bASRC\b|DOYON|SEALASKA|CALISTA"
+     r"|\bNANA\b|\bCIRI\b|AHTNA|KONIAG|CHUGACH|ARCTIC SLOPE|BRISTOL BAY"),
+    ("Government", r"STATE OF ALASKA|MUNICIPALITY|CITY OF|BOROUGH"
+     r"|\bFEDERAL\b(?! EXPRESS| CREDIT)|\bUS ARMY\b|MILITARY|AIR FORCE"
+     r"|LEGISLAT|GOVERNMENT|\bSOA\b|FISH( AND)? GAME"),
+    ("Education", r"SCHOOL|UNIVERSITY|TEACHER|PROFESSOR|EDUCAT|\bUAA\b"
+     r"|\bUAF\b|COLLEGE"),
+    ("Health care", r"HOSPITAL|HEALTH|MEDICAL|\bNURS(E|ES|ING)\b|PHYSICIAN"
+     r"|DOCTOR|\bDENT(AL|IST|ISTRY)\b|CLINIC|PHARMAC|\bRN\b|\bMD\b"),
+    ("Legal", r"ATTORNEY|\bLAW\b|LAWYER|LEGAL|PARALEGAL"),
+    ("Labor unions", r"(?<!CREDIT )\bUNION\b(?! BANK)|\bLOCAL \d+|IBEW"
+     r"|TEAMSTERS|\bAFL\b|LABORERS"),
+    ("Construction & trades", r"CONSTRUCT|CONTRACTOR|ELECTRIC|PLUMB"
+     r"|CARPENT|ENGINEER|WELDER|OPERATOR"),
+    ("Finance, insurance & real estate", r"\bBANK|CREDIT UNION|REAL ESTATE"
+     r"|REALTOR|INSURANCE|FINANC|INVEST|ACCOUNT|\bCPA\b"),
+    ("Transportation & tourism", r"\bAIR\b|AIRLINE|AVIATION|PILOT|TOURIS"
+     r"|LODGE|TRANSPORT|SHIPPING|RAILROAD|TRUCK"),
+    ("Business & consulting", r"CONSULT|MANAGER|\bLLC\b|\bINC\b|BUSINESS"
+     r"|\bCORP\b|COMPANY|EXECUTIVE|\bCEO\b|PRESIDENT"),
+]
+
+# Normalized keys and the categories the rules must give them, including
+# ones earlier rules got wrong. check_industry_rules() runs them.
+industry_rule_examples = [
+    ("PRESIDENT", "Business & consulting"),
+    ("VICE PRESIDENT", "Business & consulting"),
+    ("RESIDENT", "Other"),
+    ("INDEPENDENT CONTRACTOR", "Self-employed"),
+    ("DENTIST", "Health care"),
+    ("DENTAL HYGIENIST", "Health care"),
+    ("ALASKA USA FEDERAL CREDIT UNION", "Finance, insurance & real estate"),
+    ("CREDIT UNION 1", "Finance, insurance & real estate"),
+    ("FEDERAL EXPRESS", "Other"),
+    ("FEDERAL AVIATION ADMINISTRATION", "Government"),
+    ("ALASKA DEPT OF FISH AND GAME", "Government"),
+    ("COMMERCIAL FISHERMAN", "Fishing & seafood"),
+    ("IBEW LOCAL 1547", "Labor unions"),
+    ("NEA ALASKA UNION", "Labor unions"),
+    ("NURSERY", "Other"),
+    ("REGISTERED NURSE", "Health care"),
+]
+
+# Categories that describe a donor's situation rather than an industry.
+status_categories = ["Retired", "Not employed"]
+fallback_categories = ["Self-employed", "Other", "Not reported"]
+
+# Classifies one normalized key with the rules above
+classify_key = keyword_classifier(industry_rules)
+
+# Identifies the rules, so a saved mapping made with different rules is
+# thrown away instead of reused
+rules_version = hashlib.sha256(
+    json.dumps(industry_rules).encode()).hexdigest()[:12]
+
+
+def load_industry_map(
+        file_path: str = industry_map_path
+        ):
+    """Return the saved key to industry mapping, or an empty one if there
+    isn't one or it was made with different rules.
+
+    Parameters
+    ----------
+    file_path :
+        The path of the saved mapping.
+    """
+    if not os.path.exists(file_path):
+        return {}
+    with open(file_path) as f:
+        saved = json.load(f)
+    if saved.get("rules_version") != rules_version:
+        return {}
+    return saved["mapping"]
+
+
+def save_industry_map(
+        mapping: dict,
+        file_path: str = industry_map_path
+        ):
+    """Save the key to industry mapping.
+
+    Parameters
+    ----------
+    mapping :
+        The mapping to save.
+    file_path :
+        The path to save it to.
+    """
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    with open(file_path + ".tmp", "w") as f:
+        json.dump({"rules_version": rules_version, "mapping": mapping}, f)
+    os.replace(file_path + ".tmp", file_path)
+
+
+def check_industry_rules():
+    """Raise an AssertionError listing every example in
+    industry_rule_examples that the rules classify differently."""
+    wrong = [f"{key!r} is {classify_key(key)!r}, not {expected!r}"
+             for key, expected in industry_rule_examples
+             if classify_key(key) != expected]
+    if wrong:
+        raise AssertionError("; ".join(wrong))
+
+
+def industry_labels(
+        df: pd.DataFrame,
+        mapping: dict
+        ):
+    """Return a Series with the industry label of each transaction, combining
+    the employer and occupation categories as described at the top of this
+    module.
+
+    Parameters
+    ----------
+    df :
+        Transactions with "employer" and "occupation" columns.
+    mapping :
+        The key to industry mapping, which is updated in place.
+    """
+    employer = classify_distinct(df.employer, classify_key, mapping)\
+        .to_numpy()
+    occupation = classify_distinct(df.occupation, classify_key, mapping)\
+        .to_numpy()
+    not_industry = status_categories + fallback_categories
+
+    employer_industry = ~np.isin(employer, not_industry)
+    occupation_industry = ~np.isin(occupation, not_industry)
+    labels = np.select(
+        [
+            np.isin(employer, status_categories),
+            np.isin(occupation, status_categories),
+            employer_industry,
+            occupation_industry,
+            (employer == "Self-employed") | (occupation == "Self-employed"),
+            (employer == "Other") | (occupation == "Other"),
+        ],
+        [employer, occupation, employer, occupation, "Self-employed",
+         "Other"],
+        default="Not reported")
+    return pd.Series(labels, index=df.index)
+
+
+def industry_rollup(
+        df: pd.DataFrame,
+        mapping: dict
+        ):
+    """Return two dataframes of donation totals and counts by industry: one
+    per candidate, with "district", "candidate_name", "industry", "total"
+    and "count" columns, and one per district, without "candidate_name".
+
+    Parameters
+    ----------
+    df :
+        The donations to roll up, with "district", "candidate_name",
+        "amount", "employer" and "occupation" columns.
+    mapping :
+        The key to industry mapping, which is updated in place.
+    """
+    labeled = df.assign(industry=industry_labels(df, mapping))
+    by_candidate = labeled.groupby(["district", "candidate_name", "industry"])\
+        .amount.agg(total="sum", count="count").reset_index()
+    by_district = labeled.groupby(["district", "industry"])\
+        .amount.agg(total="sum", count="count").reset_index()\
+        .sort_values(["district", "total"], ascending=[True, False])
+    return by_candidate, by_district
+
+
+if __name__ == "__main__":
+    check_industry_rules()
+    print(f"All {len(industry_rule_examples)} industry rule examples pass.")
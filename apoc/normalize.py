@@ -0,0 +1,126 @@
+"""Vectorized normalization of the free-text name fields in APOC exports.
+
+The same donor, employer or payee shows up spelled many ways ("Self",
+"self-employed", "SELF EMPLOYED"). normalize_text() reduces each value to a
+key that ignores case, punctuation and spacing, so that grouping on the key
+puts those spellings together.
+"""
+
+import re
+
+import pandas as pd
+
+
+def normalize_text(
+        values: pd.Series
+        ):
+    """Return a Series of normalized keys: upper case, with every run of
+    punctuation and whitespace collapsed into a single space, and missing
+    values turned into "".
+
+    Parameters
+    ----------
+    values :
+        The text to normalize, such as the "employer" column.
+    """
+    return values.fillna("").astype(str).str.upper()\
+        .str.replace(r"[^A-Z0-9]+", " ", regex=True).str.strip()
+
+
+def normalize_distinct(
+        values: pd.Series
+        ):
+    """Return the same keys as normalize_text(), but only normalize each
+    distinct value once. Much faster on columns with a lot of repetition.
+
+    Parameters
+    ----------
+    values :
+        The text to normalize.
+    """
+    codes, uniques = pd.factorize(values.fillna(""), use_na_sentinel=False)
+    keys = normalize_text(pd.Series(uniques, dtype=object)).to_numpy()
+    return pd.Series(keys[codes], index=values.index)
+
+
+def donor_keys(
+        df: pd.DataFrame
+        ):
+    """Return a key for each row's donor that puts the spellings of one
+    donor's name together, such as "John Q. Smith" and "JOHN Q SMITH": the
+    normalized donor name and, if the rows have a "zip" column, the first
+    five digits of the ZIP code, so that two donors with the same name in
+    different places stay apart.
+
+    Parameters
+    ----------
+    df :
+        Transactions with a "donor_full_name" column, and optionally "zip".
+    """
+    names = normalize_distinct(df.donor_full_name)
+    if "zip" not in df.columns:
+        return names
+    codes, uniques = pd.factorize(df.zip.fillna("").astype(str),
+                                  use_na_sentinel=False)
+    zips = pd.Series(uniques, dtype=object).str.extract(r"(\d{5})")[0]\
+        .fillna("").to_numpy()
+    return names + " " + pd.Series(zips[codes], index=df.index)
+
+
+def keyword_classifier(
+        rules: list,
+        default: str = "Other"
+        ):
+    """Return a function that classifies one normalized key with the given
+    rules. The rules are compiled into a single regex with one named group
+    per rule, so classifying a key is one match however many rules there
+    are. The first rule in the list that matches anywhere in the key wins.
+
+    Parameters
+    ----------
+    rules :
+        A list of (category, regex) pairs, in priority order.
+    default :
+        The category for keys no rule matches.
+    """
+    # Each rule is a lookahead from the start of the key, and alternatives
+    # are tried in order, so the first rule to match anywhere is the one
+    # whose group gets filled in
+    pattern = re.compile("^(?:" + "|".join(
+        f"(?=.*?(?P<rule{i}>{rule}))"
+        for i, (_, rule) in enumerate(rules)) + ")")
+
+    def classify(key: str):
+        match = pattern.match(key)
+        if match is None:
+            return default
+        return rules[int(match.lastgroup[4:])][0]
+
+    return classify
+
+
+def classify_distinct(
+        values: pd.Series,
+        classify,
+        mapping: dict | None = None
+        ):
+    """Return a Series with the category of each value, running classify
+    once per distinct normalized key instead of once per row.
+
+    Parameters
+    ----------
+    values :
+        The raw text to classify.
+    classify :
+        A function from a normalized key to a category, such as one made by
+        keyword_classifier().
+    mapping :
+        Known key to category results. Keys not in it are classified and
+        added to it, so it can be saved and reused between runs.
+    """
+    mapping = {} if mapping is None else mapping
+    keys = normalize_distinct(values)
+    for key in keys.unique():
+        if key not in mapping:
+            mapping[key] = classify(key)
+    return keys.map(mapping)
@@ -0,0 +1,113 @@
+"""Writes outputs as one file per district, with a manifest.
+
+write_partitions() takes outputs that are already in memory, text or
+dataframes keyed by the file name each one should go to, and writes them
+into a directory on a pool of threads, since the work is mostly waiting on
+the disk. Every file's row count and SHA-256 checksum is recorded in the
+directory's manifest.json, and listed in index.csv for people browsing the
+files. A partition whose checksum matches the manifest and whose file is
+still there isn't written again, so a rerun only touches the districts that
+changed.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+
+# The manifest and index file names inside a partition directory.
+manifest_name = "manifest.json"
+index_name = "index.csv"
+
+
+def _serialize(output):
+    """Return the bytes to write for a partition and its row count: lines of
+    text, or rows of a dataframe."""
+    if isinstance(output, pd.DataFrame):
+        return output.to_csv(index=False).encode(), len(output)
+    return output.encode(), output.count("\n")
+
+
+def load_manifest(
+        directory: str
+        ):
+    """Return the manifest of a partition directory, mapping each file name
+    to its "rows", "bytes" and "sha256", or an empty one if there isn't one.
+
+    Parameters
+    ----------
+    directory :
+        The partition directory.
+    """
+    manifest_path = os.path.join(directory, manifest_name)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def _write_partition(directory: str, name: str, output, known: dict | None):
+    """Write one partition unless it matches its manifest entry, and return
+    its new manifest entry and whether it was written."""
+    data, rows = _serialize(output)
+    entry = {"rows": rows, "bytes": len(data),
+             "sha256": hashlib.sha256(data).hexdigest()}
+    path = os.path.join(directory, name)
+    if known == entry and os.path.exists(path):
+        return entry, False
+
+    # Writes to a temporary file first, so a reader never sees half a file
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        f.write(data)
+    os.replace(path + ".tmp", path)
+    return entry, True
+
+
+def write_partitions(
+        partitions: dict,
+        directory: str,
+        workers: int = 8
+        ):
+    """Write each partition to its own file in the directory, skipping the
+    ones that haven't changed since they were last written, and update the
+    manifest and index. Partitions already in the manifest that aren't given
+    are left as they are. Returns the number of files written and skipped.
+
+    Parameters
+    ----------
+    partitions :
+        Maps each file name, relative to the directory, to the text or
+        dataframe to write to it.
+    directory :
+        The partition directory.
+    workers :
+        How many files to write at once.
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest = load_manifest(directory)
+
+    with ThreadPoolExecutor(workers) as pool:
+        futures = {
+            name: pool.submit(_write_partition, directory, name, output,
+                              manifest.get(name))
+            for name, output in partitions.items()}
+        results = {name: future.result() for name, future in futures.items()}
+
+    written = 0
+    for name, (entry, was_written) in results.items():
+        manifest[name] = entry
+        written += was_written
+
+    with open(os.path.join(directory, manifest_name + ".tmp"), "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(os.path.join(directory, manifest_name + ".tmp"),
+               os.path.join(directory, manifest_name))
+    pd.DataFrame.from_dict(manifest, orient="index")\
+        .rename_axis("file").reset_index()\
+        .to_csv(os.path.join(directory, index_name), index=False)
+
+    return written, len(partitions) - written
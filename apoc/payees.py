@@ -0,0 +1,107 @@
+"""Totals what every payee was paid, across every campaign.
+
+big_expense_frame() groups a campaign's expenditures by payee, so a
+consultant paid by twenty campaigns shows up twenty times in the big expense
+file. Here every House and Senate expenditure, from every report, is keyed
+by the payee's normalized name, so that "ACME MEDIA, LLC" and "Acme Media
+LLC" are one payee, and totaled per payee and campaign in a single grouped
+pass. The leaderboard is then a second, much smaller grouping of those
+per-campaign totals.
+
+Expenditures are negative in the exports. Totals here are what the payees
+were paid, so they're positive.
+"""
+
+import pandas as pd
+
+from apoc.normalize import normalize_distinct, normalize_text
+from apoc.stats_cube import transaction_categories
+
+
+def payee_breakdown(
+        df: pd.DataFrame
+        ):
+    """Return a dataframe with one row per payee and campaign, indexed by
+    "payee_key", "chamber" and "candidate_name" and sorted by them, with the amount
+    paid, the number of payments, the first and last payment dates and the
+    payee's name as the campaign spelled it most often.
+
+    Parameters
+    ----------
+    df :
+        Transactions with "candidate_name", "donor_full_name", "date",
+        "amount", "chamber", "district" and the columns
+        transaction_categories() reads.
+    """
+    expenses = df[transaction_categories(df) == 2]
+    expenses = expenses.assign(
+        payee_key=normalize_distinct(expenses.donor_full_name),
+        paid=-expenses.amount)
+    expenses = expenses[expenses.payee_key != ""]
+
+    # A candidate running for both chambers has a campaign in each
+    keys = ["payee_key", "chamber", "candidate_name"]
+    breakdown = expenses.groupby(keys).agg(
+        district=("district", "first"),
+        paid=("paid", "sum"),
+        payments=("paid", "count"),
+        first_date=("date", "min"),
+        last_date=("date", "max"),
+        )
+    # Each campaign's most common spelling, ties going to the first
+    # alphabetically
+    spellings = expenses.groupby(keys + ["donor_full_name"]).size()\
+        .rename("times").reset_index()\
+        .sort_values(keys + ["times", "donor_full_name"],
+                     ascending=[True, True, True, False, True])\
+        .drop_duplicates(keys).set_index(keys)
+    breakdown.insert(0, "payee", spellings.donor_full_name)
+    return breakdown.sort_index()
+
+
+def payee_leaderboard(
+        breakdown: pd.DataFrame
+        ):
+    """Return a dataframe with one row per payee, sorted by the total they
+    were paid, with the number of campaigns and payments that makes up, and
+    the payee's most common spelling across the campaigns.
+
+    Parameters
+    ----------
+    breakdown :
+        The dataframe from payee_breakdown().
+    """
+    grouped = breakdown.groupby(level="payee_key")
+    leaderboard = grouped.agg(
+        paid=("paid", "sum"),
+        campaigns=("paid", "count"),
+        payments=("payments", "sum"),
+        first_date=("first_date", "min"),
+        last_date=("last_date", "max"),
+        )
+    # The spelling of the campaign that paid the payee the most times
+    leaderboard.insert(0, "payee", breakdown.payee.loc[
+        breakdown.groupby(level="payee_key").payments.idxmax()]
+        .droplevel(["chamber", "candidate_name"]))
+    return leaderboard.sort_values(["paid", "payee"],
+                                   ascending=[False, True]).reset_index()
+
+
+def payee_lookup(
+        breakdown: pd.DataFrame,
+        payee: str
+        ):
+    """Return the per-campaign rows of payee_breakdown() for one payee,
+    however its name is spelled, or an empty dataframe if no campaign paid
+    them.
+
+    Parameters
+    ----------
+    breakdown :
+        The dataframe from payee_breakdown().
+    payee :
+        The payee's name.
+    """
+    key = normalize_text(pd.Series([payee])).iat[0]
+    # The breakdown is sorted by key, so slicing it is a binary search
+    return breakdown.loc[key:key]
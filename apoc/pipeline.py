@@ -0,0 +1,1261 @@
+"""The cleaned export and everything the outputs are built from, built
+lazily.
+
+Creating a Pipeline reads nothing. The cleaned dataframe, the House and
+Senate dataframes, the candidate dataframes and the statistics cubes are each
+built the first time something uses them, and kept on the pipeline, so a
+notebook can summarize one district without writing any of the batch
+outputs:
+
+    from apoc import Pipeline
+    pipeline = Pipeline("input_csvs/CD_Transactions_10-30-2024.csv")
+    pipeline.pick_a_district("house", 12, "Seven Day", "State General")
+
+Cleaned dataframes are also memoized for the life of the process, keyed by
+the contents of the input file and the way it was read, so a second pipeline
+over the same export skips cleaning and the fuzzy pass entirely. Treat
+big_df as read-only for that reason; the writers in apoc.writers only read
+from it.
+
+The statistics cubes are saved in the export cache, and later runs over the
+same export load them from there instead of building them again.
+"""
+
+import functools
+import hashlib
+import io
+import json
+import os
+import time
+from typing import TYPE_CHECKING
+
+from apoc import rosters
+from apoc.rosters import district_dictionary_generator, senate_districts
+
+# pandas and the modules that use it are imported where they're first
+# needed, so importing the package stays fast
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# The outputs a pipeline plans its read for when none are given. "everything"
+# reads every column and period, so any report can be summarized.
+default_outputs = ["everything"]
+
+# The columns of the big donation and big expense files.
+big_transaction_columns = [
+    "district", "candidate_name", "amount", "date", "donor_full_name",
+    "is_self", "address", "city", "state", "zip", "country", "employer",
+    "occupation", "payment_type", "payment_detail", "purpose_of_expenditure",
+    "submitted"
+]
+
+# Cleaned dataframes, and the amended transactions dropped from them, keyed
+# by the input file's digest, the read plan and the offices filled in.
+_cleaned_frames = {}
+
+
+class Pipeline:
+    """An APOC export and the dataframes and statistics cubes built from it,
+    each built on first use.
+
+    Parameters
+    ----------
+    input_file_path :
+        The APOC export to read.
+    election :
+        The election the batch outputs summarize, such as "State General".
+    report :
+        The report the batch outputs summarize, such as "Seven Day".
+    outputs :
+        The outputs to plan the read for; see output_requirements in
+        apoc/read_planner.py. Only the columns and rows they need are read.
+    office_fill_dictionary :
+        Candidates who filed without an office, and the office they're
+        running for.
+    nested_house_name_list :
+        The candidates in each House district, in district order.
+    nested_senate_name_list :
+        The candidates in each Senate district, in district order.
+    general_house_list :
+        The candidates in each House district in the general election.
+    general_senate_list :
+        The candidates in each Senate district in the general election.
+    fuzzy_workers :
+        How many processes cleaning scores donor names on. Defaults to one
+        per CPU core.
+    """
+
+    def __init__(
+            self,
+            input_file_path: str,
+            election: str = "State General",
+            report: str = "Seven Day",
+            outputs: list = default_outputs,
+            office_fill_dictionary: dict = rosters.office_fill_dictionary,
+            nested_house_name_list: list = rosters.nested_house_name_list,
+            nested_senate_name_list: list = rosters.nested_senate_name_list,
+            general_house_list: list = rosters.general_house_list,
+            general_senate_list: list = rosters.general_senate_list,
+            fuzzy_workers: int | None = None
+            ):
+        self.input_file_path = input_file_path
+        self.election = election
+        self.report = report
+        self.outputs = outputs
+        self.office_fill_dictionary = office_fill_dictionary
+        self.nested_house_name_list = nested_house_name_list
+        self.nested_senate_name_list = nested_senate_name_list
+        self.general_house_list = general_house_list
+        self.general_senate_list = general_senate_list
+        self.fuzzy_workers = fuzzy_workers
+
+        # Extra sentences for each candidate's summary, added by stages that
+        # run before the summaries are written. Maps each stage's name to a
+        # dictionary of candidates and their lines, keyed by chamber ("House"
+        # or "Senate") and candidate name, since a candidate can run for both.
+        self.summary_extra_lines = {}
+
+        # The transactions, candidate dataframes and statistics cube of each
+        # chamber and date window asked for, keyed by chamber and window_key()
+        self._windows = {}
+
+        # Rendered district summaries, keyed by chamber, district, election,
+        # report and window, with the fingerprints they were rendered from.
+        # See apoc/render_cache.py.
+        self.render_cache = {}
+        self.render_stats = {"hits": 0, "misses": 0, "seconds_saved": 0.0}
+        # Each candidate's slice fingerprint, keyed the same way minus the
+        # district
+        self._fingerprints = {}
+
+    @functools.cached_property
+    def read_plan(self):
+        """The read plan for the requested outputs, so that only House and
+        Senate rows, and only the columns and periods the outputs use, are
+        ever loaded."""
+        from apoc.read_planner import plan_read
+
+        return plan_read(self.outputs, self.election, self.report,
+                         unlisted_candidates=list(self.office_fill_dictionary))
+
+    def _read(self, file_path: str):
+        """Return the export at file_path as read by the read plan."""
+        from apoc.cleaning import read_function
+        from apoc.export_cache import cached_read
+        from apoc.read_planner import plan_key
+
+        return cached_read(
+            file_path,
+            lambda file_path: read_function(file_path, self.read_plan),
+            variant=plan_key(self.read_plan))
+
+    def _clean(self):
+        """Return the cleaned dataframe and the amended transactions dropped
+        from it, from the memo if this export was cleaned before."""
+        from apoc.cleaning import cleaner, office_filler
+        from apoc.dedup import drop_amended
+        from apoc.export_cache import file_digest
+        from apoc.read_planner import plan_key
+
+        key = (file_digest(self.input_file_path), plan_key(self.read_plan),
+               tuple(sorted(self.office_fill_dictionary.items())))
+        if key not in _cleaned_frames:
+            df = cleaner(self._read(self.input_file_path),
+                         self.fuzzy_workers)
+            df, amended_df = drop_amended(df)
+            df = office_filler(df, self.office_fill_dictionary)
+            _cleaned_frames[key] = df, amended_df
+        return _cleaned_frames[key]
+
+    @functools.cached_property
+    def big_df(self):
+        """The cleaned transactions, without the ones superseded by amended
+        reports."""
+        return self._clean()[0]
+
+    @functools.cached_property
+    def amended_df(self):
+        """The transactions dropped from big_df because an amended report
+        superseded them, with a "superseded_by" column."""
+        return self._clean()[1]
+
+    @functools.cached_property
+    def house_district_dictionary(self):
+        """Maps each House candidate's name to their district."""
+        return district_dictionary_generator(
+            "house",
+            [name for names in self.nested_house_name_list for name in names],
+            self.nested_house_name_list)
+
+    @functools.cached_property
+    def senate_district_dictionary(self):
+        """Maps each Senate candidate's name to their district."""
+        return district_dictionary_generator(
+            "senate",
+            [name for names in self.nested_senate_name_list for name in names],
+            self.nested_senate_name_list)
+
+    @functools.cached_property
+    def alias_index(self):
+        """Maps every spelling of each House and Senate candidate's name, on
+        the primary and general rosters and in the export, to their
+        candidate id and canonical name."""
+        from apoc.aliases import build_alias_index
+
+        return build_alias_index({
+            "House": (self.nested_house_name_list, self.general_house_list),
+            "Senate": (self.nested_senate_name_list, self.general_senate_list),
+        })
+
+    def _chamber_df(self, df: "pd.DataFrame", office: str, districts: dict):
+        """Return the rows of df for the office, without the "municipality"
+        column, with a "candidate_id" column and a "district" column, and
+        with every spelling of a candidate's name replaced by their
+        canonical name."""
+        from apoc.aliases import canonical_names, resolve_aliases
+
+        chamber_df = df[df.office == office]\
+            .drop(columns="municipality", errors="ignore")
+        candidate_ids = resolve_aliases(self.alias_index, office,
+                                        chamber_df.candidate_name)
+        chamber_df["candidate_name"] = canonical_names(self.alias_index,
+                                                       candidate_ids)
+        chamber_df.insert(chamber_df.columns.get_loc("candidate_name"),
+                          "candidate_id", candidate_ids)
+        chamber_df["district"] = chamber_df.candidate_name.map(districts)
+        return chamber_df
+
+    @functools.cached_property
+    def house_df(self):
+        """The House candidates' transactions, with a "district" column."""
+        return self._chamber_df(self.big_df, "House",
+                                self.house_district_dictionary)
+
+    @functools.cached_property
+    def senate_df(self):
+        """The Senate candidates' transactions, with a "district" column."""
+        return self._chamber_df(self.big_df, "Senate",
+                                self.senate_district_dictionary)
+
+    @functools.cached_property
+    def master_house_df_dictionary(self):
+        """Maps each House candidate's name to their transactions."""
+        return {name: self.house_df[self.house_df.candidate_name == name]
+                for name in self.house_district_dictionary}
+
+    @functools.cached_property
+    def master_senate_df_dictionary(self):
+        """Maps each Senate candidate's name to their transactions."""
+        return {name: self.senate_df[self.senate_df.candidate_name == name]
+                for name in self.senate_district_dictionary}
+
+    def _saved_stats_cube(self, office: str):
+        """Return the office's statistics cube, loaded from the export cache
+        if it was saved for this export, read plan, offices filled in,
+        rosters and cube version, and otherwise built and saved there."""
+        from apoc.export_cache import cache_directory, file_digest
+        from apoc.read_planner import plan_key
+        from apoc.stats_cube import (build_stats_cube, load_stats_cube,
+                                     save_stats_cube, stats_cube_version)
+
+        variant = hashlib.sha256(json.dumps([
+            stats_cube_version, plan_key(self.read_plan),
+            sorted(self.office_fill_dictionary.items()),
+            self.nested_house_name_list, self.nested_senate_name_list,
+            self.general_house_list, self.general_senate_list,
+            ]).encode()).hexdigest()[:16]
+        file_path = os.path.join(
+            cache_directory, "objects",
+            f"{file_digest(self.input_file_path)}.{variant}."
+            f"{office.lower()}_cube.npz")
+        if os.path.exists(file_path):
+            return load_stats_cube(file_path)
+
+        cube = build_stats_cube(self.house_df if office == "House"
+                                else self.senate_df)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        save_stats_cube(cube, file_path)
+        return cube
+
+    @functools.cached_property
+    def house_stats_cube(self):
+        """The counts, sums, extremes, medians and threshold totals of the
+        House candidates' transactions, loaded from the export cache when
+        this export's cube was saved there."""
+        return self._saved_stats_cube("House")
+
+    @functools.cached_property
+    def senate_stats_cube(self):
+        """The counts, sums, extremes, medians and threshold totals of the
+        Senate candidates' transactions, loaded from the export cache when
+        this export's cube was saved there."""
+        return self._saved_stats_cube("Senate")
+
+    @functools.cached_property
+    def house_date_index(self):
+        """The House transactions sorted by candidate and date, and by
+        candidate and submitted date, for selecting date windows."""
+        from apoc.date_window import build_date_index
+
+        return build_date_index(self.house_df)
+
+    @functools.cached_property
+    def senate_date_index(self):
+        """The Senate transactions sorted by candidate and date, and by
+        candidate and submitted date, for selecting date windows."""
+        from apoc.date_window import build_date_index
+
+        return build_date_index(self.senate_df)
+
+    def _window(self, house_or_senate: str, date_window: dict):
+        """Return the chamber's transactions in the window, its candidates'
+        dataframes and its statistics cube, building them the first time the
+        window is asked for."""
+        from apoc.date_window import (candidate_window, select_window,
+                                      window_key)
+        from apoc.stats_cube import build_stats_cube
+
+        key = (house_or_senate, window_key(date_window))
+        if key not in self._windows:
+            index = self.house_date_index if house_or_senate == "house" \
+                else self.senate_date_index
+            districts = self.house_district_dictionary \
+                if house_or_senate == "house" \
+                else self.senate_district_dictionary
+            df = select_window(index, date_window)
+            self._windows[key] = {
+                "df": df,
+                "frames": {name: candidate_window(index, name, date_window)
+                           for name in districts},
+                "cube": build_stats_cube(df),
+            }
+        return self._windows[key]
+
+    def chamber_df(
+            self,
+            house_or_senate: str,
+            date_window: dict | None = None
+            ):
+        """Return the chamber's transactions, or only the ones in the date
+        window.
+
+        Parameters
+        ----------
+        house_or_senate :
+            "house" or "senate".
+        date_window :
+            A window from date_window(), or None for every transaction.
+        """
+        if date_window is None:
+            return self.house_df if house_or_senate == "house" \
+                else self.senate_df
+        return self._window(house_or_senate, date_window)["df"]
+
+    def candidate_frames(
+            self,
+            house_or_senate: str,
+            date_window: dict | None = None
+            ):
+        """Return a dictionary mapping each of the chamber's candidates to
+        their transactions, or only the ones in the date window.
+
+        Parameters
+        ----------
+        house_or_senate :
+            "house" or "senate".
+        date_window :
+            A window from date_window(), or None for every transaction.
+        """
+        if date_window is None:
+            return self.master_house_df_dictionary \
+                if house_or_senate == "house" \
+                else self.master_senate_df_dictionary
+        return self._window(house_or_senate, date_window)["frames"]
+
+    def stats_cube(
+            self,
+            house_or_senate: str,
+            date_window: dict | None = None
+            ):
+        """Return the chamber's statistics cube, or one built from only the
+        transactions in the date window.
+
+        Parameters
+        ----------
+        house_or_senate :
+            "house" or "senate".
+        date_window :
+            A window from date_window(), or None for every transaction.
+        """
+        if date_window is None:
+            return self.house_stats_cube if house_or_senate == "house" \
+                else self.senate_stats_cube
+        return self._window(house_or_senate, date_window)["cube"]
+
+    def ingest(
+            self,
+            file_path: str
+            ):
+        """Add the transactions in a new export that aren't already in
+        big_df, drop any that an amended report in it supersedes, and rebuild
+        the chamber dataframes, the affected candidates' dataframes and the
+        statistics cubes. Only the new rows are cleaned. Returns the
+        transactions added, the ones dropped and the districts whose
+        candidates changed.
+
+        Parameters
+        ----------
+        file_path :
+            The path of the new export.
+        """
+        import pandas as pd
+
+        from apoc.aliases import canonical_names, resolve_aliases
+        from apoc.cleaning import cleaner, office_filler
+        from apoc.dedup import drop_amended
+        from apoc.stats_cube import build_stats_cube
+
+        new_df = self._read(file_path)
+
+        # Keeps only the transactions that haven't been ingested yet
+        new_df = new_df[~new_df["Result"].isin(self.big_df.result)]
+        if new_df.empty:
+            return new_df, self.amended_df.iloc[:0], []
+        new_df = cleaner(new_df, self.fuzzy_workers)
+
+        first_new_row = len(self.big_df)
+        big_df = pd.concat([self.big_df, new_df], ignore_index=True)
+
+        # Donor ids are numbered in name order, so they have to be renumbered
+        # across the whole frame. This is cheap compared to cleaning.
+        big_df["donor_id"] = big_df.groupby(["donor_full_name"]).ngroup()
+        big_df = office_filler(big_df, self.office_fill_dictionary)
+
+        # The export may amend transactions that were already ingested, or
+        # bring older copies of ones that were
+        big_df, dropped = drop_amended(big_df)
+        new_df = big_df[big_df.index >= first_new_row]
+        dropped = dropped[dropped.index < first_new_row]
+        self.big_df = big_df
+
+        self.house_df = pd.concat([
+            self.house_df[~self.house_df.result.isin(dropped.result)],
+            self._chamber_df(new_df, "House", self.house_district_dictionary)])
+        self.senate_df = pd.concat([
+            self.senate_df[~self.senate_df.result.isin(dropped.result)],
+            self._chamber_df(new_df, "Senate",
+                             self.senate_district_dictionary)])
+
+        # Rebuilds the dataframes of only the candidates with new or
+        # superseded transactions, and collects the districts they run in
+        changed = pd.concat([new_df, dropped])
+        affected_districts = []
+        for name in set(canonical_names(self.alias_index, resolve_aliases(
+                self.alias_index, "House",
+                changed.candidate_name[changed.office == "House"]))):
+            if name in self.master_house_df_dictionary:
+                self.master_house_df_dictionary[name] = \
+                    self.house_df[self.house_df.candidate_name == name]
+                affected_districts.append(self.house_district_dictionary[name])
+        for name in set(canonical_names(self.alias_index, resolve_aliases(
+                self.alias_index, "Senate",
+                changed.candidate_name[changed.office == "Senate"]))):
+            if name in self.master_senate_df_dictionary:
+                self.master_senate_df_dictionary[name] = \
+                    self.senate_df[self.senate_df.candidate_name == name]
+                affected_districts.append(
+                    self.senate_district_dictionary[name])
+
+        self.house_stats_cube = build_stats_cube(self.house_df)
+        self.senate_stats_cube = build_stats_cube(self.senate_df)
+        # Date indexes and windows are rebuilt the next time they're used
+        self.__dict__.pop("house_date_index", None)
+        self.__dict__.pop("senate_date_index", None)
+        self._windows = {}
+        self._fingerprints = {}
+        return new_df, dropped, sorted(set(affected_districts), key=str)
+
+    def pick_a_district(
+            self,
+            house_or_senate: str,
+            district: int | str,
+            report: str,
+            election: str
+            ):
+        """For the given district, print summaries of all candidates in the 
+        district. The numbers come from the chamber's statistics cube; the 
+        candidate dataframes are only filtered to list the smallest, largest and
+        $500-plus contributions.
+
+        Parameters
+        ----------
+        house_or_senate : 
+            Are we summarizing a House district, or a Senate district?
+            Takes "house" or "senate" as input, all lowercase.
+        district : 
+            The district to summarize.
+            House district is an integer, 1 through 40.
+            Senate district is an uppercase letter string, "A" through "T".
+        report : 
+            The report to summarize, such as "Thirty Day" or "Seven Day".
+            If left blank, will summarize all reports in the election.
+        election : 
+            The election to summarize, such as "State General" or 
+            "State Primary". If left blank, will summarize all elections.
+        """
+        from apoc.stats_cube import cube_lookup
+
+        if house_or_senate == "house":
+            print(f"Summary for House District {district}:")
+            print("")
+
+            # Defines a list of the candidates in the given House district, taken
+            # from the master list of lists
+            district_candidates = self.nested_house_name_list[district-1]
+            master_df_dictionary = self.master_house_df_dictionary
+            cube = self.house_stats_cube
+
+        elif house_or_senate == "senate":
+            print(f"Summary for Senate District {district}:")
+            print("")
+
+            # Defines a list of the candidates in the given Senate district, 
+            # taken from the master list of lists
+            district_candidates = \
+                self.nested_senate_name_list[senate_districts.index(district)]
+            master_df_dictionary = self.master_senate_df_dictionary
+            cube = self.senate_stats_cube
+
+        # Prints summary statistics for each candidate in the district
+        for key in district_candidates:
+            revenue = cube_lookup(cube, key, election, report, "revenue")
+            in_kind = cube_lookup(cube, key, election, report, "in_kind")
+
+            # Candidate header
+            print(f"{key}")
+            print("=================")
+
+            # If there are no recorded transactions for the candidate
+            if revenue["count"] == 0:
+                print(f"There are no transactions recorded for {key}.")
+                print("")
+            else:
+                # Cash contributions for the period, for the listings below
+                revenue_df = master_df_dictionary[key][
+                    (master_df_dictionary[key].report_type.str.contains(report))
+                    & (master_df_dictionary[key].election_type\
+                       .str.contains(election))
+                    & (master_df_dictionary[key].transaction_type == "Income")
+                    & (master_df_dictionary[key].payment_type != "Non-Monetary")
+                    ]
+
+                # Total number of contributions
+                print(f"{key}'s campaign received {revenue["count"]\
+                    } contributions.")
+
+                # Total revenue
+                print(f"{key}'s campaign received ${revenue["sum"]\
+                    } for the reporting period.")
+
+                # Average donation amount
+                print(f"The average contribution to {key}'s campaign was ${\
+                    round(revenue["mean"], 2)}.")
+
+                # Median donation amount
+                print(f"The median contribution to {key}'s campaign was ${\
+                    revenue["median"]}.")
+
+                # Minimum donation amount
+                print(f"The minimum contribution to {key}'s campaign was ${\
+                    revenue["min"]}.")
+
+                # List minimal donations
+                print("The minimum contribution came from the following:")
+                print(revenue_df[revenue_df.amount == revenue["min"]]\
+                    .drop(columns=["last/business_name", "first_name"]))
+
+                # Maximum donation amount
+                print(f"The maximum contribution to {key}'s campaign was ${\
+                    revenue["max"]}.")
+
+                # List maximal donations
+                print("The maximum contribution came from the following:")
+                print(revenue_df[revenue_df.amount == revenue["max"]]\
+                    .drop(columns=["last/business_name", "first_name"]))
+
+                # Number of contributions of at least $500
+                print(f"{revenue["threshold_count"][500]\
+                    } contributions of at least $500 were made to the campaign.")
+
+                # Print all contributions of at least $500, if there are any
+                if revenue["threshold_count"][500] > 0:
+                    print(revenue_df[(revenue_df.amount >= 500)]\
+                        [["date", "payment_type", "amount", "first_name",
+                        "last/business_name"]])
+                    print("")
+                print(f"There were {in_kind["count"]\
+                    } in-kind contributions to {key}'s campaign.")
+                print(f"In-kind contributions to {key}'s campaign totaled ${\
+                    in_kind["sum"]}.")
+                print()
+                print("")
+
+    def _slice_fingerprints(self, house_or_senate: str, election: str,
+                            report: str, date_window: dict | None):
+        """Return each of the chamber's candidates' slice fingerprints for
+        the election, report and window, computing them the first time
+        they're asked for."""
+        from apoc.date_window import window_key
+        from apoc.render_cache import slice_fingerprints
+
+        key = (house_or_senate, election, report, window_key(date_window))
+        if key not in self._fingerprints:
+            df = self.chamber_df(house_or_senate, date_window)
+            self._fingerprints[key] = slice_fingerprints(
+                df[df.election_type.str.contains(election)
+                   & df.report_type.str.contains(report)])
+        return self._fingerprints[key]
+
+    def _district_fingerprint(self, house_or_senate: str,
+                              district: str | int, election: str,
+                              report: str, date_window: dict | None):
+        """Return the district's render cache key and its fingerprint, which
+        covers its candidates' transactions and extra summary lines."""
+        from apoc.date_window import window_key
+        from apoc.render_cache import district_fingerprint
+
+        if house_or_senate == "house":
+            district_candidates = self.nested_house_name_list[district-1]
+        else:
+            district_candidates = self.nested_senate_name_list[\
+                senate_districts.index(district)]
+        fingerprints = self._slice_fingerprints(house_or_senate, election,
+                                                report, date_window)
+        cache_key = f"{house_or_senate}|{district}|{election}|{report}|" \
+            f"{window_key(date_window)}"
+        fingerprint = district_fingerprint(
+            [house_or_senate, district, election, report,
+             window_key(date_window)]
+            + [[name, fingerprints.get(name),
+                [stage_lines.get((house_or_senate.title(), name), [])
+                 for stage_lines in self.summary_extra_lines.values()]]
+               for name in district_candidates])
+        return cache_key, fingerprint
+
+    def stale_districts(
+            self,
+            election: str,
+            report: str,
+            date_window: dict | None = None
+            ):
+        """Return every House and Senate district whose summaries would come
+        out differently from the ones last rendered, because their
+        candidates' transactions or extra summary lines have changed, such
+        as chamber-wide ranks that shift when another district's candidates
+        raise money.
+
+        Parameters
+        ----------
+        election :
+            The election being reported on, as a string.
+        report :
+            The report to summarize, as a string.
+        date_window : 
+            A window from date_window(). If given, only the transactions in
+            it are summarized, on top of the election and report.
+        """
+        stale = []
+        for district in list(range(1, 41)) + list(senate_districts):
+            house_or_senate = "house" if isinstance(district, int) \
+                else "senate"
+            cache_key, fingerprint = self._district_fingerprint(
+                house_or_senate, district, election, report, date_window)
+            entry = self.render_cache.get(cache_key)
+            if entry is None or entry["fingerprint"] != fingerprint:
+                stale.append(district)
+        return stale
+
+    def render_district(
+            self,
+            house_or_senate: str,
+            district: str | int,
+            election: str,
+            report: str,
+            date_window: dict | None = None
+            ):
+        """Return the text of the summaries of each candidate in the district,
+        reusing the text rendered last time if none of the candidates'
+        transactions or extra summary lines have changed since. Counts the
+        hit or miss in render_stats.
+
+        Parameters
+        ----------
+        house_or_senate :
+            "house" or "senate", all lowercase.
+        district :
+            The district to write, such as "B" or 12.
+        election :
+            The election being reported on, as a string.
+        report :
+            The report to summarize, as a string.
+        date_window : 
+            A window from date_window(). If given, only the transactions in
+            it are summarized, on top of the election and report.
+        """
+        cache_key, fingerprint = self._district_fingerprint(
+            house_or_senate, district, election, report, date_window)
+
+        entry = self.render_cache.get(cache_key)
+        if entry is not None and entry["fingerprint"] == fingerprint:
+            self.render_stats["hits"] += 1
+            self.render_stats["seconds_saved"] += entry["seconds"]
+            return entry["text"]
+
+        render_start = time.perf_counter()
+        text = self._render_district(house_or_senate, district, election,
+                                     report, date_window)
+        self.render_cache[cache_key] = {
+            "fingerprint": fingerprint,
+            "text": text,
+            "seconds": time.perf_counter() - render_start,
+        }
+        self.render_stats["misses"] += 1
+        return text
+
+    def _render_district(
+            self,
+            house_or_senate: str,
+            district: str | int,
+            election: str,
+            report: str,
+            date_window: dict | None = None
+            ):
+        """Return the text of the summaries of each candidate in the district.
+        All of the numbers come from the chamber's statistics cube, so no
+        candidate dataframes are filtered here.
+
+        Parameters
+        ----------
+        house_or_senate :
+            String input to specify whether the district to write is a House or a
+            Senate district. 
+            Takes "house" or "senate" as inputs, all lowercase.
+        district :
+            The district to write.
+            Input is a string with the Senate district in caps, such as "B",
+            or the House district number, as a numeral, between 1 and 40.
+        election :
+            The election being reported on, as a string.
+            For state races, probably either "State General" or "State Primary".
+            If left blank, will write summaries for all elections.
+        report :
+            The report to summarize, as a string.
+            For state races, probably either "Thirty Day" or "Seven Day".
+            If left blank, will write summaries using all reports in the election.
+        date_window : 
+            A window from date_window(). If given, only the transactions in
+            it are summarized, on top of the election and report.
+        """
+        from apoc.date_window import describe_window
+        from apoc.stats_cube import cube_lookup
+
+        with io.StringIO() as f:
+            f.write("\n")
+            if house_or_senate == "house":
+                f.write(f"Summary for House District {district}:\n")
+
+                # Defines a list of the candidates in the given House district, 
+                # taken from the master list of lists
+                district_candidates = self.nested_house_name_list[district-1]
+
+            elif house_or_senate == "senate":
+                f.write(f"Summary for Senate District {district}:\n")
+
+                # Defines a list of the candidates in the given Senate district,
+                # taken from the master list of lists
+                district_candidates = self.nested_senate_name_list[\
+                    senate_districts.index(district)]
+            cube = self.stats_cube(house_or_senate, date_window)
+
+            if date_window is not None:
+                f.write(f"Transactions {describe_window(date_window)}\n")
+
+            # District header
+            f.write("==================\n")
+            f.write("\n")
+
+            for key in district_candidates:
+                revenue = cube_lookup(cube, key, election, report, "revenue")
+                in_kind = cube_lookup(cube, key, election, report, "in_kind")
+                expenditure = cube_lookup(cube, key, election, report,
+                                          "expenditure")
+                other = cube_lookup(cube, key, election, report, "other")
+
+                # Candidate header
+                f.write(f"{key}\n")
+                f.write("----------------\n")
+
+                # If there are no recorded transactions for the candidate:
+                if revenue["count"] + in_kind["count"] + expenditure["count"] \
+                    + other["count"] == 0:
+                    f.write(f"There are no transactions recorded for {key}.\n")
+                    f.write("\n")
+                else:
+                    # Total number of contributions
+                    if revenue["count"] == 0:
+                        f.write(f"{key}'s campaign did not record any donations.\n")
+                    else:
+                        f.write(f"{key}'s campaign received {\
+                            revenue["count"]} donations.\n")
+
+                        # Total revenue
+                        f.write(f"Donations to {key}'s campaign totaled ${\
+                                    revenue["sum"]}.\n")
+
+                        # Average contribution
+                        f.write(f"The average contribution to {\
+                            key}'s campaign was ${\
+                                    round(revenue["mean"], 2)}.\n")
+
+                        # Median contribution
+                        f.write(f"The median contribution to {key\
+                                }'s campaign was ${revenue["median"]}.\n")
+
+                        # Minimum contribution
+                        f.write(f"The minimum contribution to {key\
+                                }'s campaign was ${revenue["min"]}.\n")
+
+                        # Maximum contribution
+                        f.write(f"The maximum contribution to {key\
+                                }'s campaign was ${revenue["max"]}.\n")
+
+                        # Number of contributions over $500
+                        f.write(f"{revenue["threshold_count"][500]\
+                        } donations of at least $500 were made to the campaign.\n")
+
+                        # Sum of contributions exceeding $500
+                        f.write(f"Donations of more than $500 totaled ${\
+                            revenue["threshold_sum"][500]\
+                            } in the reporting period.\n")
+
+                    f.write("\n")
+
+                    # In-kind contributions
+
+                    if in_kind["count"] == 0:
+                        f.write(f"{key}'s campaign received no in-kind contributions.\n")
+                        f.write("\n")
+                    else:
+                        # Total number of contributions
+                        f.write(f"{key}'s campaign received {\
+                            in_kind["count"]} in-kind contributions.\n")
+
+                        # Total revenue
+                        f.write(f"In-kind contributions to {key}'s campaign totaled ${\
+                                    in_kind["sum"]}.\n")
+
+                        # Average contribution
+                        f.write(f"The average in-kind contribution to {key}'s campaign"
+                                f" had a value of ${round(in_kind["mean"], 2)}.\n")
+                        f.write("\n")
+
+
+                    # Expenditures
+
+                    if expenditure["count"] == 0:
+                        f.write(f"{key}'s campaign made no expenditures in the reporting period.\n")
+                    else:
+                        # Total number of expenditures
+                        f.write(f"{key}'s campaign made {\
+                            expenditure["count"]} expenditures in the reporting period.\n")
+
+                        # Sum of campaign expenditures
+                        f.write(f"{key}'s campaign spent ${\
+                            expenditure["sum"]} in the reporting period.\n")
+
+                        # Average campaign expense
+                        f.write(f"The average expense for {key}'s campaign was ${\
+                            round(expenditure["mean"], 2)}.\n")
+
+                        # Median campaign expense
+                        f.write(f"The median expense for {key}'s campaign was ${\
+                            expenditure["median"]}.\n")
+
+                        # Minimum campaign expense (expenses are negative, so the
+                        # smallest is the maximum)
+                        f.write(f"The smallest expense for {key}'s campaign was ${\
+                            expenditure["max"]}.\n")
+
+                        # Maximum campaign expense
+                        f.write(f"The biggest expense to {key}'s campaign was ${\
+                            expenditure["min"]}.\n")
+
+                        # Number of expenses of at least $1,000
+                        f.write(f"{expenditure["threshold_count"][1000]\
+                        } expenses of at least $1,000 were made by the campaign.\n")
+
+                        # Total value of expenses of at least $1,000
+                        f.write(f"Expenses exceeding $1,000 totaled ${\
+                            expenditure["threshold_sum"][1000]\
+                            } in the reporting period.\n")
+
+                    f.write("\n")
+
+                    # Sentences added by other stages, such as velocity metrics
+                    line_key = (house_or_senate.title(), key)
+                    for stage_lines in self.summary_extra_lines.values():
+                        for line in stage_lines.get(line_key, []):
+                            f.write(f"{line}\n")
+                        if line_key in stage_lines:
+                            f.write("\n")
+                    f.write("\n")
+
+            return f.getvalue()
+
+    def big_donation_frame(
+            self,
+            district: int | str,
+            election: str,
+            report: str,
+            date_window: dict | None = None
+            ):
+        """For the given district, election and report type, returns a dataframe 
+        of all donations from entities whose donations totaled at least $500 
+        across the specified reporting period.
+
+        Parameters
+        ----------
+        district : 
+            The district to summarize.
+            House districts are an integer, 1 through 40.
+            Senate districts are an uppercase letter string, "A" through "T".
+        election : 
+            The election to summarize.
+            For state races, probably either "Primary" or "General".
+            If left blank, will summarize donations recorded during both the
+            primary and the general election recording periods.
+        report : 
+            The report to use for summaries.
+            For state races, probably either "Thirty Day" or "Seven Day".
+            If left blank, will summarize all donations recorded for the given
+            election, regardless of when they were reported.
+        date_window : 
+            A window from date_window(). If given, only the transactions in
+            it are included, on top of the election and report.
+        """
+        import pandas as pd
+
+        from apoc.stats_cube import cube_lookup
+
+        # Creates an empty dictionary for all transactions for each candidate in 
+        # the district
+        district_dictionary_revenue = {}
+        candidate_frames = []
+
+        # The chamber's candidate dataframes, and its statistics cube, used to
+        # skip candidates who can't have any donors over the threshold
+        chamber = "house" if isinstance(district, int) else "senate"
+        frames = self.candidate_frames(chamber, date_window)
+        cube = self.stats_cube(chamber, date_window)
+
+        if isinstance(district, int):
+            # Defines a list of the candidates in the given House district, 
+            # taken from the master list of lists
+            district_candidates = self.nested_house_name_list[district-1]
+
+            # Populates the "all transactions" dictionary with dataframes for 
+            # each candidate 
+            for candidate_name in district_candidates:
+                district_dictionary_revenue[candidate_name] = \
+                frames[candidate_name]\
+                    [
+                        (frames[candidate_name]\
+                            .report_type.str.contains(report))
+                        & (frames[candidate_name]\
+                            .election_type.str.contains(election))
+                        & (frames[candidate_name]\
+                        .transaction_type == "Income")
+                        & (frames[candidate_name]\
+                        .payment_type != "Non-Monetary")
+                    ]\
+                        [[
+                        "district", "candidate_name", "amount", "date", 
+                        "donor_full_name", "is_self", "address", "city", "state",
+                        "zip", "country", "employer", "occupation", "payment_type",
+                        "payment_detail", "purpose_of_expenditure", "submitted"
+                        ]]
+            for key in district_dictionary_revenue.keys():
+                # No donor can have given $500 if the largest donation times the
+                # number of donations doesn't reach it, so the grouping is skipped
+                revenue = cube_lookup(cube, key, election, report, "revenue")
+                if revenue["count"] == 0 \
+                    or revenue["max"] * revenue["count"] < 500:
+                    sugar_names = []
+                else:
+                    grouped_names = district_dictionary_revenue[key].groupby(\
+                        ["donor_full_name"]).amount.sum()
+
+                    # sugar_names is the list of donors who gave at least $500
+                    sugar_names = list(grouped_names[grouped_names >= 500].keys())
+
+                candidate_frames.append(
+                    district_dictionary_revenue[key]\
+                        [
+                            district_dictionary_revenue[key]\
+                            .donor_full_name.isin(sugar_names)
+                        ]\
+                    .sort_values(
+                        by=["district", "candidate_name", "amount"],
+                        ascending=[True, True, False]))
+        elif isinstance(district, str):
+            # Defines a list of the candidates in the given Senate district, 
+            # taken from the master list of lists
+            district_candidates = self.nested_senate_name_list[
+                senate_districts.index(district)
+                ]
+
+            # Populates the "all transactions" dictionary with dataframes for 
+            # each candidate 
+            for candidate_name in district_candidates:
+                district_dictionary_revenue[candidate_name] = \
+                frames[candidate_name]\
+                    [
+                        (frames[candidate_name]\
+                            .report_type.str.contains(report))
+                        & (frames[candidate_name]\
+                            .election_type.str.contains(election))
+                        & (frames[candidate_name]\
+                        .transaction_type == "Income")
+                        & (frames[candidate_name]\
+                        .payment_type != "Non-Monetary")
+                    ]\
+                        [[
+                        "district", "candidate_name", "amount", "date", 
+                        "donor_full_name", "is_self", "address", "city", "state",
+                        "zip", "country", "employer", "occupation", "payment_type",
+                        "payment_detail", "purpose_of_expenditure", "submitted"
+                        ]]
+            for key in district_dictionary_revenue.keys():
+                # No donor can have given $500 if the largest donation times the
+                # number of donations doesn't reach it, so the grouping is skipped
+                revenue = cube_lookup(cube, key, election, report, "revenue")
+                if revenue["count"] == 0 \
+                    or revenue["max"] * revenue["count"] < 500:
+                    sugar_names = []
+                else:
+                    grouped_names = district_dictionary_revenue[key].groupby(\
+                        ["donor_full_name"]).amount.sum()
+
+                    # sugar_names is the list of donors who gave at least $500
+                    sugar_names = list(grouped_names[grouped_names >= 500].keys())
+
+                candidate_frames.append(
+                    district_dictionary_revenue[key]\
+                        [
+                            district_dictionary_revenue[key]\
+                            .donor_full_name.isin(sugar_names)
+                        ]\
+                    .sort_values(
+                        by=["district", "candidate_name", "amount"],
+                        ascending=[True, True, False]))
+
+        if not candidate_frames:
+            return pd.DataFrame(columns=big_transaction_columns)
+        return pd.concat(candidate_frames)
+
+    def big_expense_frame(
+            self,
+            district: int | str,
+            election: str,
+            report: str,
+            date_window: dict | None = None
+            ):
+        """For a given district, election and report, returns a dataframe of all 
+        expenses to entities who were paid at least $1,000 in total by the campaign
+        across any number of transactions during the specified reporting period.
+
+        Parameters
+        ----------
+        district : 
+            The district to summarize.
+            House districts are an integer, 1 through 40.
+            Senate districts are an uppercase letter string, "A" through "T".
+        election : 
+            The election to summarize.
+            For state races, probably either "Primary" or "General".
+            If left blank, will summarize donations recorded during both the
+            primary and the general election recording periods.
+        report : 
+            The report to use for summaries.
+            For state races, probably either "Thirty Day" or "Seven Day".
+            If left blank, will summarize all donations recorded for the given
+            election, regardless of when they were reported.
+        date_window : 
+            A window from date_window(). If given, only the transactions in
+            it are included, on top of the election and report.
+        """
+        import pandas as pd
+
+        from apoc.stats_cube import cube_lookup
+
+        # This will hold all expenditures for each candidate in the district
+        district_dictionary_expenditure = {}
+        candidate_frames = []
+
+        # The chamber's candidate dataframes, and its statistics cube, used to
+        # skip candidates who can't have any payees over the threshold
+        chamber = "house" if isinstance(district, int) else "senate"
+        frames = self.candidate_frames(chamber, date_window)
+        cube = self.stats_cube(chamber, date_window)
+
+        # Checks whether the "district" parameter is an integer, and thus whether
+        # to get House candidate names.  
+        if isinstance(district, int):
+            # Defines a list of the candidates in the given House district, 
+            # taken from the master list of lists
+            district_candidates = self.nested_house_name_list[district-1]
+
+            # Populates the "all transactions" dictionary with dataframes for 
+            # each candidate 
+            for candidate_name in district_candidates:
+                district_dictionary_expenditure[candidate_name] = \
+                frames[candidate_name]\
+                    [
+                        (frames[candidate_name]\
+                            .report_type.str.contains(report))
+                        & (frames[candidate_name]\
+                            .election_type.str.contains(election))
+                        & (frames[candidate_name]\
+                        .transaction_type == "Expenditure")
+                    ]\
+                        [[
+                        "district", "candidate_name", "amount", "date", 
+                        "donor_full_name", "is_self", "address", "city", "state",
+                        "zip", "country", "employer", "occupation", "payment_type",
+                        "payment_detail", "purpose_of_expenditure", "submitted"
+                        ]]
+            for key in district_dictionary_expenditure.keys():
+                # No payee can have been paid $1,000 if the largest expense times
+                # the number of expenses doesn't reach it, so the grouping is
+                # skipped
+                expenditure = cube_lookup(cube, key, election, report,
+                                          "expenditure")
+                if expenditure["count"] == 0 \
+                    or expenditure["min"] * expenditure["count"] > -1000:
+                    spend_names = []
+                else:
+                    grouped_names = district_dictionary_expenditure[key].groupby(\
+                        ["donor_full_name"]).amount.sum()
+
+                    # spend_names is the list of payees who were paid at least 
+                    # $1,000
+                    spend_names = list(
+                        grouped_names[grouped_names <= -1000].keys())
+
+                candidate_frames.append(
+                    district_dictionary_expenditure[key]\
+                        [
+                            district_dictionary_expenditure[key]\
+                            .donor_full_name.isin(spend_names)
+                        ]\
+                    .sort_values(
+                        by=["district", "candidate_name", "amount"],
+                        ascending=[True, True, True]))
+   
+        # Checks whether the "district" parameter is a string, and thus whether
+        # to get Senate candidate names. 
+        elif isinstance(district, str):
+            # Defines a list of the candidates in the given Senate district, 
+            # taken from the master list of lists
+            district_candidates = self.nested_senate_name_list[
+                senate_districts.index(district)
+                ]
+
+            # Populates the "all transactions" dictionary with dataframes for 
+            # each candidate 
+            for candidate_name in district_candidates:
+                district_dictionary_expenditure[candidate_name] = \
+                frames[candidate_name]\
+                    [
+                        (frames[candidate_name]\
+                            .report_type.str.contains(report))
+                        & (frames[candidate_name]\
+                            .election_type.str.contains(election))
+                        & (frames[candidate_name]\
+                        .transaction_type == "Expenditure")
+                    ]\
+                        [[
+                        "district", "candidate_name", "amount", "date", 
+                        "donor_full_name", "is_self", "address", "city", "state",
+                        "zip", "country", "employer", "occupation", "payment_type",
+                        "payment_detail", "purpose_of_expenditure", "submitted"
+                        ]]
+            for key in district_dictionary_expenditure.keys():
+                # No payee can have been paid $1,000 if the largest expense times
+                # the number of expenses doesn't reach it, so the grouping is
+                # skipped
+                expenditure = cube_lookup(cube, key, election, report,
+                                          "expenditure")
+                if expenditure["count"] == 0 \
+                    or expenditure["min"] * expenditure["count"] > -1000:
+                    spend_names = []
+                else:
+                    grouped_names = district_dictionary_expenditure[key].groupby(\
+                        ["donor_full_name"]).amount.sum()
+
+                    # spend_names is the list of payees who were paid at least 
+                    # $1,000
+                    spend_names = list(
+                        grouped_names[grouped_names <= -1000].keys())
+
+                candidate_frames.append(
+                    district_dictionary_expenditure[key]\
+                        [
+                            district_dictionary_expenditure[key]\
+                            .donor_full_name.isin(spend_names)
+                        ]\
+                    .sort_values(
+                        by=["district", "candidate_name", "amount"],
+                        ascending=[True, True, True]))
+
+        if not candidate_frames:
+            return pd.DataFrame(columns=big_transaction_columns)
+        return pd.concat(candidate_frames)
+
+    def district_partitions(
+            self,
+            districts: list,
+            election: str,
+            report: str,
+            date_window: dict | None = None
+            ):
+        """Return a dictionary mapping the file name of each of the given
+        districts' summary, big donation and big expense files to its text or
+        dataframe, ready for write_partitions().
+
+        Parameters
+        ----------
+        districts : 
+            The districts to render, such as [1, 2, "A"].
+        election : 
+            The election to summarize, such as "State General".
+        report : 
+            The report to summarize, such as "Seven Day".
+        date_window : 
+            A window from date_window(). If given, only the transactions in
+            it are summarized, on top of the election and report.
+        """
+        partitions = {}
+        for district in districts:
+            chamber = "house" if isinstance(district, int) else "senate"
+            prefix = f"{chamber}_{district}"
+            partitions[f"{prefix}_summary.txt"] = self.render_district(
+                chamber, district, election, report, date_window)
+            partitions[f"{prefix}_big_donations.csv"] = \
+                self.big_donation_frame(district, election, report,
+                                        date_window)
+            partitions[f"{prefix}_big_expenses.csv"] = \
+                self.big_expense_frame(district, election, report,
+                                       date_window)
+        return partitions
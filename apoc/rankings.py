@@ -0,0 +1,121 @@
+"""Ranks candidates against each other, statewide within their chamber and
+within their district.
+
+Every ranking metric is derived from the per-candidate totals a statistics
+cube already holds, through cube_totals(), so no transactions are added up
+again. All of the metrics are ranked with one grouped rank() per scope.
+Candidates a metric doesn't apply to, such as the average donation of a
+campaign with no donations, are left out of that metric's ranking.
+"""
+
+import pandas as pd
+
+
+# The metrics candidates are ranked by, and how each one is described in the
+# summaries. Higher is better for all of them.
+ranking_metrics = {
+    "cash_raised": "cash raised",
+    "in_kind": "in-kind contributions",
+    "spent": "money spent",
+    "average_donation": "average donation",
+    "big_money_share": "share of cash from donations of at least $500",
+}
+
+
+def ranking_inputs(
+        totals: pd.DataFrame
+        ):
+    """Return a dataframe with the ranking metrics of each candidate.
+
+    Parameters
+    ----------
+    totals :
+        Per-candidate totals from cube_totals().
+    """
+    revenue_sum = totals.revenue_sum.where(totals.revenue_count > 0)
+    return pd.DataFrame({
+        "cash_raised": totals.revenue_sum,
+        "in_kind": totals.in_kind_sum,
+        # Expenditures are negative, so the biggest spender has the lowest sum
+        "spent": -totals.expenditure_sum,
+        "average_donation": revenue_sum / totals.revenue_count,
+        "big_money_share": totals.revenue_threshold_sum_500 / revenue_sum,
+    }, index=totals.index)
+
+
+def ranking_table(
+        roster: pd.DataFrame,
+        totals: pd.DataFrame
+        ):
+    """Return the roster with each candidate's ranking metrics and, for each
+    metric, their rank and the number of candidates ranked, within their
+    chamber and within their district. Rank 1 is the highest value, and ties
+    share the best rank they span.
+
+    Parameters
+    ----------
+    roster :
+        One row per candidate, with "chamber", "district" and
+        "candidate_name" columns.
+    totals :
+        Per-candidate totals from cube_totals() of each chamber's cube,
+        indexed by "chamber" and "candidate_name", since a candidate can run
+        for both chambers.
+    """
+    inputs = ranking_inputs(totals)
+    # Candidates without any transactions have raised and spent nothing
+    inputs = inputs.reindex(
+        pd.MultiIndex.from_frame(roster[["chamber", "candidate_name"]]))
+    inputs[["cash_raised", "in_kind", "spent"]] = \
+        inputs[["cash_raised", "in_kind", "spent"]].fillna(0)
+    table = pd.concat([roster.reset_index(drop=True),
+                       inputs.reset_index(drop=True)], axis=1)
+
+    metrics = list(ranking_metrics)
+    for scope, keys in [("chamber", ["chamber"]),
+                        ("district", ["chamber", "district"])]:
+        grouped = table.groupby(keys)[metrics]
+        ranks = grouped.rank(method="min", ascending=False)
+        counts = grouped.transform("count")
+        for metric in metrics:
+            table[f"{metric}_{scope}_rank"] = ranks[metric].astype("Int64")
+            table[f"{metric}_{scope}_of"] = counts[metric]
+    return table
+
+
+def _ordinal(n: int):
+    """Return n as an ordinal, such as "1st" or "12th"."""
+    if 11 <= n % 100 <= 13:
+        return f"{n}th"
+    suffix = {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+def ranking_lines(
+        table: pd.DataFrame
+        ):
+    """Return a dictionary mapping each candidate's chamber and name to the
+    sentences describing their ranks, for the text summaries.
+
+    Parameters
+    ----------
+    table :
+        The dataframe from ranking_table().
+    """
+    lines = {}
+    for row in table.to_dict("records"):
+        chamber = row["chamber"]
+        candidate_lines = []
+        for metric, description in ranking_metrics.items():
+            chamber_rank = row[f"{metric}_chamber_rank"]
+            if pd.isna(chamber_rank):
+                continue
+            candidate_lines.append(
+                f"By {description}, {row['candidate_name']} ranked "
+                f"{_ordinal(chamber_rank)} of "
+                f"{row[f'{metric}_chamber_of']} {chamber} candidates and "
+                f"{_ordinal(row[f'{metric}_district_rank'])} of "
+                f"{row[f'{metric}_district_of']} in {chamber} District "
+                f"{row['district']}.")
+        lines[(chamber, row["candidate_name"])] = candidate_lines
+    return lines
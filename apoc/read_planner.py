@@ -0,0 +1,240 @@
+"""Works out which columns and rows of an APOC export a run actually needs.
+
+An export has 26 columns and rows for every filer in the state, but the
+summaries only use a dozen of those columns and only House and Senate
+candidates. plan_read() turns the list of outputs a run will write into a
+read plan: the columns to hand to read_csv's usecols, and the row predicates
+to apply to each chunk as it's parsed, so that rows for municipal races, the
+governor's race and group filers are dropped before they're ever collected
+into the dataframe.
+"""
+
+import hashlib
+import json
+
+import pandas as pd
+
+from apoc.aliases import alias_key
+
+
+# Every column in an APOC transaction export, with the type to read it as.
+export_dtypes = {
+    "Result": int,
+    "Date": str,
+    "Transaction Type": str,
+    "Payment Type": str,
+    "Payment Detail": str,
+    "Amount": str,
+    "Last/Business Name": str,
+    "First Name": str,
+    "Address": str,
+    "City": str,
+    "State": str,
+    "Zip": str,
+    "Country": str,
+    "Occupation": str,
+    "Employer": str,
+    "Purpose of Expenditure": str,
+    "--------": str,
+    "Report Type": str,
+    "Election Name": str,
+    "Election Type": str,
+    "Municipality": str,
+    "Office": str,
+    "Filer Type": str,
+    "Name": str,
+    "Report Year": int,
+    "Submitted": str
+}
+
+# The columns every run needs, to clean the data, split it by chamber and
+# select reports.
+core_columns = [
+    "Result", "Date", "Transaction Type", "Payment Type", "Amount",
+    "Last/Business Name", "First Name", "Report Type", "Election Type",
+    "Office", "Name", "Report Year", "Submitted"
+]
+
+# What each output needs on top of the core columns. "period" says whether
+# the output only ever looks at the election and report being summarized;
+# if every output in a run does, rows from other periods can be dropped
+# while reading.
+output_requirements = {
+    "summaries": {
+        "columns": [],
+        "period": True
+    },
+    "big_donations": {
+        "columns": ["Payment Detail", "Purpose of Expenditure", "Address",
+                    "City", "State", "Zip", "Country", "Occupation",
+                    "Employer"],
+        "period": True
+    },
+    "big_expenses": {
+        "columns": ["Payment Detail", "Purpose of Expenditure", "Address",
+                    "City", "State", "Zip", "Country", "Occupation",
+                    "Employer"],
+        "period": True
+    },
+    "geography": {
+        "columns": ["State", "Zip", "Country"],
+        "period": True
+    },
+    "industry": {
+        "columns": ["Employer", "Occupation"],
+        "period": True
+    },
+    "spending": {
+        "columns": ["Purpose of Expenditure"],
+        "period": True
+    },
+    "overlap": {
+        "columns": ["Zip"],
+        "period": False
+    },
+    "compliance": {
+        "columns": ["Zip"],
+        "period": False
+    },
+    "velocity": {
+        "columns": [],
+        "period": False
+    },
+    "dashboard": {
+        "columns": [],
+        "period": False
+    },
+    "payees": {
+        "columns": [],
+        "period": False
+    },
+    "anomalies": {
+        "columns": [],
+        "period": False
+    },
+    "cycles": {
+        "columns": [],
+        "period": False
+    },
+    "aliases": {
+        "columns": [],
+        "period": False
+    },
+    "everything": {
+        "columns": list(export_dtypes),
+        "period": False
+    },
+}
+
+# How many rows to parse at a time when filtering while reading.
+chunk_size = 200_000
+
+
+def plan_read(
+        outputs: list,
+        election: str = "",
+        report: str = "",
+        offices: list = ["House", "Senate"],
+        unlisted_candidates: list = []
+        ):
+    """Return a read plan for the given outputs: a dictionary with the
+    "usecols" to read, the "offices" to keep, the "unlisted_candidates" to
+    keep whatever their office says, and the "election" and "report" strings
+    rows must contain, which are "" when every period is needed.
+
+    Parameters
+    ----------
+    outputs :
+        The outputs the run will write, as keys of output_requirements.
+    election :
+        The election being summarized, such as "State General".
+    report :
+        The report being summarized, such as "Seven Day".
+    offices :
+        The offices whose candidates to keep.
+    unlisted_candidates :
+        Candidates to keep even if their rows have no office or another
+        office, because office_filler() sets it after reading.
+    """
+    needed = set(core_columns)
+    period_only = True
+    for output in outputs:
+        needed.update(output_requirements[output]["columns"])
+        period_only = period_only and output_requirements[output]["period"]
+
+    return {
+        # Keeps the export's column order, so the plan is stable
+        "usecols": [column for column in export_dtypes if column in needed],
+        "offices": list(offices),
+        # Kept as alias keys, so every spelling of their names is kept
+        "unlisted_candidates": sorted({alias_key(name)
+                                       for name in unlisted_candidates}),
+        "election": election if period_only else "",
+        "report": report if period_only else "",
+    }
+
+
+def plan_key(
+        plan: dict
+        ):
+    """Return a short string identifying the plan, for naming cached
+    dataframes read with it.
+
+    Parameters
+    ----------
+    plan :
+        The read plan.
+    """
+    return hashlib.sha256(
+        json.dumps(plan, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def row_mask(
+        chunk: pd.DataFrame,
+        plan: dict
+        ):
+    """Return a boolean Series saying which rows of a freshly parsed chunk
+    the plan keeps.
+
+    Parameters
+    ----------
+    chunk :
+        A chunk of the export, with its original column names.
+    plan :
+        The read plan.
+    """
+    keep = chunk["Office"].isin(plan["offices"])
+    if plan["unlisted_candidates"]:
+        names = chunk["Name"].fillna("")
+        keys = {name: alias_key(name) for name in names.unique()}
+        keep |= names.map(keys).isin(plan["unlisted_candidates"])
+    if plan["election"]:
+        keep &= chunk["Election Type"].fillna("")\
+            .str.contains(plan["election"], regex=False)
+    if plan["report"]:
+        keep &= chunk["Report Type"].fillna("")\
+            .str.contains(plan["report"], regex=False)
+    return keep
+
+
+def read_planned(
+        file_path: str,
+        plan: dict
+        ):
+    """Read the export in chunks, keeping only the plan's columns and the
+    rows that pass its predicates, and return the resulting dataframe.
+
+    Parameters
+    ----------
+    file_path :
+        The file path of the .csv file to read.
+    plan :
+        The read plan.
+    """
+    reader = pd.read_csv(
+        file_path,
+        usecols=plan["usecols"],
+        dtype={column: export_dtypes[column] for column in plan["usecols"]},
+        chunksize=chunk_size)
+    chunks = [chunk[row_mask(chunk, plan)] for chunk in reader]
+    return pd.concat(chunks, ignore_index=True)
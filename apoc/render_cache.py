@@ -0,0 +1,107 @@
+"""Remembers rendered district summaries, so districts whose transactions
+haven't changed aren't rendered again.
+
+Each candidate's slice of transactions, the rows in the election, report and
+date window being summarized, is fingerprinted by hashing every row's result
+id, amount and submitted date and adding the hashes up, which doesn't depend
+on the order of the rows. A district's fingerprint covers the fingerprints
+of its candidates, the sentences other stages added to their summaries, and
+what's being summarized. A rendered district is kept with its fingerprint,
+and reused for as long as the fingerprint comes out the same.
+
+The cache is saved as JSON between runs. Bump render_cache_version whenever
+the text render_district() writes changes, so old renders aren't reused.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Part of every district fingerprint, so changing it throws the cache away.
+render_cache_version = 1
+
+# The columns hashed for each transaction.
+fingerprint_columns = ["result", "amount", "submitted"]
+
+
+def slice_fingerprints(
+        df: pd.DataFrame
+        ):
+    """Return a dictionary mapping each candidate in the dataframe to the
+    fingerprint of their rows: the sum of the rows' hashes and the number of
+    rows, as text.
+
+    Parameters
+    ----------
+    df :
+        Transactions with "candidate_name" and the fingerprint_columns,
+        already narrowed to the slice being summarized.
+    """
+    hashes = pd.util.hash_pandas_object(df[fingerprint_columns], index=False)
+    # uint64 sums wrap around, which is all a fingerprint needs
+    with np.errstate(over="ignore"):
+        grouped = pd.DataFrame({
+            "candidate_name": df.candidate_name.to_numpy(),
+            "hash": hashes.to_numpy(),
+        }).groupby("candidate_name").hash.agg(["sum", "size"])
+    return {name: f"{total:016x}-{size}"
+            for name, total, size in zip(grouped.index, grouped["sum"],
+                                         grouped["size"])}
+
+
+def district_fingerprint(
+        parts: list
+        ):
+    """Return the fingerprint of a district: the SHA-256 of everything its
+    rendering depends on.
+
+    Parameters
+    ----------
+    parts :
+        JSON-serializable values the district's text depends on, such as the
+        district, the election and report, and each candidate's name, slice
+        fingerprint and extra summary lines.
+    """
+    return hashlib.sha256(json.dumps(
+        [render_cache_version] + parts, default=str).encode()).hexdigest()
+
+
+def load_render_cache(
+        file_path: str
+        ):
+    """Return the render cache saved at the path, mapping each district's
+    cache key to its "fingerprint", "text" and the "seconds" it took to
+    render, or an empty one if nothing's been saved there.
+
+    Parameters
+    ----------
+    file_path :
+        The render cache's file path.
+    """
+    if not os.path.exists(file_path):
+        return {}
+    with open(file_path) as f:
+        return json.load(f)
+
+
+def save_render_cache(
+        cache: dict,
+        file_path: str
+        ):
+    """Save the render cache to the path, replacing what was there.
+
+    Parameters
+    ----------
+    cache :
+        The render cache.
+    file_path :
+        The render cache's file path.
+    """
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    with open(file_path + ".tmp", "w") as f:
+        json.dump(cache, f)
+    os.replace(file_path + ".tmp", file_path)
@@ -0,0 +1,288 @@
+"""The candidates in each House and Senate race, and the districts they run
+in.
+
+The nested name lists are the source of truth: the list at index i holds
+the candidates for House District i + 1, or for Senate District
+senate_districts[i]. district_dictionary_generator() turns them into
+dictionaries from each candidate's name to their district.
+"""
+
+import string
+
+
+# Candidates who filed without an office, and the office they're running for.
+# office_filler() fills these in after reading.
+office_fill_dictionary = {
+    "Calvin Schrage": "House",
+    "Denny Wells": "House",
+    "Dawson R Slaughter": "House",
+    "Ronald D Gillham": "House",
+    "Craig Johnson": "House",
+    "Harry Winner Kamdem": "House",
+    "Dustin T. Darden": "House",
+    "William Z. \"Zack\" Fields": "House",
+    "Kaylee M. Anderson": "House",
+    "Russell O. Wyatt": "House",
+    "Scott A Kohlhaas": "House",
+    "Cathy L. Tilton": "House",
+    "Wright, Jessica": "House",
+    "Kevin J. McCabe": "House",
+    "Joy Beth Cottle": "House",
+    "James Fields": "House",
+    "Dana Mock": "House",
+    "Mike Cronk": "House",
+    "Darren Morgan Deacon": "House",
+    "Nellie D. Jimmie": "House",
+    "Willy Keppel": "House",
+    "Victoria Beatrice Sosa": "House",
+
+    "Tina Wegener": "Senate",
+    "Harold Borbridge": "Senate",
+    "Janice Park": "Senate",
+    "Cheronda L. Smith": "Senate",
+    "Lee E Hammermeister": "Senate",
+    "Click Bishop": "Senate",
+    "Williams, Robert 'Bert'": "Senate"
+}
+
+# Nested lists of candidate names - a list of lists - on the principle that 
+# the index of each nested list within the master list plus one should 
+# correspond to the House district number (i+1). For example, the list at 
+# index 3 (row four) corresponds to the candidates for House District 4. 
+# Therefore, if we have the list of candidate names sorted into district lists,
+# we can get a second list of districts for free!
+nested_house_name_list = [
+    ["Daniel (Dan) Ortiz", "Jeremy T. Bynum", "Agnes C. Moran",
+        "Grant EchoHawk", "Robb Arnold"],
+    ["Rebecca Himschoot"],
+    ["Andrea \"Andi\" Story"],
+    ["Sara Hannan"],
+    ["Louise Stutes", "Leighton Radner"],
+    ["Sarah L. Vance", "Alana L. Greear/AlanaforAlaska", "Brent Johnson", 
+        "Dawson R Slaughter", "Michael Daniel"],
+    ["Justin Ruffridge", "Ronald D Gillham"],
+    ["Bill Elam", "John Hillyer"],
+    ["Lucy Bauer", "Lee Ellis", "Ky Holland", "Brandy Pennington", 
+        "David Lee Schaff"],
+    ["Craig Johnson", "Charles \"Chuck\" Kopp ", "Greg Magee"],
+    ["Julie Coulombe", "Walter Featherly"],
+    ["Calvin Schrage", "Joseph Crisafi-Lurtsema"],
+    ["Andrew Louis Josephson", "Heather Gottshall"],
+    ["Alyse S. Galvin", "Harry Winner Kamdem"],
+    ["Mia Costello", "Dustin T. Darden", "Denny Wells", "Thomas W McKay"],
+    ["Carolyn Hall", "Nick Moe"],
+    ["William Z. \"Zack\" Fields"],
+    ["Cliff Groh", "David Nelson"],
+    ["Genevieve Mina", "Kaylee M. Anderson", "Russell O. Wyatt"],
+    ["Andrew T. Gray", "Scott A Kohlhaas"],
+    ["Donna C Mears", "Aimee Sims"],
+    ["Stanley Wright", "Ted J. Eischeid"],
+    ["Jamie Allard", "Jim Arlington"],
+    ["Dan Saddler"],
+    ["DeLena M Johnson"],
+    ["Cathy L. Tilton"],
+    ["David Eastman", "Jubilee Underwood"],
+    ["Jesse M. Sumner", "Steve Menard", "Elexie Moore", "Wright, Jessica"],
+    ["George Rauscher", "Bruce Wall"],
+    ["Kevin J. McCabe", "Doyle Holmes"],
+    ["Maxine Dibert", "Barton S. LeBon"],
+    ["Will Stapp", "Gary K. Damron"],
+    ["Mike Prax", "Michael W. Welch"],
+    ["Frank Tomaszewski", "Joy Beth Cottle"],
+    ["Ashley Carrick", "Ruben A. McNeill Jr."],
+    ["James Fields", "Pamela Goode", "Brandon P. Kowalski \"Putuuqti\"", 
+        "Dana Mock", "Rebecca (Becky) Schwanke", "Cole Snodgress", 
+        "Mike Cronk"],
+    ["Bryce Edgmon", "Darren Morgan Deacon"],
+    ["CJ McCormick", "Nellie Darlene Jimmie", "Willy Keppel", 
+        "Victoria Beatrice Sosa"],
+    ["Neal Winston Foster", "Tyler Ivanoff"],
+    ["Thomas C Ikaaq Baker", "Robyn Niayuq Burke", "Saima Chase"]
+]
+nested_senate_name_list = [
+    [],
+    ["Jesse Kiehl"],
+    [],
+    ["Jesse J Bjorkman", "Ben Carpenter", "Andrew Cizek", "Tina Wegener"],
+    [],
+    ["Harold Borbridge", "James Kaufman", "Janice Park"],
+    [],
+    ["Matt Claman", "Liz Vazquez ", "Thomas W McKay"],
+    [],
+    ["Forrest Dunbar", "Cheronda L. Smith"],
+    [],
+    ["Kelly R. Merrick", "Jared David Goecker", "Lee E Hammermeister", 
+        "Ken McCarty", "Sharon Denise Jackson"],
+    [],
+    ["David S. Wilson", "Wright, Stephen", "Robert D Yundt II"],
+    [],
+    ["Leslie Hajdukovich", "Scott Kawasaki"],
+    [],
+    ["Click Bishop", "Mike Cronk", "Savannah Fletcher", 
+        "Williams, Robert 'Bert'", "James Squyres"],
+    [],
+    ["Donald \"Donny\" C. Olson"]
+]
+
+# Creates a string of uppercase alphabetical letters, to use for assigning 
+# Senate district names.
+senate_districts = string.ascii_uppercase[:20]
+
+# Creates a list of all the unique names of Alaska Legislative candidates
+# based on the nested candidate name lists. Why do this by iterating through the
+# nested name lists, instead of just grabbing the unique names from big_df for
+# each chamber? I'm pretty sure it had to do with checking that the names in the
+# nested list matched the actual candidate names as registered with APOC. I'm
+# also noticing that doing it this way, the list of unique candidates is
+# guaranteed to be ordered in the same way as in the nested list, from lowest
+# district to highest district.
+unique_house_names = []
+for district_list in nested_house_name_list:
+    for candidate in district_list:
+        unique_house_names.append(candidate)
+unique_senate_names = []
+for district_list in nested_senate_name_list:
+    for candidate in district_list:
+        unique_senate_names.append(candidate)
+
+
+def district_dictionary_generator(
+        chamber: str,
+        name_list: list,
+        reference_list: list
+        ):
+    """Return a dictionary that associates names with a district. Each 
+    candidate's name is a key, and her corresponding House or Senate district
+    is the associated value. Any candidate names not found in the reference
+    list will have a value of 0 for House races and "Z" for Senate races.
+    
+    Parameters
+    ----------
+    chamber : 
+        The chamber for which to generate a dictionary.
+        Takes "house" or "senate" as input.
+    name_list : 
+        The list of unique candidate names for the given chamber.
+        Compiled from the dataframe directly. This list will actually produce
+        the keys in the output dictionary, associating each name with a 
+        district by checking if the name is in the "reference" list of lists. 
+    reference_list : 
+        The nested list of lists of candidate names for each district, to get
+        values for the keys in name_list.
+        Formatted as a nested list order to easily get a district from each 
+        name in name_list. 
+    """
+    dict = {}
+    if chamber == "house":
+        for name in name_list:
+            for district in reference_list:
+                if name in district:
+                    dict[name] = reference_list.index(district) + 1
+                    break
+                elif district == reference_list[-1]:
+                    dict[name] = 0
+    elif chamber == "senate":
+        for name in name_list:
+            for district in reference_list:
+                if name in district:
+                    dict[name] = senate_districts[
+                        reference_list.index(district)]
+                    break
+                elif district == reference_list[-1]:
+                    dict[name] = "Z"
+    else:
+        print("Error: accepts only \"house\" or \"senate\" as entries.")
+    return dict
+
+
+# Saves the above dictionary to separate variables for the house and senate
+# dictionaries.
+house_district_dictionary = district_dictionary_generator(
+    "house", unique_house_names, nested_house_name_list)
+senate_district_dictionary = district_dictionary_generator(
+    "senate", unique_senate_names, nested_senate_name_list)
+
+# The candidates on the general election ballot, in the same layout as the
+# nested name lists above, using the names as they appear on the ballot.
+general_house_list = [
+    ["Jeremy T. Bynum", "Agnes C. Moran", "Grant EchoHawk"],
+    ["Rebecca Himschoot"],
+    ["Andrea \"Andi\" Story"],
+    ["Sara Hannan"],
+    ["Louise Stutes", "Leighton Radner"],
+    ["Sarah L. Vance", "Brent Johnson", "Dawson Slaughter"],
+    ["Justin Ruffridge", "Ronald D Gillham"],
+    ["Bill Elam", "John Hillyer"],
+    ["Lucy Bauer", "Ky Holland"],
+    ["Craig W. Johnson", "Charles \"Chuck\" Kopp "],
+    ["Julie Coulombe", "Walter Featherly"],
+    ["Calvin R. Schrage", "Joseph Crisafi-Lurtsema"],
+    ["Andrew Louis Josephson", "Heather Gottshall"],
+    ["Alyse S. Galvin", "Harry Winner Kamdem"],
+    ["Mia Costello", "Dustin T. Darden", "Denny Wells"],
+    ["Carolyn Hall", "Nick Moe"],
+    ["William Z. \"Zack\" Fields"],
+    ["Cliff Groh", "David Nelson"],
+    ["Genevieve Mina", "Kaylee M. Anderson", "Russell O. Wyatt"],
+    ["Andrew T. Gray", "Scott A. Kohlhaas"],
+    ["Donna C Mears", "Aimee Sims"],
+    ["Stanley Wright", "Ted J. Eischeid"],
+    ["Jamie Allard", "Jim Arlington"],
+    ["Dan Saddler"],
+    ["DeLena M Johnson"],
+    ["Cathy Tilton"],
+    ["David Eastman", "Jubilee Underwood"],
+    ["Steve Menard", "Elexie Moore", "Wright, Jessica"],
+    ["George Rauscher"],
+    ["Kevin J. McCabe", "Doyle Holmes"],
+    ["Maxine Dibert", "Barton S. LeBon"],
+    ["Will Stapp", "Gary K. Damron"],
+    ["Mike Prax"],
+    ["Frank Tomaszewski", "Joy 'Joy Beth' Cottle"],
+    ["Ashley Carrick", "Ruben A. McNeill Jr."],
+    ["James Fields", "Pamela Goode", "Brandon P. Kowalski \"Putuuqti\"", 
+        "Dana Mock", "Rebecca (Becky) Schwanke", "Mike Cronk"],
+    ["Bryce Edgmon", "Darren Morgan Deacon"],
+    ["CJ McCormick", "Nellie Darlene Jimmie", "Willy Keppel", 
+        "Victoria Beatrice Sosa"],
+    ["Neal Winston Foster", "Tyler Ivanoff"],
+    ["Thomas C Ikaaq Baker", "Robyn Niayuq Burke", "Saima Chase"]
+]
+general_senate_list = [
+    [],
+    ["Jesse Kiehl"],
+    [],
+    ["Jesse J Bjorkman", "Ben Carpenter", "Tina Wegener"],
+    [],
+    ["Harold Borbridge", "James Kaufman", "Janice L. Park"],
+    [],
+    ["Matt Claman", "Liz Vazquez "],
+    [],
+    ["Forrest Dunbar", "Cheronda L. Smith"],
+    [],
+    ["Kelly R. Merrick", "Jared David Goecker", "Lee E Hammermeister"],
+    [],
+    ["David S. Wilson", "Wright, Stephen", "Robert D Yundt II"],
+    [],
+    ["Leslie Hajdukovich", "Scott Kawasaki"],
+    [],
+    ["Click Bishop", "Mike Cronk", "Savannah Fletcher", 
+     "Williams, Robert 'Bert'"],
+    [],
+    ["Donald \"Donny\" C. Olson"]
+]
+
+# Each election cycle's rosters, keyed by the election year. Add a cycle's
+# lists above and an entry here when its candidates file, and pick the cycle
+# to summarize with writing_cycle in main_program.py. Earlier cycles'
+# transactions are kept in the cycle store (see apoc/cycles.py), so their
+# candidates can be compared with this cycle's at the same point.
+cycle_rosters = {
+    2024: {
+        "office_fill_dictionary": office_fill_dictionary,
+        "nested_house_name_list": nested_house_name_list,
+        "nested_senate_name_list": nested_senate_name_list,
+        "general_house_list": general_house_list,
+        "general_senate_list": general_senate_list,
+    },
+}
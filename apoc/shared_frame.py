@@ -0,0 +1,182 @@
+"""Hands a cleaned dataframe to worker processes without copying it.
+
+share_frame() copies each column into its own block of shared memory once.
+Numbers, booleans and dates are stored as they are; text columns are stored
+as integer codes into a dictionary of their distinct strings, which travels
+with the small, picklable handle. Workers rebuild a read-only dataframe from
+the handle whose columns point straight at the shared blocks, so starting a
+pool costs the same memory whether it has one worker or sixteen.
+
+    with share_frame(big_df) as handle:
+        for result in iter_parallel(handle, count_donors, districts,
+                                    workers=4):
+            ...
+
+where count_donors(df, district) is a module-level function that runs in
+each worker against the shared frame, and each result is handed back as
+soon as it's ready. The fuzzy matcher in apoc/fuzzy.py shares its name
+pairs this way, so each chunk it sends a worker is only a list of row
+positions.
+
+Pools are started by forking where the platform can, so that worker
+processes don't run main_program.py again, the way spawned ones would.
+"""
+
+import contextlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+def _attach_block(name: str):
+    """Attach to an existing shared memory block. Worker processes share
+    their parent's resource tracker, so the block is only unlinked once, by
+    share_frame()."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # track was added in Python 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+@contextlib.contextmanager
+def share_frame(
+        df: pd.DataFrame,
+        columns: list | None = None
+        ):
+    """Copy the dataframe's columns into shared memory, and yield a handle
+    that attach_frame() or iter_parallel() can use in other processes. The
+    shared memory is released when the with block ends.
+
+    Parameters
+    ----------
+    df :
+        The dataframe to share, such as big_df.
+    columns :
+        The columns to share. Defaults to all of them.
+    """
+    columns = list(df.columns) if columns is None else columns
+    handle = {"length": len(df), "columns": []}
+    blocks = []
+    try:
+        for name in columns:
+            series = df[name]
+            column = {"name": name}
+            if pd.api.types.is_datetime64_dtype(series.dtype):
+                values = series.to_numpy(dtype="datetime64[ns]")\
+                    .view(np.int64)
+                column["kind"] = "datetime"
+            elif pd.api.types.is_bool_dtype(series.dtype) \
+                    or pd.api.types.is_numeric_dtype(series.dtype):
+                values = series.to_numpy()
+                column["kind"] = "numeric"
+            else:
+                # Text is stored once per distinct string, in the handle
+                categorical = pd.Categorical(series)
+                values = categorical.codes
+                column["kind"] = "categorical"
+                column["categories"] = list(categorical.categories)
+
+            block = shared_memory.SharedMemory(
+                create=True, size=max(values.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(values.shape, values.dtype, buffer=block.buf)[:] = values
+            column["dtype"] = values.dtype.str
+            column["block"] = block.name
+            handle["columns"].append(column)
+
+        yield handle
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def attach_frame(
+        handle: dict
+        ):
+    """Return a read-only dataframe whose columns are views of the shared
+    memory described by the handle, along with the list of attached blocks,
+    which must stay referenced for as long as the dataframe is used.
+
+    Parameters
+    ----------
+    handle :
+        The handle yielded by share_frame().
+    """
+    blocks = []
+    series_list = []
+    for column in handle["columns"]:
+        block = _attach_block(column["block"])
+        blocks.append(block)
+        values = np.ndarray((handle["length"],), np.dtype(column["dtype"]),
+                            buffer=block.buf)
+        values.flags.writeable = False
+
+        if column["kind"] == "datetime":
+            values = values.view("datetime64[ns]")
+        elif column["kind"] == "categorical":
+            values = pd.Categorical.from_codes(
+                values,
+                dtype=pd.CategoricalDtype(column["categories"]))
+        series_list.append(pd.Series(values, name=column["name"], copy=False))
+
+    # concat with copy=False keeps every column in its own block, instead of
+    # consolidating columns of the same type into a fresh array
+    df = pd.concat(series_list, axis=1, copy=False)
+    return df, blocks
+
+
+# The frame attached in each worker process by _attach_worker
+_worker_frame = None
+_worker_blocks = None
+
+
+def _attach_worker(handle: dict):
+    global _worker_frame, _worker_blocks
+    _worker_frame, _worker_blocks = attach_frame(handle)
+
+
+def _call_worker(function, item):
+    return function(_worker_frame, item)
+
+
+def _pool(handle: dict, workers: int | None):
+    """Return a process pool whose workers each attach the shared frame
+    once."""
+    context = multiprocessing.get_context("fork") \
+        if "fork" in multiprocessing.get_all_start_methods() else None
+    return ProcessPoolExecutor(workers or os.cpu_count(), mp_context=context,
+                               initializer=_attach_worker, initargs=(handle,))
+
+
+def iter_parallel(
+        handle: dict,
+        function,
+        items: list,
+        workers: int | None = None
+        ):
+    """Call function(df, item) for each item on a pool of worker processes,
+    where df is the shared frame attached once per worker, and yield each
+    result as soon as it's ready, in the order they finish.
+
+    Parameters
+    ----------
+    handle :
+        The handle yielded by share_frame().
+    function :
+        A module-level function taking the shared dataframe and one item.
+    items :
+        The items to process.
+    workers :
+        How many worker processes to start. Defaults to one per CPU core.
+    """
+    with _pool(handle, workers) as pool:
+        futures = [pool.submit(_call_worker, function, item)
+                   for item in items]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,376 @@
+"""A precomputed cube of summary statistics for every candidate.
+
+The cube has one cell per candidate, election type, report type and
+transaction category, and each cell holds the count, sum, sum of squares,
+minimum, maximum and median of the amounts in it, along with the count and sum
+of the amounts at or above each of a few fixed thresholds. Sums are kept in
+whole cents, so adding up cells gives the same total in any order, and are
+turned back into dollars when they're read. Everything is stored in NumPy
+arrays, so it can be saved with np.savez and loaded back
+without pandas, and looking up a candidate's numbers for a report is a
+handful of array reads instead of a round of dataframe filtering.
+
+The cube also keeps every amount, sorted by cell and then by amount, so
+medians and other quantiles stay exact even when a lookup spans several
+cells, such as every report in an election.
+
+A cube is a plain dictionary of arrays; build it with build_stats_cube() and
+read it with cube_lookup(), or with cube_totals() for every candidate at once.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from apoc.quantiles import run_quantiles, sorted_median, sorted_runs
+
+
+# The transaction categories the summaries report on, in cube order.
+# "revenue" is cash income, "in_kind" is non-monetary income, and "other"
+# catches any transaction type that is neither income nor an expenditure.
+categories = ["revenue", "in_kind", "expenditure", "other"]
+
+# The dollar amounts the summaries single out. A transaction meets a
+# threshold if its amount is at least that large, or for expenditures, if it
+# is at least that negative.
+thresholds = [500, 1000]
+
+# Part of the file name of every saved cube, so bump it whenever
+# build_stats_cube() changes what a cube holds, and cubes saved before are
+# built again instead of loaded.
+stats_cube_version = 1
+
+# The arrays that make up a cube, besides its labels.
+_statistics = ["count", "sum", "sum_of_squares", "min", "max", "median",
+               "threshold_count", "threshold_sum"]
+
+
+def transaction_categories(
+        df: pd.DataFrame
+        ):
+    """Return an array with the index in categories of each transaction's
+    category.
+
+    Parameters
+    ----------
+    df :
+        A cleaned dataframe, with "transaction_type" and "payment_type"
+        columns.
+    """
+    income = (df.transaction_type == "Income").to_numpy()
+    in_kind = (df.payment_type == "Non-Monetary").to_numpy()
+    expenditure = (df.transaction_type == "Expenditure").to_numpy()
+    return np.select(
+        [income & ~in_kind, income & in_kind, expenditure],
+        [0, 1, 2],
+        default=3)
+
+
+def build_stats_cube(
+        df: pd.DataFrame
+        ):
+    """Return a statistics cube for all of the candidates in the dataframe.
+    Candidates are keyed by name, which is only unique within a chamber, so
+    the dataframe has to cover one chamber.
+
+    Parameters
+    ----------
+    df :
+        A cleaned dataframe of one chamber, such as house_df or senate_df.
+    """
+    if "office" in df.columns and df.office.nunique() > 1:
+        raise ValueError("A statistics cube can only cover one chamber, "
+                         f"not {sorted(df.office.dropna().unique())}.")
+    candidate = pd.Categorical(df.candidate_name.fillna(""))
+    election = pd.Categorical(df.election_type.fillna(""))
+    report = pd.Categorical(df.report_type.fillna(""))
+    category = transaction_categories(df)
+    amount = df.amount.to_numpy(dtype=float)
+
+    shape = (len(candidate.categories), len(election.categories),
+             len(report.categories), len(categories))
+    cell_count = int(np.prod(shape))
+
+    # Flattens the four dimensions into a single cell number per row, and
+    # drops rows without an amount the same way pandas' count() and sum() do
+    cell = np.ravel_multi_index(
+        (candidate.codes, election.codes, report.codes, category), shape)
+    has_amount = ~np.isnan(amount)
+    cell = cell[has_amount]
+    amount = amount[has_amount]
+    magnitude = np.where(category[has_amount] == 2, -amount, amount)
+
+    cube = {
+        "candidates": np.asarray(candidate.categories, dtype=str),
+        "election_types": np.asarray(election.categories, dtype=str),
+        "report_types": np.asarray(report.categories, dtype=str),
+        "categories": np.asarray(categories, dtype=str),
+        "thresholds": np.asarray(thresholds, dtype=float),
+        "count": np.bincount(cell, minlength=cell_count),
+        "sum_of_squares": np.bincount(cell, weights=amount ** 2,
+                                      minlength=cell_count),
+    }
+
+    # Sums are added up in whole cents, which are exact, rather than in
+    # floating-point dollars, whose totals depend on the order they're added
+    cents = np.round(amount * 100).astype(np.int64)
+    cube["sum"] = np.bincount(cell, weights=cents, minlength=cell_count)\
+        .round().astype(np.int64)
+    grouped = pd.Series(amount).groupby(cell).agg(["min", "max"])
+    for statistic in ["min", "max"]:
+        values = np.full(cell_count, np.nan)
+        values[grouped.index.to_numpy()] = grouped[statistic].to_numpy()
+        cube[statistic] = values
+
+    # Medians are read off each cell's sorted run of amounts, which are kept
+    # for exact quantiles across cells
+    runs = sorted_runs(cell, amount)
+    cube["median"] = np.full(cell_count, np.nan)
+    cube["median"][runs["groups"]] = run_quantiles(runs, 0.5)
+    cube["sorted_amounts"] = runs["values"]
+    cube["cell_offsets"] = np.zeros(cell_count + 1, dtype=np.int64)
+    np.cumsum(cube["count"], out=cube["cell_offsets"][1:])
+
+    threshold_count = np.zeros((cell_count, len(thresholds)), dtype=np.int64)
+    threshold_sum = np.zeros((cell_count, len(thresholds)), dtype=np.int64)
+    for i, threshold in enumerate(thresholds):
+        meets = magnitude >= threshold
+        threshold_count[:, i] = np.bincount(cell[meets],
+                                            minlength=cell_count)
+        threshold_sum[:, i] = np.bincount(cell[meets], weights=cents[meets],
+                                          minlength=cell_count).round()
+    cube["threshold_count"] = threshold_count
+    cube["threshold_sum"] = threshold_sum
+
+    for statistic in _statistics:
+        cube[statistic] = cube[statistic].reshape(
+            shape + cube[statistic].shape[1:])
+
+    return _index_cube(cube)
+
+
+def _index_cube(cube: dict):
+    """Add the label lookup dictionaries that cube_lookup() relies on."""
+    cube["candidate_index"] = {
+        name: i for i, name in enumerate(cube["candidates"])}
+    cube["category_index"] = {
+        name: i for i, name in enumerate(cube["categories"])}
+    cube["match_cache"] = {}
+    return cube
+
+
+def save_stats_cube(
+        cube: dict,
+        file_path: str
+        ):
+    """Save a statistics cube to a compressed .npz file, replacing what was
+    there.
+
+    Parameters
+    ----------
+    cube :
+        The cube to save.
+    file_path :
+        The path of the .npz file to write.
+    """
+    # Written through a file object, so np.savez doesn't add its own suffix
+    with open(file_path + ".tmp", "wb") as f:
+        np.savez_compressed(f, **{
+            key: value for key, value in cube.items()
+            if isinstance(value, np.ndarray)})
+    os.replace(file_path + ".tmp", file_path)
+
+
+def load_stats_cube(
+        file_path: str
+        ):
+    """Return the statistics cube saved in the given .npz file.
+
+    Parameters
+    ----------
+    file_path :
+        The path of the .npz file written by save_stats_cube().
+    """
+    with np.load(file_path) as saved:
+        cube = {key: saved[key] for key in saved.files}
+    return _index_cube(cube)
+
+
+def _matching(cube: dict, dimension: str, pattern: str):
+    """Return the indexes of the labels in the given dimension that contain
+    the pattern, the same way report_type.str.contains(pattern) would."""
+    key = (dimension, pattern)
+    if key not in cube["match_cache"]:
+        cube["match_cache"][key] = [
+            i for i, label in enumerate(cube[dimension]) if pattern in label]
+    return cube["match_cache"][key]
+
+
+def _cell_indexes(cube: dict, candidate: str, election: str, report: str,
+                  category: str):
+    """Return the candidate index, matching election and report indexes and
+    category index for a lookup."""
+    return (cube["candidate_index"].get(candidate),
+            _matching(cube, "election_types", election),
+            _matching(cube, "report_types", report),
+            cube["category_index"][category])
+
+
+def cube_quantile(
+        cube: dict,
+        candidate: str,
+        election: str,
+        report: str,
+        category: str,
+        q: float
+        ):
+    """Return the exact q-th quantile of one candidate's amounts in one
+    category, for every election and report matching the given strings, or
+    NaN if there are none.
+
+    Parameters
+    ----------
+    cube :
+        The cube to read from.
+    candidate :
+        The candidate's name, as it appears in the data.
+    election :
+        The election to summarize, matched as in cube_lookup().
+    report :
+        The report to summarize, matched as in cube_lookup().
+    category :
+        One of "revenue", "in_kind", "expenditure" or "other".
+    q :
+        The quantile, between 0 and 1. 0.5 is the median.
+    """
+    c, e, r, k = _cell_indexes(cube, candidate, election, report, category)
+    if c is None or not e or not r:
+        return np.nan
+    shape = cube["count"].shape
+    offsets = cube["cell_offsets"]
+    slices = [
+        cube["sorted_amounts"][offsets[cell]:offsets[cell + 1]]
+        for cell in np.ravel_multi_index(
+            np.ix_([c], e, r, [k]), shape).ravel()]
+
+    # Each slice is already sorted, which the stable sort takes advantage of
+    values = np.sort(np.concatenate(slices), kind="stable")
+    if q == 0.5:
+        return sorted_median(values)
+    if len(values) == 0:
+        return np.nan
+    runs = {"offsets": np.array([0, len(values)]), "values": values}
+    return run_quantiles(runs, q)[0]
+
+
+def cube_lookup(
+        cube: dict,
+        candidate: str,
+        election: str,
+        report: str,
+        category: str
+        ):
+    """Return a dictionary of summary statistics for one candidate's
+    transactions in one category, for the given election and report.
+
+    The dictionary has the keys "count", "sum", "mean", "sum_of_squares",
+    "min", "max" and "median", plus "threshold_count" and "threshold_sum",
+    which map each threshold to the count and sum of the amounts meeting it.
+    If no transactions match, the count and sums are 0 and everything else is
+    NaN.
+
+    Parameters
+    ----------
+    cube :
+        The cube to read from.
+    candidate :
+        The candidate's name, as it appears in the data.
+    election :
+        The election to summarize. Like the writers, this matches every
+        election type containing the string, so "" matches them all.
+    report :
+        The report to summarize. Matches every report type containing the
+        string, so "" matches them all.
+    category :
+        One of "revenue", "in_kind", "expenditure" or "other".
+    """
+    c, e, r, k = _cell_indexes(cube, candidate, election, report, category)
+
+    if c is None or not e or not r:
+        counts = np.zeros(1, dtype=np.int64)
+        cells = {statistic: np.full(1, np.nan) for statistic in _statistics}
+        cells["threshold_count"] = np.zeros((1, len(cube["thresholds"])),
+                                            dtype=np.int64)
+        cells["threshold_sum"] = np.zeros((1, len(cube["thresholds"])))
+    else:
+        # Most lookups hit a single cell; wider patterns add up a few
+        cells = {statistic: cube[statistic][c][np.ix_(e, r)][:, :, k]
+                 .reshape(len(e) * len(r), *cube[statistic].shape[4:])
+                 for statistic in _statistics}
+        counts = cells["count"]
+
+    count = counts.sum()
+    total = cells["sum"].sum() / 100 if count else 0.0
+    filled = counts > 0
+    if filled.sum() == 1:
+        median = cells["median"][filled][0]
+    else:
+        median = cube_quantile(cube, candidate, election, report, category,
+                               0.5)
+
+    return {
+        "count": count,
+        "sum": total,
+        "mean": total / count if count else np.nan,
+        "sum_of_squares": np.nansum(cells["sum_of_squares"]) if count else 0.0,
+        "min": np.nanmin(cells["min"]) if count else np.nan,
+        "max": np.nanmax(cells["max"]) if count else np.nan,
+        "median": median,
+        "threshold_count": dict(zip(
+            cube["thresholds"], cells["threshold_count"].sum(axis=0))),
+        "threshold_sum": dict(zip(
+            cube["thresholds"], cells["threshold_sum"].sum(axis=0) / 100)),
+    }
+
+
+def cube_totals(
+        cube: dict,
+        election: str,
+        report: str
+        ):
+    """Return a dataframe with one row per candidate in the cube and the
+    count and sum of their transactions in each category, plus the count and
+    sum meeting each threshold, for every election and report matching the
+    given strings. Columns are named like "revenue_count", "revenue_sum",
+    "revenue_threshold_count_500" and "revenue_threshold_sum_500".
+
+    Parameters
+    ----------
+    cube :
+        The cube to read from.
+    election :
+        The election to total, matched as in cube_lookup().
+    report :
+        The report to total, matched as in cube_lookup().
+    """
+    e = _matching(cube, "election_types", election)
+    r = _matching(cube, "report_types", report)
+    columns = {}
+    for k, category in enumerate(cube["categories"]):
+        # Adds up the matching elections and reports for every candidate at
+        # once
+        for statistic in ["count", "sum"]:
+            columns[f"{category}_{statistic}"] = \
+                cube[statistic][:, e][:, :, r][:, :, :, k].sum(axis=(1, 2))
+        columns[f"{category}_sum"] = columns[f"{category}_sum"] / 100
+        for statistic in ["threshold_count", "threshold_sum"]:
+            totals = cube[statistic][:, e][:, :, r][:, :, :, k]\
+                .sum(axis=(1, 2))
+            if statistic == "threshold_sum":
+                totals = totals / 100
+            for i, threshold in enumerate(cube["thresholds"]):
+                columns[f"{category}_{statistic}_{threshold:g}"] = \
+                    totals[:, i]
+    return pd.DataFrame(columns, index=pd.Index(cube["candidates"],
+                                                name="candidate_name"))
@@ -0,0 +1,150 @@
+"""How fast each campaign is raising and spending money.
+
+Each candidate's cash donations and expenditures are totaled by day and
+sorted by candidate and date once. Every rolling window is then a
+time-based rolling sum over that one frame, grouped by candidate, so all of
+the candidates' metrics come out of a single vectorized pass. A zero row is
+added for every candidate on the as-of date, so a window always ends on that
+date even for campaigns that have gone quiet.
+
+Expenditures are negative, as they are throughout this repository. Cash on
+hand is estimated as every cash donation minus every expenditure in the
+export up to the as-of date, since the exports don't carry a campaign's
+starting balance.
+"""
+
+import numpy as np
+import pandas as pd
+
+from apoc.stats_cube import transaction_categories
+
+
+# The rolling windows to compute, in days.
+windows = [7, 30]
+
+# The window that the burn ratio and days-to-zero estimates use.
+burn_window = 30
+
+
+def daily_flows(
+        df: pd.DataFrame,
+        as_of: pd.Timestamp
+        ):
+    """Return a dataframe with each candidate's cash "raised" and "spent"
+    on each day up to and including as_of, sorted by candidate and date,
+    with a row on as_of for every candidate.
+
+    Parameters
+    ----------
+    df :
+        Transactions with "candidate_name", "date", "amount" and the columns
+        transaction_categories() reads.
+    as_of :
+        The last day to include.
+    """
+    category = transaction_categories(df)
+    flows = df[((category == 0) | (category == 2)) & (df.date <= as_of)]
+    category = transaction_categories(flows)
+    flows = pd.DataFrame({
+        "candidate_name": flows.candidate_name,
+        "date": flows.date.dt.normalize(),
+        "raised": np.where(category == 0, flows.amount, 0.0),
+        "spent": np.where(category == 2, flows.amount, 0.0),
+    })
+    as_of_rows = pd.DataFrame({
+        "candidate_name": df.candidate_name.dropna().unique(),
+        "date": as_of.normalize(),
+        "raised": 0.0,
+        "spent": 0.0,
+    })
+    return pd.concat([flows, as_of_rows])\
+        .groupby(["candidate_name", "date"], as_index=False).sum()
+
+
+def velocity_metrics(
+        df: pd.DataFrame,
+        as_of: pd.Timestamp | None = None
+        ):
+    """Return a dataframe with one row per candidate and their rolling
+    raised and spent totals for each window ending on as_of, their burn
+    ratio (dollars spent per dollar raised over the burn window), estimated
+    cash on hand, and how many days that cash would last if they kept
+    spending and raising at their burn-window pace.
+
+    Parameters
+    ----------
+    df :
+        Transactions with "candidate_name", "date", "amount" and the columns
+        transaction_categories() reads, across every report.
+    as_of :
+        The day the windows end. Defaults to the latest transaction date.
+    """
+    as_of = df.date.max() if as_of is None else pd.Timestamp(as_of)
+    daily = daily_flows(df, as_of)
+    grouped = daily.groupby("candidate_name", sort=False)
+
+    metrics = daily[["candidate_name", "date"]].copy()
+    for window in windows:
+        # daily is already in candidate and date order, which is the order
+        # the grouped rolling sums come back in
+        rolled = grouped.rolling(f"{window}D", on="date")[["raised", "spent"]]\
+            .sum()
+        metrics[f"raised_{window}_day"] = rolled.raised.to_numpy()
+        metrics[f"spent_{window}_day"] = rolled.spent.to_numpy()
+    metrics["cash_on_hand"] = grouped.raised.cumsum() + grouped.spent.cumsum()
+
+    metrics = metrics[metrics.date == as_of.normalize()]\
+        .rename(columns={"date": "as_of"}).reset_index(drop=True)
+
+    raised = metrics[f"raised_{burn_window}_day"]
+    spent = -metrics[f"spent_{burn_window}_day"]
+    metrics["burn_ratio"] = (spent / raised).where(raised > 0)
+    daily_net_burn = (spent - raised) / burn_window
+    metrics["days_to_zero"] = np.where(
+        metrics.cash_on_hand <= 0, 0.0,
+        (metrics.cash_on_hand / daily_net_burn).where(daily_net_burn > 0))
+    return metrics
+
+
+def velocity_lines(
+        metrics: pd.DataFrame
+        ):
+    """Return a dictionary mapping each candidate's chamber and name to the
+    sentences describing their velocity metrics, for the text summaries.
+
+    Parameters
+    ----------
+    metrics :
+        The dataframe from velocity_metrics(), with a "chamber" column of
+        "House" or "Senate" added.
+    """
+    lines = {}
+    for row in metrics.itertuples(index=False):
+        row = row._asdict()
+        name = row["candidate_name"]
+        as_of = f"{row['as_of']:%B} {row['as_of'].day}, {row['as_of'].year}"
+        candidate_lines = [
+            f"In the {window} days through {as_of}, {name}'s campaign raised "
+            f"${round(row[f'raised_{window}_day'], 2)} and spent "
+            f"${round(row[f'spent_{window}_day'], 2)}."
+            for window in windows]
+        if not np.isnan(row["burn_ratio"]):
+            candidate_lines.append(
+                f"Over the last {burn_window} days, the campaign spent "
+                f"${round(row['burn_ratio'], 2)} for every dollar it raised.")
+        if row["cash_on_hand"] <= 0:
+            candidate_lines.append(
+                f"The campaign has spent ${round(-row['cash_on_hand'], 2)} "
+                f"more than it has raised in cash.")
+        elif np.isnan(row["days_to_zero"]):
+            candidate_lines.append(
+                f"The campaign's estimated cash on hand of "
+                f"${round(row['cash_on_hand'], 2)} is not shrinking at its "
+                f"current pace.")
+        else:
+            candidate_lines.append(
+                f"At its current pace, the campaign's estimated cash on hand "
+                f"of ${round(row['cash_on_hand'], 2)} would last about "
+                f"{int(row['days_to_zero'])} days.")
+        lines[(row["chamber"], name)] = candidate_lines
+    return lines
@@ -0,0 +1,97 @@
+"""Watches a directory for new APOC exports.
+
+This polls rather than relying on filesystem events, so it works the same on
+every platform and on network drives. A file only counts as arrived once its
+size and modification time have stopped changing between two polls, so a
+download that is still being written isn't picked up half-finished.
+"""
+
+import fnmatch
+import os
+import time
+
+
+def scan_directory(
+        directory: str,
+        pattern: str = "cd_transactions_*.csv"
+        ):
+    """Return a dictionary mapping the path of every file in the directory
+    that matches the pattern to its (size, modification time).
+
+    Parameters
+    ----------
+    directory :
+        The directory to scan.
+    pattern :
+        A glob pattern for the file names to include, matched
+        case-insensitively.
+    """
+    files = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file() and fnmatch.fnmatch(entry.name.lower(), pattern):
+                stat = entry.stat()
+                files[entry.path] = (stat.st_size, stat.st_mtime)
+    return files
+
+
+def watch_directory(
+        directory: str,
+        on_new_file,
+        pattern: str = "cd_transactions_*.csv",
+        interval: float = 2.0,
+        max_polls: int | None = None
+        ):
+    """Poll the directory and call on_new_file(file_path, arrived_at) once
+    for every export that lands in it, or that is replaced with new contents.
+    Files already in the directory when watching starts are ignored.
+
+    arrived_at is the time.time() at which the file was first seen, so the
+    callback can report how long it took to bring outputs up to date.
+
+    Parameters
+    ----------
+    directory :
+        The directory to watch, such as "input_csvs".
+    on_new_file :
+        The function to call with the path of each new export.
+    pattern :
+        A glob pattern for the file names to watch, matched
+        case-insensitively.
+    interval :
+        How many seconds to wait between polls.
+    max_polls :
+        Stop after this many polls. By default, watches until interrupted.
+    """
+    print(f"Watching {directory} for new exports. Press Ctrl+C to stop.")
+    print("")
+
+    # Files that have already been handed to the callback, with the
+    # (size, modification time) they had at that point
+    handled = scan_directory(directory, pattern)
+
+    # Files that have been seen but haven't settled yet
+    pending = {}
+
+    polls = 0
+    try:
+        while max_polls is None or polls < max_polls:
+            time.sleep(interval)
+            polls += 1
+            now = time.time()
+            current = scan_directory(directory, pattern)
+
+            for file_path, signature in current.items():
+                if handled.get(file_path) == signature:
+                    continue
+                if file_path in pending \
+                        and pending[file_path][0] == signature:
+                    # Unchanged since the last poll, so it's done being written
+                    arrived_at = pending.pop(file_path)[1]
+                    handled[file_path] = signature
+                    on_new_file(file_path, arrived_at)
+                else:
+                    first_seen = pending.get(file_path, (None, now))[1]
+                    pending[file_path] = (signature, first_seen)
+    except KeyboardInterrupt:
+        print("Stopped watching.")
@@ -0,0 +1,1136 @@
+"""The batch writers, which write a Pipeline's outputs to files.
+
+Each writer takes the pipeline to write from first, prints its progress and
+how long it took, and only builds the parts of the pipeline its output
+needs. main_program.py calls them in order. Each writer imports pandas and
+the modules it needs itself, so importing this module stays fast.
+"""
+
+import os
+import time
+from typing import TYPE_CHECKING
+
+from apoc.pipeline import Pipeline
+from apoc.rosters import senate_districts
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def amendment_writer(
+        pipeline: Pipeline,
+        file_path: str
+        ):
+    """Write the transactions that were dropped from the pipeline because an
+    amended report superseded them to a csv file.
+
+    Parameters
+    ----------
+    pipeline :
+        The Pipeline to write from.
+    file_path :
+        The file path to write the dropped transactions to.
+    """
+    print("Attempting to write transactions superseded by amended reports...")
+    amendment_start = time.time()
+
+    dropped = pipeline.amended_df
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    dropped.to_csv(file_path, index=False)
+
+    amendment_finish = time.time()
+    print(f"Dropped {len(dropped)} superseded transactions, totaling "
+          f"${round(dropped.amount.sum(), 2)}.")
+    print(f"Checking for amendments took {\
+        round(amendment_finish - amendment_start, 5)} seconds.")
+    print("")
+
+
+def summary_dialog(
+        df: "pd.DataFrame"
+        ):
+    """Print a summary of the dataframe.
+    
+    Parameters
+    ----------
+    df : 
+        The dataframe to summarize."""
+    print("Post-cleaning summary:\n")
+    print(df.info())
+    print("")
+
+
+def top_house_donors(
+        pipeline: Pipeline,
+        num_to_show: int
+        ):
+    top_house_donor_df = pipeline.big_df[pipeline.big_df.office == "House"]\
+        .groupby(["donor_full_name"]).amount.sum().sort_values(ascending=False)
+    print("Biggest House donors:")
+    print(top_house_donor_df.head(num_to_show))
+    print("")
+
+
+def top_donors(
+        pipeline: Pipeline,
+        num_to_show: int
+        ):
+    top_donor_df = pipeline.big_df.groupby(["donor_full_name"])\
+        .amount.sum().sort_values(ascending=False)
+    print("Biggest overall donors:")
+    print(top_donor_df.head(num_to_show))
+    print("")
+
+
+def velocity_writer(
+        pipeline: Pipeline,
+        election: str,
+        report: str,
+        file_path: str
+        ):
+    """Write to a csv file each House and Senate candidate's rolling 7- and
+    30-day cash raised and spent, burn ratio and days-to-zero estimate, as of
+    the last transaction date in the given election and report, and add them
+    to the candidates' summaries.
+
+    Parameters
+    ----------
+    pipeline : 
+        The Pipeline to write from.
+    election : 
+        The election whose report sets the as-of date, such as 
+        "State General".
+    report : 
+        The report that sets the as-of date, such as "Seven Day".
+    file_path : 
+        The file path to write to.
+    """
+    import pandas as pd
+
+    from apoc.velocity import velocity_lines, velocity_metrics
+
+    print("Attempting to write fundraising velocity to csv file...")
+    velocity_write_start = time.time()
+
+    period_dates = pipeline.big_df.date[
+        pipeline.big_df.report_type.str.contains(report)
+        & pipeline.big_df.election_type.str.contains(election)]
+    as_of = period_dates.max() if len(period_dates) \
+        else pipeline.big_df.date.max()
+
+    all_metrics = []
+    for chamber, df in [("House", pipeline.house_df),
+                        ("Senate", pipeline.senate_df)]:
+        metrics = velocity_metrics(df, as_of)
+        metrics.insert(0, "chamber", chamber)
+        metrics.insert(1, "district",
+                       metrics.candidate_name.map(df.groupby("candidate_name")
+                                                  .district.first()))
+        all_metrics.append(metrics)
+    all_metrics = pd.concat(all_metrics)
+    all_metrics.to_csv(file_path, index=False)
+    pipeline.summary_extra_lines["velocity"] = velocity_lines(all_metrics)
+
+    velocity_write_finish = time.time()
+    print(f"Velocity metrics are as of {as_of.date()}.")
+    print("Fundraising velocity successfully written.")
+    print(f"Writing to file took {\
+        round(velocity_write_finish - velocity_write_start, 5)} seconds.")
+    print("")
+
+
+def ranking_writer(
+        pipeline: Pipeline,
+        election: str,
+        report: str,
+        file_path: str
+        ):
+    """Write to a csv file every House and Senate candidate's rank by cash
+    raised, in-kind contributions, spending, average donation and share of
+    cash from donations of at least $500, within their chamber and within
+    their district, for the given election and report, and add the ranks to
+    the candidates' summaries. The totals come from the statistics cubes.
+
+    Parameters
+    ----------
+    pipeline : 
+        The Pipeline to write from.
+    election : 
+        The election to rank, such as "State General".
+    report : 
+        The report to rank, such as "Seven Day".
+    file_path : 
+        The file path to write to.
+    """
+    import pandas as pd
+
+    from apoc.rankings import ranking_lines, ranking_table
+    from apoc.stats_cube import cube_totals
+
+    print("Attempting to write candidate rankings to csv file...")
+    ranking_write_start = time.time()
+
+    rosters = []
+    totals = {}
+    for chamber, districts, cube in [
+            ("House", pipeline.house_district_dictionary,
+             pipeline.house_stats_cube),
+            ("Senate", pipeline.senate_district_dictionary,
+             pipeline.senate_stats_cube)]:
+        rosters.append(pd.DataFrame({"chamber": chamber,
+                                     "district": list(districts.values()),
+                                     "candidate_name": list(districts)}))
+        totals[chamber] = cube_totals(cube, election, report)
+    rankings = ranking_table(pd.concat(rosters, ignore_index=True),
+                             pd.concat(totals, names=["chamber"]))
+    rankings.to_csv(file_path, index=False)
+    pipeline.summary_extra_lines["rankings"] = ranking_lines(rankings)
+
+    ranking_write_finish = time.time()
+    print("Candidate rankings successfully written.")
+    print(f"Writing to file took {\
+        round(ranking_write_finish - ranking_write_start, 5)} seconds.")
+    print("")
+
+
+def write_a_district(
+        pipeline: Pipeline,
+        house_or_senate: str,
+        district: str | int,
+        election: str,
+        report: str,
+        file_path: str,
+        date_window: dict | None = None
+        ):
+    """Append summaries of each candidate in the district to a text file with 
+    the specified filepath, as rendered by render_district().
+
+    Parameters
+    ----------
+    pipeline : 
+        The Pipeline to write from.
+    house_or_senate :
+        "house" or "senate", all lowercase.
+    district :
+        The district to write, such as "B" or 12.
+    election :
+        The election being reported on, as a string.
+    report :
+        The report to summarize, as a string.
+    file_path :
+        The path of the file to write summaries into. 
+    date_window : 
+        A window from date_window(). If given, only the transactions in it
+        are written, on top of the election and report.
+    """
+    with open(file_path, "a") as f:
+        f.write(pipeline.render_district(house_or_senate, district, election,
+                                         report, date_window))
+
+
+def summary_writer(
+        pipeline: Pipeline,
+        election: str,
+        report: str,
+        file_path: str,
+        date_window: dict | None = None,
+        cache_path: str | None = None
+        ):
+    """Write summaries for all House districts and all Senate districts to
+    the specified text file, using the given election and report. Districts
+    whose candidates' transactions haven't changed since the last run are
+    copied from the render cache instead of being rendered again.
+
+    Parameters
+    ----------
+    pipeline : 
+        The Pipeline to write from.
+    election : 
+        The election to summarize.
+        For state races, probably either "Primary" or "General".
+        If left blank, will summarize donations recorded during both the
+        primary and the general election recording periods.
+    report : 
+        The report to use for summaries.
+        For state races, probably either "Thirty Day" or "Seven Day".
+        If left blank, will summarize all donations recorded for the given
+        election, regardless of when they were reported. 
+    file_path : 
+        The name for the summary text file.
+    date_window : 
+        A window from date_window(). If given, only the transactions in it
+        are written, on top of the election and report.
+    cache_path : 
+        Where to keep the render cache between runs. If None, rendered
+        districts are only reused within this run.
+    """
+    from apoc.render_cache import load_render_cache, save_render_cache
+
+    if cache_path is not None:
+        pipeline.render_cache = {**load_render_cache(cache_path),
+                                 **pipeline.render_cache}
+    stats_before = dict(pipeline.render_stats)
+
+    def house_summary():
+        print("Attempting to write House candidate summaries...")
+        house_write_start = time.time()
+        for house_district in range(1, 41):
+            write_a_district(pipeline, "house", house_district, election,
+                             report, file_path, date_window)
+        house_write_finish = time.time()
+        print("All House candidate summaries successfully written.")
+        print(f"Writing to file took {\
+            round(house_write_finish - house_write_start, 5)} seconds.")
+        print("")
+
+    house_summary()
+
+    def senate_summary():
+        print("Attempting to write Senate candidate summaries...")
+        senate_write_start = time.time()
+        for senate_district in senate_districts:
+            write_a_district(pipeline, "senate", senate_district, election,
+                             report, file_path, date_window)
+        senate_write_finish = time.time()
+        print("All Senate candidate summaries successfully written.")
+        print(f"Writing to file took {\
+            round(senate_write_finish - senate_write_start, 5)} seconds.")
+        print("")
+
+    senate_summary()
+
+    if cache_path is not None:
+        save_render_cache(pipeline.render_cache, cache_path)
+    hits = pipeline.render_stats["hits"] - stats_before["hits"]
+    misses = pipeline.render_stats["misses"] - stats_before["misses"]
+    seconds_saved = pipeline.render_stats["seconds_saved"] \
+        - stats_before["seconds_saved"]
+    print(f"Reused {hits} districts from the render cache and rendered "
+          f"{misses}, saving about {round(seconds_saved, 5)} seconds.")
+    print("")
+
+
+def big_donation_writer(
+        pipeline: Pipeline,
+        election,
+        report
+        ):
+    """Write to a csv file all transactions in both the House and the Senate
+    that were at least $1,000."""
+    print("Attempting to write large House campaign donations to csv file...")
+    csv_write_start = time.time()
+    pipeline.house_df[
+        (pipeline.house_df.amount >= 1000) 
+        & (pipeline.house_df.report_type.str.contains(report))
+        & (pipeline.house_df.election_type.str.contains(election))
+        ]\
+            [[
+            "district", "candidate_name", "amount", "date", "donor_full_name",
+            "address", "city", "state", "zip", "country", "employer", 
+            "occupation", "donor_score", "is_self", "submitted"
+            ]]\
+        .sort_values(by=["district", "candidate_name", "amount"],
+                     ascending = [True, True, False])\
+        .to_csv("output_files/landfield_stuff/big_contributions.csv", 
+                mode = "a", index=False)
+    csv_write_finish = time.time()
+    print("Large House donations successfully written.")
+    print(f"Writing to file took {csv_write_finish - csv_write_start} \
+          seconds.")
+    print("")
+
+    print("Attempting to write large Senate campaign donations to csv file...")
+    csv_write_start = time.time()
+    pipeline.senate_df[
+        (pipeline.senate_df.amount >= 1000) 
+        & (pipeline.senate_df.report_type.str.contains(report))
+        & (pipeline.senate_df.election_type.str.contains(election))
+        ]\
+            [[
+            "district", "candidate_name", "amount", "date", "donor_full_name",
+            "address", "city", "state", "zip", "country", "employer", 
+            "occupation", "donor_score", "is_self", "submitted"
+            ]]\
+        .sort_values(
+            by=["district", "candidate_name", "amount"],
+            ascending=[True, True, False])\
+        .to_csv("output_files/big_contributions.csv",
+                mode = "a", index=False, header=False)
+    csv_write_finish = time.time()
+    print("Large Senate donations successfully written.")
+    print(f"Writing to file took {csv_write_finish - csv_write_start} \
+          seconds.")
+    print("")
+
+
+def big_donation_iterator(
+        pipeline: Pipeline,
+        district: int | str,
+        election: str,
+        report: str,
+        file_path: str,
+        header: bool = False,
+        date_window: dict | None = None
+        ):
+    """Append the district's donations from donors who gave at least $500,
+    from big_donation_frame(), to a csv file, and return them.
+
+    Parameters
+    ----------
+    pipeline : 
+        The Pipeline to write from.
+    district : 
+        The district to write, such as "B" or 12.
+    election : 
+        The election to summarize, such as "State General".
+    report : 
+        The report to use for summaries, such as "Seven Day".
+    file_path : 
+        The file path to write to.
+    header : 
+        Whether to write the column names first. They are always written for
+        House District 1, which starts the statewide file.
+    date_window : 
+        A window from date_window(). If given, only the transactions in it
+        are written, on top of the election and report.
+    """
+    frame = pipeline.big_donation_frame(district, election, report, date_window)
+    frame.to_csv(file_path, mode="a", index=False,
+                 header=district == 1 or header)
+    return frame
+
+
+def aggregate_big_donation_iterator(
+        pipeline: Pipeline,
+        file_path: str,
+        date_window: dict | None = None
+        ):
+    import pandas as pd
+
+    frames = []
+    house_district_iterator = range(1, 41)
+    for district in house_district_iterator:
+        frames.append(big_donation_iterator(
+            pipeline, district, pipeline.election, pipeline.report,
+            file_path, date_window=date_window))
+    for senate_seat in senate_districts:
+        frames.append(big_donation_iterator(
+            pipeline, senate_seat, pipeline.election, pipeline.report,
+            file_path, date_window=date_window))
+    # Districts without any big donations are left out, since pandas is
+    # deprecating concatenating empty frames. One is kept for the columns if
+    # they're all empty.
+    return pd.concat([frame for frame in frames if not frame.empty]
+                     or frames[:1])
+
+
+def big_expense_iterator(
+        pipeline: Pipeline,
+        district: int | str,
+        election: str,
+        report: str,
+        file_path: str,
+        header: bool = False,
+        date_window: dict | None = None
+        ):
+    """Append the district's expenses to payees who were paid at least 
+    $1,000, from big_expense_frame(), to a csv file, and return them.
+
+    Parameters
+    ----------
+    pipeline : 
+        The Pipeline to write from.
+    district : 
+        The district to write, such as "B" or 12.
+    election : 
+        The election to summarize, such as "State General".
+    report : 
+        The report to use for summaries, such as "Seven Day".
+    file_path : 
+        The file path to write to.
+    header : 
+        Whether to write the column names first. They are always written for
+        House District 1, which starts the statewide file.
+    date_window : 
+        A window from date_window(). If given, only the transactions in it
+        are written, on top of the election and report.
+    """
+    frame = pipeline.big_expense_frame(district, election, report, date_window)
+    frame.to_csv(file_path, mode="a", index=False,
+                 header=district == 1 or header)
+    return frame
+
+
+def aggregate_big_expense_iterator(
+        pipeline: Pipeline,
+        file_path: str,
+        date_window: dict | None = None
+        ):
+    import pandas as pd
+
+    frames = []
+    for district in range(1, 41):
+        frames.append(big_expense_iterator(
+            pipeline, district, pipeline.election, pipeline.report,
+            file_path, date_window=date_window))
+    for senate_seat in senate_districts:
+        frames.append(big_expense_iterator(
+            pipeline, senate_seat, pipeline.election, pipeline.report,
+            file_path, date_window=date_window))
+    # As with big donations, empty districts are left out
+    return pd.concat([frame for frame in frames if not frame.empty]
+                     or frames[:1])
+
+
+def columnar_writer(
+        df: "pd.DataFrame",
+        parquet_path: str,
+        zstd_csv_path: str | None = None
+        ):
+    """Write the big donations or big expenses returned by
+    aggregate_big_donation_iterator() or aggregate_big_expense_iterator()
+    to a typed Parquet file, with one row group per district, and
+    optionally to a zstd-compressed csv file with the same columns and
+    values as the csv file. A file whose optional dependency, pyarrow or
+    zstandard, isn't installed is skipped.
+
+    Parameters
+    ----------
+    df : 
+        The big donations or big expenses, for every district.
+    parquet_path : 
+        The file path to write the Parquet file to.
+    zstd_csv_path : 
+        The file path to write the compressed csv file to, if any.
+    """
+    from apoc.columnar import typed_frame, write_parquet, write_zstd_csv
+
+    print("Attempting to write columnar files...")
+    columnar_write_start = time.time()
+
+    typed = typed_frame(df)
+    try:
+        row_groups = write_parquet(typed, parquet_path)
+        print(f"Wrote {len(typed)} rows in {row_groups} district row "
+              f"groups to {parquet_path}.")
+    except ImportError:
+        print(f"pyarrow isn't installed, so {parquet_path} wasn't written.")
+    if zstd_csv_path is not None:
+        try:
+            write_zstd_csv(df, zstd_csv_path)
+        except ImportError:
+            print(f"zstandard isn't installed, so {zstd_csv_path} "
+                  f"wasn't written.")
+
+    columnar_write_finish = time.time()
+    print("Columnar files successfully written.")
+    print(f"Writing to file took {\
+        round(columnar_write_finish - columnar_write_start, 5)} seconds.")
+    print("")
+
+
+def partition_writer(
+        pipeline: Pipeline,
+        election: str,
+        report: str,
+        directory: str,
+        date_window: dict | None = None
+        ):
+    """Write every House and Senate district's summary, big donations and big
+    expenses to files of their own in the directory, along with a manifest
+    and an index of the files. Files that haven't changed since the last run
+    aren't written again.
+
+    Parameters
+    ----------
+    pipeline : 
+        The Pipeline to write from.
+    election : 
+        The election to summarize, such as "State General".
+    report : 
+        The report to summarize, such as "Seven Day".
+    directory : 
+        The directory to write the district files to.
+    date_window : 
+        A window from date_window(). If given, only the transactions in it
+        are written, on top of the election and report.
+    """
+    from apoc.partitioner import write_partitions
+
+    print("Attempting to write per-district files...")
+    partition_write_start = time.time()
+
+    partitions = pipeline.district_partitions(
+        list(range(1, 41)) + list(senate_districts), election, report,
+        date_window)
+    written, skipped = write_partitions(partitions, directory)
+
+    partition_write_finish = time.time()
+    print(f"Wrote {written} per-district files to {directory}, and skipped "
+          f"{skipped} that hadn't changed.")
+    print(f"Writing to files took {\
+        round(partition_write_finish - partition_write_start, 5)} seconds.")
+    print("")
+
+
+def geography_writer(
+        pipeline: Pipeline,
+        election: str,
+        report: str,
+        file_path: str
+        ):
+    """Write to a csv file how much of each House and Senate candidate's 
+    cash donations for the given election and report came from inside their
+    district, from elsewhere in Alaska, and from outside Alaska.
+
+    Parameters
+    ----------
+    pipeline : 
+        The Pipeline to write from.
+    election : 
+        The election to summarize, such as "State General".
+    report : 
+        The report to summarize, such as "Seven Day".
+    file_path : 
+        The file path to write to.
+    """
+    import pandas as pd
+
+    from apoc.geography import (geographic_rollup, load_zip_index,
+                                zip_lookup_path)
+    from apoc.stats_cube import transaction_categories
+
+    print("Attempting to write geographic totals to csv file...")
+    geography_write_start = time.time()
+
+    zip_index = load_zip_index()
+    if zip_index is None:
+        print(f"There is no ZIP lookup table at {zip_lookup_path}, so "
+              "in-district totals will be 0.")
+
+    rollups = []
+    for chamber, df in [("house", pipeline.house_df),
+                        ("senate", pipeline.senate_df)]:
+        revenue_df = df[
+            (df.report_type.str.contains(report))
+            & (df.election_type.str.contains(election))
+            & (transaction_categories(df) == 0)
+            ]
+        rollups.append(geographic_rollup(revenue_df, chamber, zip_index))
+    pd.concat(rollups).to_csv(file_path, index=False)
+
+    geography_write_finish = time.time()
+    print("Geographic totals successfully written.")
+    print(f"Writing to file took {\
+        round(geography_write_finish - geography_write_start, 5)} seconds.")
+    print("")
+
+
+def industry_writer(
+        pipeline: Pipeline,
+        election: str,
+        report: str,
+        candidate_file_path: str,
+        district_file_path: str
+        ):
+    """Write to two csv files the cash donations for the given election and
+    report totaled by the donors' industry: one broken down by candidate, 
+    and one by district. Employers and occupations are classified through
+    a saved mapping, so only strings never seen before are classified.
+
+    Parameters
+    ----------
+    pipeline : 
+        The Pipeline to write from.
+    election : 
+        The election to summarize, such as "State General".
+    report : 
+        The report to summarize, such as "Seven Day".
+    candidate_file_path : 
+        The file path to write the per-candidate totals to.
+    district_file_path : 
+        The file path to write the per-district totals to.
+    """
+    import pandas as pd
+
+    from apoc.industry import (industry_rollup, load_industry_map,
+                               save_industry_map)
+    from apoc.stats_cube import transaction_categories
+
+    print("Attempting to write industry totals to csv files...")
+    industry_write_start = time.time()
+
+    industry_map = load_industry_map()
+    known_keys = len(industry_map)
+
+    candidate_rollups = []
+    district_rollups = []
+    for chamber, df in [("House", pipeline.house_df),
+                        ("Senate", pipeline.senate_df)]:
+        revenue_df = df[
+            (df.report_type.str.contains(report))
+            & (df.election_type.str.contains(election))
+            & (transaction_categories(df) == 0)
+            ]
+        by_candidate, by_district = industry_rollup(revenue_df, industry_map)
+        by_candidate.insert(0, "chamber", chamber)
+        by_district.insert(0, "chamber", chamber)
+        candidate_rollups.append(by_candidate)
+        district_rollups.append(by_district)
+    pd.concat(candidate_rollups).to_csv(candidate_file_path, index=False)
+    pd.concat(district_rollups).to_csv(district_file_path, index=False)
+
+    save_industry_map(industry_map)
+
+    industry_write_finish = time.time()
+    print(f"Classified {len(industry_map) - known_keys} new employer and "
+          "occupation strings.")
+    print("Industry totals successfully written.")
+    print(f"Writing to file took {\
+        round(industry_write_finish - industry_write_start, 5)} seconds.")
+    print("")
+
+
+def spending_writer(
+        pipeline: Pipeline,
+        election: str,
+        report: str,
+        file_path: str
+        ):
+    """Write to a csv file each House and Senate candidate's expenditures for
+    the given election and report, totaled by what they were spent on, such
+    as advertising, consulting or travel.
+
+    Parameters
+    ----------
+    pipeline : 
+        The Pipeline to write from.
+    election : 
+        The election to summarize, such as "State General".
+    report : 
+        The report to summarize, such as "Seven Day".
+    file_path : 
+        The file path to write to.
+    """
+    import pandas as pd
+
+    from apoc.expense_purpose import spending_by_category
+    from apoc.stats_cube import transaction_categories
+
+    print("Attempting to write spending by category to csv file...")
+    spending_write_start = time.time()
+
+    # Shared between chambers, so a purpose is only classified once
+    purpose_map = {}
+    tables = []
+    for chamber, df in [("House", pipeline.house_df),
+                        ("Senate", pipeline.senate_df)]:
+        expense_df = df[
+            (df.report_type.str.contains(report))
+            & (df.election_type.str.contains(election))
+            & (transaction_categories(df) == 2)
+            ]
+        table = spending_by_category(expense_df, purpose_map)
+        table.insert(0, "chamber", chamber)
+        tables.append(table)
+    # Categories one chamber never spent on are 0 for it
+    spending = pd.concat(tables).fillna(0)
+    spending = spending[[column for column in spending.columns
+                         if column != "total"] + ["total"]]
+    spending.to_csv(file_path, index=False)
+
+    spending_write_finish = time.time()
+    print(f"Classified {len(purpose_map)} distinct expenditure purposes.")
+    print("Spending by category successfully written.")
+    print(f"Writing to file took {\
+        round(spending_write_finish - spending_write_start, 5)} seconds.")
+    print("")
+
+
+def overlap_writer(
+        pipeline: Pipeline,
+        election: str,
+        statewide_file_path: str,
+        district_file_path: str
+        ):
+    """Write to two csv files how many donors and dollars each pair of House
+    and Senate candidates share, over every report for the given election:
+    one for every pair of candidates statewide, and one for the pairs running
+    in the same district.
+
+    Parameters
+    ----------
+    pipeline : 
+        The Pipeline to write from.
+    election : 
+        The election to compare donors across, such as "State General".
+    statewide_file_path : 
+        The file path to write the statewide pairs to.
+    district_file_path : 
+        The file path to write the per-district pairs to.
+    """
+    import pandas as pd
+
+    from apoc.donor_overlap import (candidate_overlap, district_overlap,
+                                    donor_matrix)
+    from apoc.stats_cube import transaction_categories
+
+    print("Attempting to write donor overlap to csv files...")
+    overlap_write_start = time.time()
+
+    revenue_dfs = []
+    district_overlaps = []
+    for chamber, df in [("House", pipeline.house_df),
+                        ("Senate", pipeline.senate_df)]:
+        revenue_df = df[
+            (df.election_type.str.contains(election))
+            & (transaction_categories(df) == 0)
+            ]
+        revenue_dfs.append(revenue_df)
+        overlap = district_overlap(revenue_df)
+        overlap.insert(0, "chamber", chamber)
+        district_overlaps.append(overlap)
+
+    statewide_overlap = candidate_overlap(donor_matrix(pd.concat(revenue_dfs)))
+    # Statewide pairs can span the chambers, and a candidate can run in both
+    candidate_chambers = [candidate["chamber"]
+                          for candidate in pipeline.alias_index["candidates"]]
+    for side in ["a", "b"]:
+        statewide_overlap.insert(
+            statewide_overlap.columns.get_loc(f"candidate_{side}"),
+            f"chamber_{side}",
+            [candidate_chambers[int(candidate_id)] for candidate_id
+             in statewide_overlap[f"candidate_id_{side}"]])
+    statewide_overlap.to_csv(statewide_file_path, index=False)
+    pd.concat(district_overlaps).to_csv(district_file_path, index=False)
+
+    overlap_write_finish = time.time()
+    print(f"Found {len(statewide_overlap)} pairs of candidates with shared "
+          "donors.")
+    print("Donor overlap successfully written.")
+    print(f"Writing to file took {\
+        round(overlap_write_finish - overlap_write_start, 5)} seconds.")
+    print("")
+
+
+def compliance_writer(
+        pipeline: Pipeline,
+        limit: float,
+        totals_file_path: str,
+        transactions_file_path: str
+        ):
+    """Write to two csv files every House and Senate candidate's individual
+    donors whose contributions in a calendar year, across every report and
+    election, total more than the limit: one with the yearly totals, and one
+    with the contributions that make them up.
+
+    Parameters
+    ----------
+    pipeline : 
+        The Pipeline to write from.
+    limit : 
+        The most an individual may give a candidate in a year.
+    totals_file_path : 
+        The file path to write the flagged yearly totals to.
+    transactions_file_path : 
+        The file path to write the flagged contributions to.
+    """
+    import pandas as pd
+
+    from apoc.compliance import compliance_scan
+
+    print("Attempting to write contribution limit flags to csv files...")
+    compliance_write_start = time.time()
+
+    all_totals = []
+    all_transactions = []
+    for chamber, df in [("House", pipeline.house_df),
+                        ("Senate", pipeline.senate_df)]:
+        totals, transactions = compliance_scan(df, limit)
+        totals.insert(0, "chamber", chamber)
+        totals.insert(1, "district",
+                      totals.candidate_name.map(df.groupby("candidate_name")
+                                                .district.first()))
+        transactions.insert(0, "chamber", chamber)
+        all_totals.append(totals)
+        all_transactions.append(transactions)
+
+    pd.concat(all_totals).to_csv(totals_file_path, index=False)
+    transaction_columns = [
+        "chamber", "district", "candidate_name", "year", "donor_full_name",
+        "year_total", "result", "date", "amount", "payment_type",
+        "report_type", "election_type", "submitted"]
+    all_transactions = pd.concat(all_transactions)
+    all_transactions[[column for column in transaction_columns
+                      if column in all_transactions.columns]]\
+        .to_csv(transactions_file_path, index=False)
+
+    compliance_write_finish = time.time()
+    print(f"Flagged {sum(len(totals) for totals in all_totals)} yearly "
+          f"totals over ${limit}.")
+    print("Contribution limit flags successfully written.")
+    print(f"Writing to file took {\
+        round(compliance_write_finish - compliance_write_start, 5)} seconds.")
+    print("")
+
+
+def dashboard_writer(
+        pipeline: Pipeline,
+        election: str,
+        report: str,
+        directory: str,
+        districts: list | None = None,
+        date_window: dict | None = None
+        ):
+    """Write the dashboard to the directory: a JSON payload for each House
+    and Senate district with its candidates' totals for the given election
+    and report and their cumulative cash raised and spent over the election,
+    a list of the payloads, and the page that shows them. Payloads that
+    haven't changed since the last build aren't written again.
+
+    Parameters
+    ----------
+    pipeline : 
+        The Pipeline to write from.
+    election : 
+        The election to summarize, such as "State General".
+    report : 
+        The report to summarize, such as "Seven Day".
+    directory : 
+        The directory to write the dashboard to.
+    districts : 
+        The districts to rebuild, such as [1, 2, "A"]. Defaults to every
+        district.
+    date_window : 
+        A window from date_window(). If given, the totals and the cumulative
+        series only include the transactions in it.
+    """
+    from apoc.dashboard import (district_payloads, districts_index,
+                                districts_name, page_html, page_name)
+    from apoc.partitioner import load_manifest, write_partitions
+
+    print("Attempting to build the dashboard...")
+    dashboard_write_start = time.time()
+
+    partitions = {}
+    for chamber, district_dictionary in [
+            ("House", pipeline.house_district_dictionary),
+            ("Senate", pipeline.senate_district_dictionary)]:
+        chamber_districts = None if districts is None else [
+            district for district in districts
+            if isinstance(district, int) == (chamber == "House")]
+        if chamber_districts == []:
+            continue
+        partitions.update(district_payloads(
+            chamber, pipeline.chamber_df(chamber.lower(), date_window),
+            pipeline.stats_cube(chamber.lower(), date_window),
+            district_dictionary, election, report, chamber_districts,
+            date_window))
+
+    # Lists the payloads from earlier builds too, when only some districts
+    # were rebuilt
+    payload_names = set(partitions) | {
+        name for name in load_manifest(directory)
+        if name.startswith(("house_", "senate_"))}
+    partitions[districts_name] = districts_index(sorted(payload_names))
+    partitions[page_name] = page_html
+    written, skipped = write_partitions(partitions, directory)
+
+    dashboard_write_finish = time.time()
+    print(f"Wrote {written} dashboard files to {directory}, and skipped "
+          f"{skipped} that hadn't changed.")
+    print(f"Building the dashboard took {\
+        round(dashboard_write_finish - dashboard_write_start, 5)} seconds.")
+    print("")
+
+
+def payee_writer(
+        pipeline: Pipeline,
+        leaderboard_file_path: str,
+        breakdown_file_path: str
+        ):
+    """Write to two csv files what every payee was paid by House and Senate
+    campaigns, across every report and election: a leaderboard with one row
+    per payee, and the per-campaign breakdown, sorted by payee so each
+    payee's campaigns are together.
+
+    Parameters
+    ----------
+    pipeline : 
+        The Pipeline to write from.
+    leaderboard_file_path : 
+        The file path to write the leaderboard to.
+    breakdown_file_path : 
+        The file path to write the per-campaign breakdown to.
+    """
+    import pandas as pd
+
+    from apoc.payees import payee_breakdown, payee_leaderboard
+
+    print("Attempting to write payee totals to csv files...")
+    payee_write_start = time.time()
+
+    df = pd.concat([pipeline.house_df.assign(chamber="House"),
+                    pipeline.senate_df.assign(chamber="Senate")])
+    breakdown = payee_breakdown(df)
+    leaderboard = payee_leaderboard(breakdown)
+    leaderboard.to_csv(leaderboard_file_path, index=False)
+    breakdown.reset_index().to_csv(breakdown_file_path, index=False)
+
+    payee_write_finish = time.time()
+    print(f"Totaled payments to {len(leaderboard)} payees across "
+          f"{breakdown.index.droplevel('payee_key').nunique()} "
+          "campaigns.")
+    print("Payee totals successfully written.")
+    print(f"Writing to file took {\
+        round(payee_write_finish - payee_write_start, 5)} seconds.")
+    print("")
+
+
+def anomaly_writer(
+        pipeline: Pipeline,
+        file_path: str
+        ):
+    """Write to a csv file the House and Senate transactions, across every
+    report and election, that stand out from the rest of their campaign's:
+    unusual amounts, unusually busy days, bundled round-number donations and
+    negative donations, ranked by anomaly score.
+
+    Parameters
+    ----------
+    pipeline : 
+        The Pipeline to write from.
+    file_path : 
+        The file path to write to.
+    """
+    import pandas as pd
+
+    from apoc.anomalies import anomaly_scores
+
+    print("Attempting to write anomaly report to csv file...")
+    anomaly_write_start = time.time()
+
+    anomalies = anomaly_scores(
+        pd.concat([pipeline.house_df.assign(chamber="House"),
+                   pipeline.senate_df.assign(chamber="Senate")]))
+    anomaly_columns = [
+        "score", "reasons", "chamber", "district", "candidate_name", "date",
+        "amount", "category", "donor_full_name", "payment_type",
+        "report_type", "election_type", "result", "amount_z", "day_count",
+        "day_z", "bundle"]
+    anomalies[[column for column in anomaly_columns
+               if column in anomalies.columns]]\
+        .to_csv(file_path, index=False)
+
+    anomaly_write_finish = time.time()
+    print(f"Flagged {len(anomalies)} unusual transactions.")
+    print("Anomaly report successfully written.")
+    print(f"Writing to file took {\
+        round(anomaly_write_finish - anomaly_write_start, 5)} seconds.")
+    print("")
+
+
+def cycle_writer(
+        pipeline: Pipeline,
+        election: str,
+        report: str,
+        store_directory: str,
+        file_path: str
+        ):
+    """Add the export's transactions to the cycle store, then write to a csv
+    file what each of this cycle's House and Senate candidates had raised
+    and spent in every stored cycle, as of the same number of days before
+    election day as the last transaction date in the given election and
+    report, and add the earlier cycles to the candidates' summaries.
+
+    Parameters
+    ----------
+    pipeline : 
+        The Pipeline to write from.
+    election : 
+        The election whose day the point in each cycle is counted back
+        from, such as "State General".
+    report : 
+        The report that sets the point in the cycle, such as "Seven Day".
+    store_directory : 
+        The cycle store's directory.
+    file_path : 
+        The file path to write to.
+    """
+    from apoc.cycles import (cycle_lines, cycle_totals, cycle_year,
+                             election_day, store_cycles)
+
+    print("Attempting to write cross-cycle comparison to csv file...")
+    cycle_write_start = time.time()
+
+    # Each partition stored replaces the one before it, so a big_df read for
+    # just one election and report would throw away the rest of its year
+    if pipeline.read_plan["election"] or pipeline.read_plan["report"]:
+        raise ValueError("The cycle store needs every period of the export, "
+                         "so the pipeline's outputs must include \"cycles\".")
+    stored = store_cycles(pipeline.big_df, store_directory)
+
+    period_dates = pipeline.big_df.date[
+        pipeline.big_df.report_type.str.contains(report)
+        & pipeline.big_df.election_type.str.contains(election)]
+    as_of = period_dates.max() if len(period_dates) \
+        else pipeline.big_df.date.max()
+    current_cycle = cycle_year(int(pipeline.big_df.report_year.max()))
+    days_before = (election_day(current_cycle, election)
+                   - as_of.normalize()).days
+
+    candidates = {
+        chamber: [name for names in nested_names for name in names]
+        for chamber, nested_names in [
+            ("House", pipeline.nested_house_name_list),
+            ("Senate", pipeline.nested_senate_name_list)]}
+    totals = cycle_totals(store_directory, election, days_before, candidates)
+    totals.sort_values(["chamber", "candidate_name", "cycle"])\
+        .to_csv(file_path, index=False)
+    pipeline.summary_extra_lines["cycles"] = cycle_lines(totals,
+                                                         current_cycle)
+
+    cycle_write_finish = time.time()
+    print(f"Stored {len(stored)} partitions in the cycle store.")
+    print(f"Cycles are compared {days_before} days before election day.")
+    print("Cross-cycle comparison successfully written.")
+    print(f"Writing to file took {\
+        round(cycle_write_finish - cycle_write_start, 5)} seconds.")
+    print("")
+
+
+def alias_writer(
+        pipeline: Pipeline,
+        file_path: str
+        ):
+    """Write to a csv file every House and Senate candidate id, with the
+    candidate's canonical name and district, their names on the primary and
+    general rosters, whether they advanced to the general, and every
+    spelling of their name resolved to the id.
+
+    Parameters
+    ----------
+    pipeline : 
+        The Pipeline to write from.
+    file_path : 
+        The file path to write to.
+    """
+    from apoc.aliases import candidate_table
+
+    print("Attempting to write candidate aliases to csv file...")
+    alias_write_start = time.time()
+
+    # The export's spellings are added to the index as the chamber
+    # dataframes are built
+    pipeline.house_df
+    pipeline.senate_df
+    candidates = candidate_table(pipeline.alias_index)
+    candidates.to_csv(file_path, index=False)
+
+    alias_write_finish = time.time()
+    print(f"Resolved {candidates.spellings.str.count("; ").sum()\
+        + len(candidates)} spellings to {len(candidates)} candidates.")
+    print("Candidate aliases successfully written.")
+    print(f"Writing to file took {\
+        round(alias_write_finish - alias_write_start, 5)} seconds.")
+    print("")